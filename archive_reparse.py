@@ -0,0 +1,54 @@
+"""Re-parse archived asset pages into the dividend history store without network access.
+
+Usage: python archive_reparse.py [--archive-dir data/html_archive] [--url-prefix https://investidor10.com.br/fiis/] [--replace]
+"""
+import argparse
+import os
+import time
+
+from dividend_history_store import DEFAULT_DIVIDEND_HISTORY_DB_PATH, DividendHistoryStore
+from html_archive import HtmlArchive
+from http_dividends_extractor import parse_dividend_history_from_html
+
+
+def main() -> None:
+    argument_parser = argparse.ArgumentParser(description=__doc__)
+    argument_parser.add_argument(
+        "--archive-dir",
+        default=os.environ.get("HTML_ARCHIVE_DIR", os.path.join("data", "html_archive")),
+    )
+    argument_parser.add_argument(
+        "--history-db",
+        default=os.environ.get("DIVIDEND_HISTORY_DB_PATH", DEFAULT_DIVIDEND_HISTORY_DB_PATH),
+    )
+    argument_parser.add_argument("--url-prefix", default="https://investidor10.com.br/")
+    argument_parser.add_argument(
+        "--replace",
+        action="store_true",
+        help="Replace the stored history instead of merging only newer rows.",
+    )
+    arguments = argument_parser.parse_args()
+
+    archive = HtmlArchive(arguments.archive_dir)
+    history_store = DividendHistoryStore(arguments.history_db)
+    started_at = time.perf_counter()
+    parsed_pages = 0
+    stored_rows = 0
+    for url, _, html_content in archive.iter_latest_pages(arguments.url_prefix):
+        if "/carteira/" in url:
+            continue
+        history_entries = parse_dividend_history_from_html(html_content)
+        if not history_entries:
+            continue
+        if arguments.replace:
+            stored_rows += history_store.replace_history(url, None, history_entries)
+        else:
+            stored_rows += history_store.merge_history(url, None, history_entries)
+        parsed_pages += 1
+
+    elapsed_seconds = time.perf_counter() - started_at
+    print(f"Re-parsed {parsed_pages} page(s), stored {stored_rows} row(s) in {elapsed_seconds:.2f}s.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,188 @@
+from __future__ import annotations
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+from uuid import uuid4
+
+TASK_QUEUED = "queued"
+TASK_LEASED = "leased"
+TASK_DONE = "done"
+
+LEASE_EXPIRED_REASON = "Nenhum worker concluiu o ativo {asset_code} após {attempts} tentativa(s)."
+
+
+@dataclass
+class AssetTask:
+    task_id: str
+    batch_id: str
+    asset_code: str
+    table_name: str
+    deadline_at: float
+    attempts: int
+
+
+class AssetTaskQueue:
+    """SQLite-backed queue of per-asset lookups shared by the API and the workers.
+
+    Workers lease a task for a limited time and keep extending the lease while they
+    work on it; a task whose lease expires (worker died) is handed to the next worker
+    until max_attempts is reached.
+    """
+
+    def __init__(self, database_path: str, max_attempts: int = 3) -> None:
+        self._max_attempts = max_attempts
+        self._lock = threading.Lock()
+        database_directory = os.path.dirname(database_path)
+        if database_directory:
+            os.makedirs(database_directory, exist_ok=True)
+        self._connection = sqlite3.connect(
+            database_path,
+            check_same_thread=False,
+            timeout=30,
+            isolation_level=None,
+        )
+        with self._lock:
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute(
+                """
+                CREATE TABLE IF NOT EXISTS asset_tasks (
+                    task_id TEXT PRIMARY KEY,
+                    batch_id TEXT NOT NULL,
+                    asset_code TEXT NOT NULL,
+                    table_name TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    deadline_at REAL NOT NULL,
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    lease_owner TEXT,
+                    lease_expires_at REAL,
+                    result TEXT,
+                    created_at REAL NOT NULL
+                )
+                """
+            )
+            self._connection.execute(
+                "CREATE INDEX IF NOT EXISTS asset_tasks_by_status ON asset_tasks (status, created_at)"
+            )
+            self._connection.execute(
+                "CREATE INDEX IF NOT EXISTS asset_tasks_by_batch ON asset_tasks (batch_id)"
+            )
+
+    def publish(self, batch_id: str, asset_code: str, table_name: str, deadline_at: float) -> str:
+        task_id = str(uuid4())
+        with self._lock:
+            self._connection.execute(
+                """
+                INSERT INTO asset_tasks (task_id, batch_id, asset_code, table_name, status, deadline_at, created_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                """,
+                (task_id, batch_id, asset_code, table_name or "", TASK_QUEUED, deadline_at, time.time()),
+            )
+        return task_id
+
+    def lease(self, worker_id: str, lease_seconds: float) -> Optional[AssetTask]:
+        now = time.time()
+        with self._lock:
+            self._connection.execute("BEGIN IMMEDIATE")
+            try:
+                self._expire_abandoned_tasks(now)
+                task_row = self._connection.execute(
+                    """
+                    SELECT task_id, batch_id, asset_code, table_name, deadline_at, attempts FROM asset_tasks
+                    WHERE (status = ? OR (status = ? AND lease_expires_at < ?)) AND deadline_at > ?
+                    ORDER BY created_at LIMIT 1
+                    """,
+                    (TASK_QUEUED, TASK_LEASED, now, now),
+                ).fetchone()
+                if task_row is None:
+                    self._connection.execute("COMMIT")
+                    return None
+                self._connection.execute(
+                    """
+                    UPDATE asset_tasks SET status = ?, lease_owner = ?, lease_expires_at = ?, attempts = attempts + 1
+                    WHERE task_id = ?
+                    """,
+                    (TASK_LEASED, worker_id, now + lease_seconds, task_row[0]),
+                )
+                self._connection.execute("COMMIT")
+            except Exception:
+                self._connection.execute("ROLLBACK")
+                raise
+        return AssetTask(
+            task_id=task_row[0],
+            batch_id=task_row[1],
+            asset_code=task_row[2],
+            table_name=task_row[3],
+            deadline_at=task_row[4],
+            attempts=task_row[5] + 1,
+        )
+
+    def extend_lease(self, task_id: str, worker_id: str, lease_seconds: float) -> bool:
+        """Keep the task leased; False when the lease was lost or the task was cancelled."""
+        with self._lock:
+            update_cursor = self._connection.execute(
+                "UPDATE asset_tasks SET lease_expires_at = ? WHERE task_id = ? AND status = ? AND lease_owner = ?",
+                (time.time() + lease_seconds, task_id, TASK_LEASED, worker_id),
+            )
+        return update_cursor.rowcount == 1
+
+    def complete(self, task_id: str, worker_id: str, result: Dict[str, object]) -> bool:
+        with self._lock:
+            update_cursor = self._connection.execute(
+                "UPDATE asset_tasks SET status = ?, result = ? WHERE task_id = ? AND status = ? AND lease_owner = ?",
+                (TASK_DONE, json.dumps(result, ensure_ascii=False), task_id, TASK_LEASED, worker_id),
+            )
+        return update_cursor.rowcount == 1
+
+    def collect_results(self, batch_id: str) -> Dict[str, Dict[str, object]]:
+        """Return the results of the finished tasks of a batch, keyed by task id."""
+        with self._lock:
+            task_rows = self._connection.execute(
+                "SELECT task_id, result FROM asset_tasks WHERE batch_id = ? AND status = ?",
+                (batch_id, TASK_DONE),
+            ).fetchall()
+        return {task_id: json.loads(raw_result) for task_id, raw_result in task_rows}
+
+    def count_leased(self, batch_id: str) -> int:
+        """Return how many tasks of a batch a worker has picked up at least once."""
+        with self._lock:
+            count_row = self._connection.execute(
+                "SELECT COUNT(*) FROM asset_tasks WHERE batch_id = ? AND attempts > 0",
+                (batch_id,),
+            ).fetchone()
+        return count_row[0]
+
+    def purge_batch(self, batch_id: str) -> None:
+        """Drop every task of a batch; workers still holding one lose their lease and stop."""
+        with self._lock:
+            self._connection.execute("DELETE FROM asset_tasks WHERE batch_id = ?", (batch_id,))
+
+    def _expire_abandoned_tasks(self, now: float) -> None:
+        abandoned_rows: List[tuple] = self._connection.execute(
+            """
+            SELECT task_id, asset_code, attempts FROM asset_tasks
+            WHERE status = ? AND lease_expires_at < ? AND (attempts >= ? OR deadline_at <= ?)
+            """,
+            (TASK_LEASED, now, self._max_attempts, now),
+        ).fetchall()
+        for task_id, asset_code, attempts in abandoned_rows:
+            failure_reason = LEASE_EXPIRED_REASON.format(asset_code=asset_code, attempts=attempts)
+            self._connection.execute(
+                "UPDATE asset_tasks SET status = ?, result = ? WHERE task_id = ?",
+                (TASK_DONE, json.dumps({"failure_reason": failure_reason}, ensure_ascii=False), task_id),
+            )
+
+
+def create_asset_task_queue() -> Optional[AssetTaskQueue]:
+    """Return the shared queue when distributed mode is configured, None otherwise."""
+    database_path = os.environ.get("ASSET_TASK_QUEUE_PATH", "").strip()
+    if not database_path:
+        return None
+    return AssetTaskQueue(
+        database_path,
+        max_attempts=int(os.environ.get("ASSET_TASK_MAX_ATTEMPTS", "3")),
+    )
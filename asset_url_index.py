@@ -0,0 +1,170 @@
+from __future__ import annotations
+
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from typing import List, Optional
+from urllib.parse import urlparse
+
+from html_archive import get_html_archive, is_replay_mode
+from structured_logging import get_logger
+
+INVESTIDOR10_BASE_URL = os.environ.get("INVESTIDOR10_BASE_URL", "https://investidor10.com.br").rstrip("/")
+logger = get_logger("asset_url_index")
+
+DEFAULT_ASSET_URL_INDEX_DB_PATH = os.path.join("data", "asset_url_index.sqlite3")
+ASSET_CATEGORY_PATHS = [
+    "acoes",
+    "fiis",
+    "fiagros",
+    "bdrs",
+    "etfs",
+    "etfs-global",
+    "stocks",
+    "reits",
+    "criptomoedas",
+]
+
+
+def build_asset_url(category_path: str, asset_code: str) -> str:
+    return f"{INVESTIDOR10_BASE_URL}/{category_path}/{asset_code.lower()}/"
+
+
+@dataclass
+class AssetUrlIndexEntry:
+    asset_url: Optional[str]
+    reason: Optional[str]
+    resolved_at: float
+
+
+class AssetUrlIndex:
+    def __init__(self, database_path: str, negative_ttl_seconds: float) -> None:
+        self._negative_ttl_seconds = negative_ttl_seconds
+        self._lock = threading.Lock()
+        database_directory = os.path.dirname(database_path)
+        if database_directory:
+            os.makedirs(database_directory, exist_ok=True)
+        self._connection = sqlite3.connect(database_path, check_same_thread=False)
+        with self._lock, self._connection:
+            self._connection.execute(
+                """
+                CREATE TABLE IF NOT EXISTS asset_url_index (
+                    asset_code TEXT PRIMARY KEY,
+                    asset_url TEXT,
+                    reason TEXT,
+                    resolved_at REAL NOT NULL
+                )
+                """
+            )
+
+    def lookup(self, asset_code: str) -> Optional[AssetUrlIndexEntry]:
+        with self._lock:
+            index_row = self._connection.execute(
+                "SELECT asset_url, reason, resolved_at FROM asset_url_index WHERE asset_code = ?",
+                (asset_code.upper(),),
+            ).fetchone()
+        if not index_row:
+            return None
+        entry = AssetUrlIndexEntry(asset_url=index_row[0], reason=index_row[1], resolved_at=index_row[2])
+        if entry.asset_url is None and time.time() - entry.resolved_at > self._negative_ttl_seconds:
+            return None
+        return entry
+
+    def store(self, asset_code: str, asset_url: Optional[str], reason: Optional[str] = None) -> None:
+        with self._lock, self._connection:
+            self._connection.execute(
+                """
+                INSERT OR REPLACE INTO asset_url_index (asset_code, asset_url, reason, resolved_at)
+                VALUES (?, ?, ?, ?)
+                """,
+                (asset_code.upper(), asset_url, reason, time.time()),
+            )
+
+    def resolve(
+        self,
+        asset_code: str,
+        guessed_url: Optional[str],
+        probe_budget_seconds: float,
+    ) -> Optional[str]:
+        """Return the indexed URL, probing the candidate categories on the first miss."""
+        cached_entry = self.lookup(asset_code)
+        if cached_entry:
+            return cached_entry.asset_url
+
+        if is_replay_mode():
+            # Replays never touch the network: pick the candidate that was archived, if any.
+            html_archive = get_html_archive()
+            for candidate_url in _build_candidate_urls(asset_code, guessed_url):
+                if html_archive.has_page(candidate_url):
+                    return candidate_url
+            return guessed_url
+
+        deadline = time.monotonic() + probe_budget_seconds
+        inconclusive_probe = False
+        for candidate_url in _build_candidate_urls(asset_code, guessed_url):
+            remaining_seconds = deadline - time.monotonic()
+            if remaining_seconds <= 0.5:
+                inconclusive_probe = True
+                break
+            probe_result = probe_asset_url(candidate_url, min(5.0, remaining_seconds))
+            if probe_result is True:
+                self.store(asset_code, candidate_url)
+                return candidate_url
+            if probe_result is None:
+                # The site is failing or throttling us; probing the other categories now
+                # would only repeat the same inconclusive answer for each of them.
+                inconclusive_probe = True
+                break
+
+        if inconclusive_probe:
+            return guessed_url
+
+        logger.info("No Investidor10 page found. Caching negative result.", asset=asset_code)
+        self.store(asset_code, None, "not_found")
+        return None
+
+
+def probe_asset_url(candidate_url: str, request_timeout_seconds: float) -> Optional[bool]:
+    """Return True when the page exists, False when it does not and None when inconclusive."""
+    import requests
+
+    from http_assets_extractor import DEFAULT_REQUEST_HEADERS
+
+    try:
+        response = requests.head(
+            candidate_url,
+            headers=DEFAULT_REQUEST_HEADERS,
+            timeout=request_timeout_seconds,
+            allow_redirects=True,
+        )
+        if response.status_code == 405:
+            response = requests.get(
+                candidate_url,
+                headers=DEFAULT_REQUEST_HEADERS,
+                timeout=request_timeout_seconds,
+                allow_redirects=True,
+                stream=True,
+            )
+            response.close()
+    except requests.RequestException as probe_error:
+        logger.info("Probe failed for %s: %s", candidate_url, probe_error, sampled=True)
+        return None
+
+    if response.status_code in (404, 410):
+        return False
+    if response.status_code != 200:
+        return None
+    requested_path = urlparse(candidate_url).path.rstrip("/")
+    final_path = urlparse(response.url).path.rstrip("/")
+    return requested_path == final_path
+
+
+def _build_candidate_urls(asset_code: str, guessed_url: Optional[str]) -> List[str]:
+    candidate_urls = [guessed_url] if guessed_url else []
+    for category_path in ASSET_CATEGORY_PATHS:
+        candidate_url = build_asset_url(category_path, asset_code)
+        if candidate_url not in candidate_urls:
+            candidate_urls.append(candidate_url)
+    return candidate_urls
@@ -0,0 +1,180 @@
+"""Resolve per-asset dividend lookups published by the API on the shared task queue.
+
+Run one or more of these next to the API (same ASSET_TASK_QUEUE_PATH) to add scraping
+capacity without adding API nodes:
+
+    ASSET_TASK_QUEUE_PATH=data/asset_tasks.sqlite3 python asset_worker.py --concurrency 2
+"""
+import argparse
+import os
+import signal
+import socket
+import threading
+import time
+
+from asset_task_queue import AssetTask, AssetTaskQueue, create_asset_task_queue
+from dividend_lookup import (
+    DIVIDEND_DATE_CACHE,
+    DIVIDEND_HISTORY_STORE,
+    EXTRACTION_BACKENDS,
+    lookup_indexed_asset_url,
+    resolve_latest_dividend_date_for_asset,
+)
+from driver_watchdog import get_driver_watchdog
+from structured_logging import get_logger, log_context
+from time_budget import TimeBudget
+
+logger = get_logger("asset_worker", stage="worker")
+
+
+class LeaseHeartbeat:
+    """Extend the task lease while it is being resolved; cancel the work when the lease is lost."""
+
+    def __init__(
+        self,
+        task_queue: AssetTaskQueue,
+        task: AssetTask,
+        worker_id: str,
+        lease_seconds: float,
+        time_budget: TimeBudget,
+    ) -> None:
+        self._task_queue = task_queue
+        self._task = task
+        self._worker_id = worker_id
+        self._lease_seconds = lease_seconds
+        self._time_budget = time_budget
+        self._owner_thread = threading.current_thread()
+        self._stop_event = threading.Event()
+        self._thread = threading.Thread(target=self._run, name=f"lease-{task.task_id[:8]}", daemon=True)
+
+    def __enter__(self) -> "LeaseHeartbeat":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *_) -> None:
+        self._stop_event.set()
+        self._thread.join()
+
+    def _run(self) -> None:
+        while not self._stop_event.wait(self._lease_seconds / 3):
+            if self._task_queue.extend_lease(self._task.task_id, self._worker_id, self._lease_seconds):
+                continue
+            logger.warning("Lease lost or task cancelled. Stopping.", asset=self._task.asset_code)
+            self._time_budget.cancel()
+            get_driver_watchdog().release_thread_drivers(self._owner_thread)
+            return
+
+
+def process_task(
+    task_queue: AssetTaskQueue,
+    task: AssetTask,
+    worker_id: str,
+    lease_seconds: float,
+    selenium_driver,
+):
+    time_budget = TimeBudget(max(1.0, task.deadline_at - time.time()))
+    lookup_started_at = time.monotonic()
+    with log_context(asset=task.asset_code, task_id=task.task_id), \
+            LeaseHeartbeat(task_queue, task, worker_id, lease_seconds, time_budget):
+        latest_dividend_date, failure_reason, selenium_driver = resolve_latest_dividend_date_for_asset(
+            task.asset_code,
+            task.table_name,
+            time_budget,
+            selenium_driver,
+            DIVIDEND_DATE_CACHE,
+            DIVIDEND_HISTORY_STORE,
+        )
+    if time_budget.is_cancelled():
+        if selenium_driver:
+            EXTRACTION_BACKENDS.get("selenium").quit_driver(selenium_driver)
+        return None
+
+    asset_url = lookup_indexed_asset_url(task.asset_code, task.table_name)
+    task_queue.complete(task.task_id, worker_id, {
+        "date_com": latest_dividend_date.strftime("%d/%m/%Y") if latest_dividend_date else None,
+        "failure_reason": failure_reason,
+        # Lets the API cache "no dividends" and "page not found" answers the same way it does locally.
+        "negative_reason": (
+            DIVIDEND_DATE_CACHE.get_negative(asset_url) if asset_url and not latest_dividend_date else None
+        ),
+        "asset_url": asset_url,
+        "elapsed_seconds": time.monotonic() - lookup_started_at,
+        "worker_id": worker_id,
+    })
+    return selenium_driver
+
+
+def run_worker_loop(
+    task_queue: AssetTaskQueue,
+    worker_id: str,
+    lease_seconds: float,
+    idle_sleep_seconds: float,
+    stop_event: threading.Event,
+) -> None:
+    selenium_driver = None
+    try:
+        while not stop_event.is_set():
+            if selenium_driver and EXTRACTION_BACKENDS.get("selenium").should_recycle_driver(selenium_driver):
+                EXTRACTION_BACKENDS.get("selenium").quit_driver(selenium_driver)
+                selenium_driver = None
+            task = task_queue.lease(worker_id, lease_seconds)
+            if task is None:
+                stop_event.wait(idle_sleep_seconds)
+                continue
+            try:
+                selenium_driver = process_task(task_queue, task, worker_id, lease_seconds, selenium_driver)
+            except Exception as task_error:
+                logger.exception("Task failed: %s", task_error, asset=task.asset_code)
+    finally:
+        if selenium_driver:
+            EXTRACTION_BACKENDS.get("selenium").quit_driver(selenium_driver)
+
+
+def main_cli() -> None:
+    argument_parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    argument_parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=int(os.environ.get("ASSET_WORKER_CONCURRENCY", "1")),
+        help="Tasks resolved in parallel, each with its own browser.",
+    )
+    argument_parser.add_argument(
+        "--lease-seconds",
+        type=float,
+        default=float(os.environ.get("ASSET_TASK_LEASE_SECONDS", "60")),
+    )
+    argument_parser.add_argument("--idle-sleep-seconds", type=float, default=1.0)
+    argument_parser.add_argument("--worker-id", default=f"{socket.gethostname()}-{os.getpid()}")
+    arguments = argument_parser.parse_args()
+
+    task_queue = create_asset_task_queue()
+    if task_queue is None:
+        argument_parser.error("ASSET_TASK_QUEUE_PATH is not set.")
+
+    get_driver_watchdog().start()
+    stop_event = threading.Event()
+    signal.signal(signal.SIGTERM, lambda *_: stop_event.set())
+    signal.signal(signal.SIGINT, lambda *_: stop_event.set())
+
+    worker_threads = [
+        threading.Thread(
+            target=run_worker_loop,
+            args=(task_queue, f"{arguments.worker_id}-{slot}", arguments.lease_seconds,
+                  arguments.idle_sleep_seconds, stop_event),
+            name=f"asset-worker-{slot}",
+        )
+        for slot in range(max(1, arguments.concurrency))
+    ]
+    logger.info("Worker %s started with %d slot(s).", arguments.worker_id, len(worker_threads))
+    for worker_thread in worker_threads:
+        worker_thread.start()
+    while any(worker_thread.is_alive() for worker_thread in worker_threads):
+        for worker_thread in worker_threads:
+            worker_thread.join(timeout=1)
+    logger.info("Worker %s stopped.", arguments.worker_id)
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,243 @@
+"""Resolve the data-com of a list of wallets offline, without the API and its request timeouts.
+
+    python batch_data_com.py wallets.txt --output reports/data_com.csv --concurrency 4
+
+The input file has one wallet URL per line (blank lines and lines starting with # are
+skipped). Every finished wallet is appended to a checkpoint file, so running the same
+command again after an interruption only processes the wallets that are still missing.
+"""
+import argparse
+import csv
+import importlib
+import importlib.util
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, Iterable, List, Optional
+
+from structured_logging import get_logger, log_context
+from time_budget import TimeBudget
+
+UNLIMITED_BUDGET_SECONDS = 7 * 24 * 60 * 60
+OUTPUT_FORMATS = ("csv", "ndjson", "parquet")
+OUTPUT_COLUMNS = ("wallet_url", "asset", "date_com", "failure_reason")
+
+logger = get_logger("batch_data_com", stage="batch")
+
+
+class WalletCheckpoint:
+    """Append-only JSONL record of the wallets already processed by a batch run."""
+
+    def __init__(self, checkpoint_path: str) -> None:
+        self._checkpoint_path = checkpoint_path
+        self._lock = threading.Lock()
+        checkpoint_directory = os.path.dirname(checkpoint_path)
+        if checkpoint_directory:
+            os.makedirs(checkpoint_directory, exist_ok=True)
+
+    def load(self) -> Dict[str, Dict[str, object]]:
+        wallet_payloads: Dict[str, Dict[str, object]] = {}
+        if not os.path.exists(self._checkpoint_path):
+            return wallet_payloads
+        with open(self._checkpoint_path, "r", encoding="utf-8") as checkpoint_file:
+            for line in checkpoint_file:
+                try:
+                    wallet_payload = json.loads(line)
+                except ValueError:
+                    # The run was killed while writing this line; the wallet is simply redone.
+                    continue
+                wallet_payloads[wallet_payload["wallet_url"]] = wallet_payload
+        return wallet_payloads
+
+    def append(self, wallet_payload: Dict[str, object]) -> None:
+        with self._lock, open(self._checkpoint_path, "a", encoding="utf-8") as checkpoint_file:
+            checkpoint_file.write(json.dumps(wallet_payload, ensure_ascii=False) + "\n")
+            checkpoint_file.flush()
+            os.fsync(checkpoint_file.fileno())
+
+
+def read_wallet_urls(input_path: str) -> List[str]:
+    wallet_urls: List[str] = []
+    with open(input_path, "r", encoding="utf-8") as input_file:
+        for line in input_file:
+            wallet_url = line.strip()
+            if wallet_url and not wallet_url.startswith("#") and wallet_url not in wallet_urls:
+                wallet_urls.append(wallet_url)
+    return wallet_urls
+
+
+def process_wallet(wallet_url: str, time_budget: TimeBudget, incremental: bool) -> Dict[str, object]:
+    # Imported here, not at the top: the HTML parse pool spawns processes that re-import this
+    # script, and they must not build the API app, its stores and its driver watchdog again.
+    import main
+
+    started_at = time.monotonic()
+    with log_context(wallet_url=wallet_url):
+        try:
+            tables = main.collect_assets_tables(wallet_url, time_budget)
+            data_com_plan = main.plan_wallet_data_com(wallet_url, tables, incremental)
+            results_payload = main.build_data_com_payload(
+                tables,
+                time_budget,
+                main.DIVIDEND_DATE_CACHE,
+                dividend_history_store=main.DIVIDEND_HISTORY_STORE,
+                asset_codes=data_com_plan.get("assets_to_resolve"),
+            )
+            results_payload = main.finalize_wallet_data_com(wallet_url, data_com_plan, results_payload)
+            wallet_payload = {
+                "wallet_url": wallet_url,
+                "results": results_payload["results"],
+                "failures": results_payload["failures"],
+                "error": None,
+            }
+        except Exception as wallet_error:
+            logger.error("Wallet failed: %s", wallet_error)
+            wallet_payload = {"wallet_url": wallet_url, "results": [], "failures": [], "error": str(wallet_error)}
+        wallet_payload["elapsed_seconds"] = round(time.monotonic() - started_at, 3)
+        logger.info(
+            "Wallet done: %d result(s), %d failure(s) in %.1fs.",
+            len(wallet_payload["results"]),
+            len(wallet_payload["failures"]),
+            wallet_payload["elapsed_seconds"],
+        )
+    return wallet_payload
+
+
+def iter_output_rows(wallet_payloads: Iterable[Dict[str, object]]) -> Iterable[Dict[str, Optional[str]]]:
+    """Flatten the wallet payloads into one row per resolved or failed asset."""
+    for wallet_payload in wallet_payloads:
+        wallet_url = wallet_payload["wallet_url"]
+        if wallet_payload.get("error"):
+            yield {"wallet_url": wallet_url, "asset": None, "date_com": None, "failure_reason": wallet_payload["error"]}
+            continue
+        for result in wallet_payload["results"]:
+            yield {"wallet_url": wallet_url, "asset": result["asset"], "date_com": result["date_com"], "failure_reason": None}
+        for failure in wallet_payload["failures"]:
+            yield {"wallet_url": wallet_url, "asset": failure["asset"], "date_com": None, "failure_reason": failure["reason"]}
+
+
+def write_output(output_path: str, output_format: str, rows: List[Dict[str, Optional[str]]]) -> None:
+    output_directory = os.path.dirname(output_path)
+    if output_directory:
+        os.makedirs(output_directory, exist_ok=True)
+    partial_path = f"{output_path}.partial"
+    if output_format == "parquet":
+        pyarrow, parquet = _load_pyarrow()
+        table = pyarrow.table({column: [row[column] for row in rows] for column in OUTPUT_COLUMNS})
+        parquet.write_table(table, partial_path)
+    elif output_format == "ndjson":
+        with open(partial_path, "w", encoding="utf-8") as output_file:
+            for row in rows:
+                output_file.write(json.dumps(row, ensure_ascii=False) + "\n")
+    else:
+        with open(partial_path, "w", encoding="utf-8", newline="") as output_file:
+            csv_writer = csv.DictWriter(output_file, fieldnames=OUTPUT_COLUMNS)
+            csv_writer.writeheader()
+            csv_writer.writerows(rows)
+    os.replace(partial_path, output_path)
+
+
+def run_batch(arguments: argparse.Namespace) -> Dict[str, int]:
+    wallet_urls = read_wallet_urls(arguments.input)
+    checkpoint = WalletCheckpoint(arguments.checkpoint or f"{arguments.output}.checkpoint.jsonl")
+    finished_payloads = checkpoint.load()
+    pending_urls = [
+        wallet_url for wallet_url in wallet_urls
+        if wallet_url not in finished_payloads
+        or (arguments.retry_failed and finished_payloads[wallet_url].get("error"))
+    ]
+    logger.info(
+        "%d wallet(s) in %s, %d already in the checkpoint, %d to process.",
+        len(wallet_urls),
+        arguments.input,
+        len(wallet_urls) - len(pending_urls),
+        len(pending_urls),
+    )
+
+    active_budgets: List[TimeBudget] = []
+    budget_seconds = arguments.timeout_seconds or UNLIMITED_BUDGET_SECONDS
+
+    def run_wallet(wallet_url: str) -> Dict[str, object]:
+        time_budget = TimeBudget(budget_seconds)
+        active_budgets.append(time_budget)
+        try:
+            return process_wallet(wallet_url, time_budget, arguments.incremental)
+        finally:
+            active_budgets.remove(time_budget)
+
+    executor = ThreadPoolExecutor(max_workers=max(1, arguments.concurrency), thread_name_prefix="batch-wallet")
+    try:
+        wallet_futures = [executor.submit(run_wallet, wallet_url) for wallet_url in pending_urls]
+        for completed_count, wallet_future in enumerate(as_completed(wallet_futures), start=1):
+            wallet_payload = wallet_future.result()
+            checkpoint.append(wallet_payload)
+            finished_payloads[wallet_payload["wallet_url"]] = wallet_payload
+            logger.info("Progress: %d/%d wallet(s).", completed_count, len(pending_urls))
+    except KeyboardInterrupt:
+        logger.warning("Interrupted; finished wallets are kept in the checkpoint.")
+        for time_budget in list(active_budgets):
+            time_budget.cancel()
+        executor.shutdown(wait=True, cancel_futures=True)
+        raise
+    executor.shutdown(wait=True)
+
+    output_rows = list(iter_output_rows(
+        finished_payloads[wallet_url] for wallet_url in wallet_urls if wallet_url in finished_payloads
+    ))
+    write_output(arguments.output, arguments.format, output_rows)
+    summary = {
+        "wallets": len(wallet_urls),
+        "processed": len(pending_urls),
+        "failed_wallets": sum(1 for wallet_url in wallet_urls if finished_payloads[wallet_url].get("error")),
+        "rows": len(output_rows),
+    }
+    logger.info("Batch written to %s: %s", arguments.output, summary)
+    return summary
+
+
+def _load_pyarrow():
+    if importlib.util.find_spec("pyarrow") is None:
+        return None, None
+    return importlib.import_module("pyarrow"), importlib.import_module("pyarrow.parquet")
+
+
+def _infer_output_format(output_path: str) -> str:
+    extension = os.path.splitext(output_path)[1].lower().lstrip(".")
+    if extension in ("jsonl", "ndjson"):
+        return "ndjson"
+    return extension if extension in OUTPUT_FORMATS else "csv"
+
+
+def main_cli() -> None:
+    argument_parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    argument_parser.add_argument("input", help="File with one wallet URL per line.")
+    argument_parser.add_argument("--output", required=True, help="Result file (.csv, .ndjson or .parquet).")
+    argument_parser.add_argument("--format", choices=OUTPUT_FORMATS, help="Defaults to the output extension.")
+    argument_parser.add_argument(
+        "--checkpoint",
+        help="Checkpoint file (defaults to <output>.checkpoint.jsonl).",
+    )
+    argument_parser.add_argument("--concurrency", type=int, default=2, help="Wallets processed in parallel.")
+    argument_parser.add_argument(
+        "--timeout-seconds",
+        type=float,
+        default=0,
+        help="Per-wallet time budget; 0 (default) means no limit.",
+    )
+    argument_parser.add_argument("--incremental", action="store_true", help="Reuse the stored wallet snapshots.")
+    argument_parser.add_argument("--retry-failed", action="store_true", help="Process again wallets that errored.")
+    arguments = argument_parser.parse_args()
+    arguments.format = arguments.format or _infer_output_format(arguments.output)
+    if arguments.format == "parquet" and _load_pyarrow()[0] is None:
+        argument_parser.error("Parquet output requires pyarrow (pip install pyarrow).")
+
+    summary = run_batch(arguments)
+    print(json.dumps(summary))
+
+
+if __name__ == "__main__":
+    main_cli()
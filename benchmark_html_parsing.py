@@ -0,0 +1,81 @@
+"""Compare in-thread and process-pool HTML parsing under concurrent fetch threads.
+
+Usage: python benchmark_html_parsing.py [--documents 64] [--threads 8] [--rows 400] [--processes auto]
+"""
+import argparse
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import html_parse_pool
+from http_assets_extractor import build_assets_from_static_html
+from http_dividends_extractor import parse_dividend_history_from_html
+
+
+def build_wallet_html(row_count: int) -> str:
+    rows = "".join(
+        f"<tr><td>ATV{index}</td><td>{index}</td><td>R$ {index},00</td><td>{index % 7},5%</td></tr>"
+        for index in range(row_count)
+    )
+    return (
+        "<html><body><table><thead><tr><th>Ativo</th><th>Quantidade</th>"
+        "<th>Preço Médio</th><th>Variação</th></tr></thead>"
+        f"<tbody>{rows}</tbody></table></body></html>"
+    )
+
+
+def build_dividends_html(row_count: int) -> str:
+    rows = "".join(
+        f"<tr><td>Dividendos</td><td>{(index % 28) + 1:02d}/{(index % 12) + 1:02d}/20{10 + index % 15}</td>"
+        f"<td>{(index % 28) + 1:02d}/{(index % 12) + 1:02d}/20{10 + index % 15}</td><td>0,{index:04d}</td></tr>"
+        for index in range(row_count)
+    )
+    return f'<html><body><table id="table-dividends-history"><tbody>{rows}</tbody></table></body></html>'
+
+
+def run_benchmark(parse_jobs, thread_count: int) -> float:
+    def parse_document(parse_job) -> int:
+        parser, html_content = parse_job
+        return len(html_parse_pool.run_html_parser(parser, html_content))
+
+    started_at = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=thread_count) as executor:
+        list(executor.map(parse_document, parse_jobs))
+    return time.perf_counter() - started_at
+
+
+def main() -> None:
+    argument_parser = argparse.ArgumentParser(description=__doc__)
+    argument_parser.add_argument("--documents", type=int, default=64)
+    argument_parser.add_argument("--threads", type=int, default=8)
+    argument_parser.add_argument("--rows", type=int, default=400)
+    argument_parser.add_argument("--processes", default="auto")
+    arguments = argument_parser.parse_args()
+
+    wallet_html = build_wallet_html(arguments.rows)
+    dividends_html = build_dividends_html(arguments.rows)
+    parse_jobs = [
+        (parse_dividend_history_from_html, dividends_html)
+        if index % 2
+        else (build_assets_from_static_html, wallet_html)
+        for index in range(arguments.documents)
+    ]
+
+    os.environ["HTML_PARSE_PROCESSES"] = "0"
+    in_thread_seconds = run_benchmark(parse_jobs, arguments.threads)
+
+    os.environ["HTML_PARSE_PROCESSES"] = arguments.processes
+    html_parse_pool.get_parse_pool()
+    run_benchmark(parse_jobs[: arguments.threads], arguments.threads)
+    pool_seconds = run_benchmark(parse_jobs, arguments.threads)
+    html_parse_pool.shutdown_parse_pool()
+
+    print(f"documents={arguments.documents} threads={arguments.threads} rows={arguments.rows} "
+          f"processes={html_parse_pool.resolve_parse_process_count()}")
+    print(f"in-thread: {in_thread_seconds:.3f}s ({arguments.documents / in_thread_seconds:.1f} docs/s)")
+    print(f"process pool: {pool_seconds:.3f}s ({arguments.documents / pool_seconds:.1f} docs/s)")
+    print(f"speedup: {in_thread_seconds / pool_seconds:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -3,10 +3,15 @@ from __future__ import annotations
 import threading
 import time
 from dataclasses import dataclass, field
-from datetime import date, datetime, timezone
-from typing import Dict, List, Optional
+from datetime import date
+from typing import Callable, Dict, List, Optional
 from uuid import uuid4
 
+from structured_logging import get_logger
+from webhook_dispatcher import WebhookDispatcher
+
+logger = get_logger("data_com_jobs")
+
 
 @dataclass
 class DataComJobResult:
@@ -22,9 +27,13 @@ class DataComJobResult:
     updated_at: float = field(default_factory=time.time)
 
 
+FINISHED_JOB_STATUSES = {"completed", "failed", "cancelled"}
+
+
 class DataComJobStore:
     def __init__(self) -> None:
         self._jobs: Dict[str, DataComJobResult] = {}
+        self._cancel_handlers: Dict[str, Callable[[], None]] = {}
         self._lock = threading.Lock()
 
     def create_job(self) -> str:
@@ -37,7 +46,8 @@ class DataComJobStore:
         with self._lock:
             job = self._jobs.get(job_id)
             if job:
-                job.status = "running"
+                if job.status == "pending":
+                    job.status = "running"
                 job.total_assets = total_assets
                 job.processed_assets = 0
                 job.current_asset = None
@@ -51,8 +61,9 @@ class DataComJobStore:
         failures: List[Dict[str, str]],
     ) -> None:
         with self._lock:
+            self._cancel_handlers.pop(job_id, None)
             job = self._jobs.get(job_id)
-            if job:
+            if job and job.status not in FINISHED_JOB_STATUSES:
                 job.status = "completed"
                 job.results = results
                 job.failures = failures
@@ -62,14 +73,55 @@ class DataComJobStore:
 
     def fail_job(self, job_id: str, error_message: str) -> None:
         with self._lock:
+            self._cancel_handlers.pop(job_id, None)
             job = self._jobs.get(job_id)
-            if job:
+            if job and job.status not in FINISHED_JOB_STATUSES:
                 job.status = "failed"
                 job.error_message = error_message
                 job.current_asset = None
                 job.last_message = "Processamento interrompido."
                 job.updated_at = time.time()
 
+    def cancel_job(
+        self,
+        job_id: str,
+        results: Optional[List[Dict[str, str]]] = None,
+        failures: Optional[List[Dict[str, str]]] = None,
+    ) -> None:
+        """Finish the job as cancelled, keeping the partial results gathered so far."""
+        with self._lock:
+            self._cancel_handlers.pop(job_id, None)
+            job = self._jobs.get(job_id)
+            if job:
+                job.status = "cancelled"
+                if results is not None:
+                    job.results = results
+                if failures is not None:
+                    job.failures = failures
+                job.current_asset = None
+                job.last_message = "Processamento cancelado."
+                job.updated_at = time.time()
+
+    def set_cancel_handler(self, job_id: str, cancel_handler: Callable[[], None]) -> None:
+        with self._lock:
+            self._cancel_handlers[job_id] = cancel_handler
+
+    def request_cancellation(self, job_id: str) -> Optional[str]:
+        """Ask a running job to stop; return its status, or None when the job is unknown."""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return None
+            if job.status in FINISHED_JOB_STATUSES:
+                return job.status
+            job.status = "cancelling"
+            job.last_message = "Cancelamento solicitado."
+            job.updated_at = time.time()
+            cancel_handler = self._cancel_handlers.pop(job_id, None)
+        if cancel_handler:
+            cancel_handler()
+        return "cancelling"
+
     def update_progress(
         self,
         job_id: str,
@@ -108,16 +160,28 @@ class DataComJobStore:
             )
 
 
+NO_DIVIDENDS_REASON = "no_dividends"
+PAGE_NOT_FOUND_REASON = "page_not_found"
+
+
 @dataclass
 class CachedDividendDate:
     date_com_date: date
     cached_at: float
 
 
+@dataclass
+class CachedDividendMiss:
+    reason: str
+    cached_at: float
+
+
 class DividendDateCache:
-    def __init__(self, ttl_seconds: float) -> None:
+    def __init__(self, ttl_seconds: float, negative_ttl_seconds: Optional[float] = None) -> None:
         self._ttl_seconds = ttl_seconds
+        self._negative_ttl_seconds = ttl_seconds if negative_ttl_seconds is None else negative_ttl_seconds
         self._entries: Dict[str, CachedDividendDate] = {}
+        self._negative_entries: Dict[str, CachedDividendMiss] = {}
         self._lock = threading.Lock()
 
     def get(self, cache_key: str) -> Optional[date]:
@@ -132,23 +196,49 @@ class DividendDateCache:
 
     def set(self, cache_key: str, date_com_date: date) -> None:
         with self._lock:
+            self._negative_entries.pop(cache_key, None)
             self._entries[cache_key] = CachedDividendDate(
                 date_com_date=date_com_date,
                 cached_at=time.time(),
             )
 
+    def get_negative(self, cache_key: str) -> Optional[str]:
+        with self._lock:
+            cached_miss = self._negative_entries.get(cache_key)
+            if not cached_miss:
+                return None
+            if time.time() - cached_miss.cached_at > self._negative_ttl_seconds:
+                del self._negative_entries[cache_key]
+                return None
+            return cached_miss.reason
+
+    def set_negative(self, cache_key: str, reason: str) -> None:
+        with self._lock:
+            self._negative_entries[cache_key] = CachedDividendMiss(
+                reason=reason,
+                cached_at=time.time(),
+            )
+
 
 class DataComJobProgressUpdater:
-    def __init__(self, job_store: DataComJobStore, job_id: str, total_assets: int) -> None:
+    def __init__(
+        self,
+        job_store: DataComJobStore,
+        job_id: str,
+        total_assets: int,
+        callback_url: Optional[str] = None,
+        webhook_dispatcher: Optional[WebhookDispatcher] = None,
+    ) -> None:
         self._job_store = job_store
         self._job_id = job_id
         self._total_assets = total_assets
+        self._callback_url = callback_url
+        self._webhook_dispatcher = webhook_dispatcher
 
     def mark_running(self) -> None:
         self._job_store.mark_running(self._job_id, self._total_assets)
-        print(
-            f"{_format_log_timestamp()} [data-com][job {self._job_id}] "
-            f"Iniciando processamento de {self._total_assets} ativos."
+        logger.info(
+            "Iniciando processamento de %d ativos.", self._total_assets, job_id=self._job_id, stage="data-com"
         )
 
     def report_progress(
@@ -167,21 +257,48 @@ class DataComJobProgressUpdater:
             failures,
             message,
         )
-        print(
-            f"{_format_log_timestamp()} [data-com][job {self._job_id}] "
-            f"{message} ({processed_assets}/{self._total_assets})."
+        logger.info(
+            "%s (%d/%d).",
+            message,
+            processed_assets,
+            self._total_assets,
+            job_id=self._job_id,
+            asset=current_asset,
+            stage="data-com",
+            sampled=True,
         )
 
     def mark_completed(self, results: List[Dict[str, str]], failures: List[Dict[str, str]]) -> None:
         self._job_store.complete_job(self._job_id, results, failures)
-        print(f"{_format_log_timestamp()} [data-com][job {self._job_id}] Processamento concluído.")
+        logger.info("Processamento concluído.", job_id=self._job_id, stage="data-com")
+        self._notify_callback()
 
     def mark_failed(self, error_message: str) -> None:
         self._job_store.fail_job(self._job_id, error_message)
-        print(
-            f"{_format_log_timestamp()} [data-com][job {self._job_id}] Falha: {error_message}"
-        )
+        logger.error("Falha: %s", error_message, job_id=self._job_id, stage="data-com")
+        self._notify_callback()
 
+    def mark_cancelled(
+        self,
+        results: Optional[List[Dict[str, str]]] = None,
+        failures: Optional[List[Dict[str, str]]] = None,
+    ) -> None:
+        self._job_store.cancel_job(self._job_id, results, failures)
+        logger.info("Processamento cancelado.", job_id=self._job_id, stage="data-com")
+        self._notify_callback()
 
-def _format_log_timestamp() -> str:
-    return datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S %z")
+    def _notify_callback(self) -> None:
+        if not self._callback_url or self._webhook_dispatcher is None:
+            return
+        job = self._job_store.get_job(self._job_id)
+        if job is None:
+            return
+        self._webhook_dispatcher.enqueue(self._callback_url, {
+            "job_id": self._job_id,
+            "status": job.status,
+            "results": job.results,
+            "failures": job.failures,
+            "error_message": job.error_message,
+            "total_assets": job.total_assets,
+            "processed_assets": job.processed_assets,
+        })
@@ -0,0 +1,199 @@
+from __future__ import annotations
+
+import unicodedata
+from dataclasses import dataclass
+from datetime import date
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+
+from dividend_history import DividendHistoryEntry, parse_brazilian_amount
+
+TRAILING_WINDOW_DAYS = 365
+
+
+@dataclass
+class WalletPosition:
+    asset: str
+    asset_url: Optional[str]
+    quantity: float
+    average_price: float
+
+
+def extract_wallet_positions(
+    tables: List[Dict[str, object]],
+    resolve_url: Callable[[str, str], Optional[str]],
+) -> List[WalletPosition]:
+    positions: List[WalletPosition] = []
+    for table_payload in tables:
+        table_name = table_payload.get("table_name", "")
+        header = table_payload.get("header", "")
+        header_columns = header.split(" | ") if isinstance(header, str) else list(header or [])
+        quantity_index = _find_column_index(header_columns, ("quant",))
+        price_index = _find_column_index(header_columns, ("preco medio", "pm"))
+        for raw_row in table_payload.get("rows", []):
+            row = raw_row.split(" | ") if isinstance(raw_row, str) else raw_row
+            if not row or not row[0]:
+                continue
+            # The table extractors drop empty cells, so a row with a blank cell is shorter than
+            # the header and its columns can no longer be matched by index: leave them unknown.
+            is_aligned = len(row) == len(header_columns)
+            positions.append(WalletPosition(
+                asset=row[0],
+                asset_url=resolve_url(row[0], table_name),
+                quantity=_read_numeric_cell(row, quantity_index if is_aligned else None),
+                average_price=_read_numeric_cell(row, price_index if is_aligned else None),
+            ))
+    return positions
+
+
+def build_dividend_calendar(
+    positions: List[WalletPosition],
+    histories: Dict[str, List[DividendHistoryEntry]],
+    reference_date: date,
+    horizon_months: int = 12,
+) -> Dict[str, object]:
+    """Compute the monthly calendar, trailing 12-month totals and yield-on-cost for a wallet."""
+    asset_count = len(positions)
+    quantities = np.array([position.quantity for position in positions], dtype=float)
+    average_prices = np.array([position.average_price for position in positions], dtype=float)
+
+    asset_indexes, date_coms, payment_dates, amounts = _flatten_histories(positions, histories)
+    today = np.datetime64(reference_date, "D")
+    window_start = today - np.timedelta64(TRAILING_WINDOW_DAYS, "D")
+
+    trailing_mask = (date_coms > window_start) & (date_coms <= today)
+    trailing_per_share = np.bincount(
+        asset_indexes,
+        weights=np.where(trailing_mask, np.nan_to_num(amounts), 0.0),
+        minlength=asset_count,
+    )
+    trailing_totals = trailing_per_share * quantities
+    with np.errstate(divide="ignore", invalid="ignore"):
+        yields_on_cost = np.where(average_prices > 0, trailing_per_share / average_prices, np.nan)
+    history_counts = np.bincount(asset_indexes, minlength=asset_count)
+
+    horizon_end = (
+        np.datetime64(reference_date, "M") + np.timedelta64(horizon_months + 1, "M")
+    ).astype("datetime64[D]")
+    event_dates = np.concatenate([date_coms, payment_dates])
+    event_assets = np.concatenate([asset_indexes, asset_indexes])
+    event_amounts = np.concatenate([amounts, amounts])
+    event_kinds = np.repeat(np.array(["data_com", "payment"]), date_coms.size)
+    upcoming_mask = ~np.isnat(event_dates) & (event_dates >= today) & (event_dates < horizon_end)
+
+    upcoming_dates = event_dates[upcoming_mask]
+    order = np.argsort(upcoming_dates, kind="stable")
+    upcoming_dates = upcoming_dates[order]
+    upcoming_assets = event_assets[upcoming_mask][order]
+    upcoming_amounts = event_amounts[upcoming_mask][order]
+    upcoming_kinds = event_kinds[upcoming_mask][order]
+    upcoming_totals = upcoming_amounts * quantities[upcoming_assets]
+
+    upcoming_months = upcoming_dates.astype("datetime64[M]")
+    months, month_indexes = np.unique(upcoming_months, return_inverse=True)
+    payment_mask = upcoming_kinds == "payment"
+    month_payment_totals = np.bincount(
+        month_indexes,
+        weights=np.where(payment_mask, np.nan_to_num(upcoming_totals), 0.0),
+        minlength=months.size,
+    )
+
+    calendar = [
+        {"month": str(month), "expected_payment_total": round(float(total), 2), "events": []}
+        for month, total in zip(months, month_payment_totals)
+    ]
+    for month_index, event_date, asset_index, amount, total, kind in zip(
+        month_indexes.tolist(),
+        upcoming_dates.astype(object),
+        upcoming_assets.tolist(),
+        upcoming_amounts.tolist(),
+        upcoming_totals.tolist(),
+        upcoming_kinds.tolist(),
+    ):
+        calendar[month_index]["events"].append({
+            "asset": positions[asset_index].asset,
+            "event": kind,
+            "date": event_date.strftime("%d/%m/%Y"),
+            "amount_per_share": _optional_float(amount),
+            "expected_total": _optional_float(total, 2),
+        })
+
+    assets_summary = [
+        {
+            "asset": position.asset,
+            "quantity": _optional_float(quantity),
+            "average_price": _optional_float(average_price),
+            "trailing_12m_per_share": _optional_float(per_share),
+            "trailing_12m_total": _optional_float(total, 2),
+            "yield_on_cost": _optional_float(yield_on_cost, 6),
+            "has_history": bool(count),
+        }
+        for position, quantity, average_price, per_share, total, yield_on_cost, count in zip(
+            positions,
+            quantities.tolist(),
+            average_prices.tolist(),
+            trailing_per_share.tolist(),
+            trailing_totals.tolist(),
+            yields_on_cost.tolist(),
+            history_counts.tolist(),
+        )
+    ]
+
+    return {
+        "reference_date": reference_date.strftime("%d/%m/%Y"),
+        "assets": assets_summary,
+        "calendar": calendar,
+        "trailing_12m_total": round(float(np.nansum(trailing_totals)), 2),
+    }
+
+
+def _flatten_histories(
+    positions: List[WalletPosition],
+    histories: Dict[str, List[DividendHistoryEntry]],
+) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    asset_indexes: List[int] = []
+    date_coms: List[date] = []
+    payment_dates: List[Optional[date]] = []
+    amounts: List[float] = []
+    for asset_index, position in enumerate(positions):
+        for entry in histories.get(position.asset_url or "", []):
+            asset_indexes.append(asset_index)
+            date_coms.append(entry.date_com)
+            payment_dates.append(entry.payment_date)
+            amounts.append(np.nan if entry.amount is None else entry.amount)
+    return (
+        np.array(asset_indexes, dtype=np.intp),
+        np.array(date_coms, dtype="datetime64[D]"),
+        np.array(
+            [payment_date or np.datetime64("NaT") for payment_date in payment_dates],
+            dtype="datetime64[D]",
+        ),
+        np.array(amounts, dtype=float),
+    )
+
+
+def _find_column_index(header_columns: List[str], keywords: tuple[str, ...]) -> Optional[int]:
+    for column_index, column_name in enumerate(header_columns):
+        normalized_name = _normalize_label(column_name)
+        if any(normalized_name == keyword or normalized_name.startswith(keyword) for keyword in keywords):
+            return column_index
+    return None
+
+
+def _normalize_label(label: str) -> str:
+    decomposed = unicodedata.normalize("NFKD", label or "")
+    return "".join(char for char in decomposed if not unicodedata.combining(char)).strip().lower()
+
+
+def _read_numeric_cell(row: List[str], column_index: Optional[int]) -> float:
+    if column_index is None or column_index >= len(row):
+        return np.nan
+    parsed_value = parse_brazilian_amount(row[column_index])
+    return np.nan if parsed_value is None else parsed_value
+
+
+def _optional_float(value: float, digits: Optional[int] = None) -> Optional[float]:
+    if value is None or np.isnan(value):
+        return None
+    return round(value, digits) if digits is not None else value
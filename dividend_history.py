@@ -0,0 +1,55 @@
+"""Dividend history types and cell parsers shared by the HTTP and Selenium extractors.
+
+Kept free of network and browser imports so the API can load it at startup.
+"""
+import datetime
+import re
+from dataclasses import dataclass
+from typing import List, Optional
+
+
+class AssetPageNotFoundError(Exception):
+    """Raised when the asset page does not exist on Investidor10."""
+
+
+@dataclass(frozen=True)
+class DividendHistoryEntry:
+    date_com: datetime.date
+    payment_date: Optional[datetime.date] = None
+    amount: Optional[float] = None
+    dividend_type: Optional[str] = None
+
+
+def parse_dividend_history_row(cell_values: List[str]) -> Optional[DividendHistoryEntry]:
+    if len(cell_values) < 2:
+        return None
+    date_com = _parse_brazilian_date(cell_values[1])
+    if date_com is None:
+        return None
+    payment_date = _parse_brazilian_date(cell_values[2]) if len(cell_values) > 2 else None
+    amount = parse_brazilian_amount(cell_values[3]) if len(cell_values) > 3 else None
+    dividend_type = cell_values[0] or None
+    return DividendHistoryEntry(
+        date_com=date_com,
+        payment_date=payment_date,
+        amount=amount,
+        dividend_type=dividend_type,
+    )
+
+
+def _parse_brazilian_date(date_value: str) -> datetime.date | None:
+    try:
+        return datetime.datetime.strptime(date_value, "%d/%m/%Y").date()
+    except Exception:
+        return None
+
+
+def parse_brazilian_amount(amount_value: str) -> float | None:
+    normalized_value = re.sub(r"[^\d,.-]", "", amount_value or "")
+    if not normalized_value:
+        return None
+    normalized_value = normalized_value.replace(".", "").replace(",", ".")
+    try:
+        return float(normalized_value)
+    except ValueError:
+        return None
@@ -0,0 +1,208 @@
+from __future__ import annotations
+
+import os
+import sqlite3
+import threading
+import time
+from datetime import date
+from typing import Dict, List, Optional
+
+from dividend_history import DividendHistoryEntry
+
+DEFAULT_DIVIDEND_HISTORY_DB_PATH = os.path.join("data", "dividend_history.sqlite3")
+
+
+class DividendHistoryStore:
+    def __init__(self, database_path: str) -> None:
+        self._database_path = database_path
+        self._lock = threading.Lock()
+        database_directory = os.path.dirname(database_path)
+        if database_directory:
+            os.makedirs(database_directory, exist_ok=True)
+        self._connection = sqlite3.connect(database_path, check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._create_schema()
+
+    def _create_schema(self) -> None:
+        with self._lock, self._connection:
+            self._connection.execute(
+                """
+                CREATE TABLE IF NOT EXISTS dividend_history (
+                    asset_url TEXT NOT NULL,
+                    asset_code TEXT,
+                    dividend_type TEXT NOT NULL DEFAULT '',
+                    date_com TEXT NOT NULL,
+                    payment_date TEXT NOT NULL DEFAULT '',
+                    amount REAL,
+                    stored_at REAL NOT NULL,
+                    PRIMARY KEY (asset_url, date_com, dividend_type)
+                )
+                """
+            )
+            self._migrate_payment_date_key()
+            self._connection.execute(
+                """
+                CREATE TABLE IF NOT EXISTS dividend_history_updates (
+                    asset_url TEXT PRIMARY KEY,
+                    asset_code TEXT,
+                    updated_at REAL NOT NULL
+                )
+                """
+            )
+
+    def _migrate_payment_date_key(self) -> None:
+        """Collapse stores created while payment_date was part of the primary key."""
+        key_columns = [
+            column_row[1]
+            for column_row in self._connection.execute("PRAGMA table_info(dividend_history)")
+            if column_row[5]
+        ]
+        if "payment_date" not in key_columns:
+            return
+        self._connection.execute("ALTER TABLE dividend_history RENAME TO dividend_history_legacy")
+        self._connection.execute(
+            """
+            CREATE TABLE dividend_history (
+                asset_url TEXT NOT NULL,
+                asset_code TEXT,
+                dividend_type TEXT NOT NULL DEFAULT '',
+                date_com TEXT NOT NULL,
+                payment_date TEXT NOT NULL DEFAULT '',
+                amount REAL,
+                stored_at REAL NOT NULL,
+                PRIMARY KEY (asset_url, date_com, dividend_type)
+            )
+            """
+        )
+        # Keep the most recently stored row of each dividend.
+        self._connection.execute(
+            """
+            INSERT OR REPLACE INTO dividend_history (
+                asset_url, asset_code, dividend_type, date_com, payment_date, amount, stored_at
+            )
+            SELECT asset_url, asset_code, dividend_type, date_com, payment_date, amount, stored_at
+            FROM dividend_history_legacy
+            ORDER BY stored_at, payment_date
+            """
+        )
+        self._connection.execute("DROP TABLE dividend_history_legacy")
+
+    def merge_history(
+        self,
+        asset_url: str,
+        asset_code: Optional[str],
+        history_entries: List[DividendHistoryEntry],
+    ) -> int:
+        """Store the entries not older than the latest stored data-com; return the rows added or changed.
+
+        A dividend already stored for the same data-com and type is updated in place when
+        the new scrape fills in its payment date or changes its amount. The update time
+        is only recorded when the scrape returned entries.
+        """
+        stored_at = time.time()
+        with self._lock, self._connection:
+            latest_row = self._connection.execute(
+                "SELECT MAX(date_com) FROM dividend_history WHERE asset_url = ?",
+                (asset_url,),
+            ).fetchone()
+            latest_stored = latest_row[0] if latest_row else None
+            new_rows = [
+                (
+                    asset_url,
+                    asset_code,
+                    entry.dividend_type or "",
+                    entry.date_com.isoformat(),
+                    entry.payment_date.isoformat() if entry.payment_date else "",
+                    entry.amount,
+                    stored_at,
+                )
+                for entry in history_entries
+                if latest_stored is None or entry.date_com.isoformat() >= latest_stored
+            ]
+            changes_before = self._connection.total_changes
+            self._connection.executemany(
+                """
+                INSERT INTO dividend_history (
+                    asset_url, asset_code, dividend_type, date_com, payment_date, amount, stored_at
+                ) VALUES (?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(asset_url, date_com, dividend_type) DO UPDATE SET
+                    payment_date = CASE
+                        WHEN excluded.payment_date != '' THEN excluded.payment_date
+                        ELSE dividend_history.payment_date
+                    END,
+                    amount = COALESCE(excluded.amount, dividend_history.amount),
+                    asset_code = COALESCE(excluded.asset_code, dividend_history.asset_code),
+                    stored_at = excluded.stored_at
+                WHERE (excluded.payment_date != '' AND excluded.payment_date != dividend_history.payment_date)
+                    OR (excluded.amount IS NOT NULL AND excluded.amount IS NOT dividend_history.amount)
+                """,
+                new_rows,
+            )
+            changed_rows = self._connection.total_changes - changes_before
+            if not history_entries:
+                return changed_rows
+            self._connection.execute(
+                """
+                INSERT INTO dividend_history_updates (asset_url, asset_code, updated_at)
+                VALUES (?, ?, ?)
+                ON CONFLICT(asset_url) DO UPDATE SET
+                    asset_code = COALESCE(excluded.asset_code, dividend_history_updates.asset_code),
+                    updated_at = excluded.updated_at
+                """,
+                (asset_url, asset_code, stored_at),
+            )
+        return changed_rows
+
+    def replace_history(
+        self,
+        asset_url: str,
+        asset_code: Optional[str],
+        history_entries: List[DividendHistoryEntry],
+    ) -> int:
+        with self._lock, self._connection:
+            self._connection.execute("DELETE FROM dividend_history WHERE asset_url = ?", (asset_url,))
+            self._connection.execute(
+                "DELETE FROM dividend_history_updates WHERE asset_url = ?", (asset_url,)
+            )
+        return self.merge_history(asset_url, asset_code, history_entries)
+
+    def get_history(self, asset_url: str) -> List[DividendHistoryEntry]:
+        with self._lock:
+            rows = self._connection.execute(
+                """
+                SELECT date_com, payment_date, amount, dividend_type
+                FROM dividend_history
+                WHERE asset_url = ?
+                ORDER BY date_com DESC, payment_date DESC
+                """,
+                (asset_url,),
+            ).fetchall()
+        return [
+            DividendHistoryEntry(
+                date_com=date.fromisoformat(date_com),
+                payment_date=date.fromisoformat(payment_date) if payment_date else None,
+                amount=amount,
+                dividend_type=dividend_type or None,
+            )
+            for date_com, payment_date, amount, dividend_type in rows
+        ]
+
+    def get_histories(self, asset_urls: List[str]) -> Dict[str, List[DividendHistoryEntry]]:
+        return {asset_url: self.get_history(asset_url) for asset_url in asset_urls}
+
+    def get_last_updated_at(self, asset_url: str) -> Optional[float]:
+        with self._lock:
+            update_row = self._connection.execute(
+                "SELECT updated_at FROM dividend_history_updates WHERE asset_url = ?",
+                (asset_url,),
+            ).fetchone()
+        return update_row[0] if update_row else None
+
+
+def serialize_history_entry(entry: DividendHistoryEntry) -> Dict[str, object]:
+    return {
+        "type": entry.dividend_type,
+        "date_com": entry.date_com.strftime("%d/%m/%Y"),
+        "payment_date": entry.payment_date.strftime("%d/%m/%Y") if entry.payment_date else None,
+        "amount": entry.amount,
+    }
@@ -0,0 +1,243 @@
+"""Per-asset dividend lookup shared by the API and the asset workers.
+
+Holds the caches, the URL index and the extraction backends both processes use, so a
+worker can resolve an asset without importing the Flask app.
+"""
+import os
+from datetime import date
+from typing import List, Optional
+
+from asset_url_index import DEFAULT_ASSET_URL_INDEX_DB_PATH, AssetUrlIndex, build_asset_url
+from data_com_jobs import NO_DIVIDENDS_REASON, PAGE_NOT_FOUND_REASON, DividendDateCache
+from dividend_history import AssetPageNotFoundError, DividendHistoryEntry
+from dividend_history_store import DEFAULT_DIVIDEND_HISTORY_DB_PATH, DividendHistoryStore
+from extraction_backends import ExtractionBackendRegistry
+from html_archive import is_replay_mode
+from lookup_scheduler import SeleniumFallback
+from strategy_breaker import StrategyCircuitBreaker
+from structured_logging import get_logger
+from time_budget import ProcessingTimeoutError, TimeBudget
+
+logger = get_logger("dividend_lookup")
+
+EXTRACTION_BACKENDS = ExtractionBackendRegistry()
+EXTRACTION_BACKENDS.register("http", "http_backend")
+EXTRACTION_BACKENDS.register("selenium", "selenium_backend")
+
+DIVIDEND_DATE_CACHE_TTL_SECONDS = 6 * 60 * 60
+DIVIDEND_DATE_CACHE = DividendDateCache(
+    ttl_seconds=DIVIDEND_DATE_CACHE_TTL_SECONDS,
+    negative_ttl_seconds=24 * 60 * 60,
+)
+DIVIDEND_HISTORY_STORE = DividendHistoryStore(
+    os.environ.get("DIVIDEND_HISTORY_DB_PATH", DEFAULT_DIVIDEND_HISTORY_DB_PATH)
+)
+ASSET_STRATEGY_BREAKER = StrategyCircuitBreaker("asset")
+ASSET_URL_INDEX = AssetUrlIndex(
+    os.environ.get("ASSET_URL_INDEX_DB_PATH", DEFAULT_ASSET_URL_INDEX_DB_PATH),
+    negative_ttl_seconds=7 * 24 * 60 * 60,
+)
+
+
+def resolve_latest_dividend_date_for_asset(
+    asset_code: str,
+    table_name: str,
+    time_budget: TimeBudget,
+    selenium_driver: object | None,
+    dividend_date_cache: DividendDateCache,
+    dividend_history_store: Optional[DividendHistoryStore] = None,
+    selenium_fallbacks: Optional[List[SeleniumFallback]] = None,
+) -> tuple[date | None, str | None, object | None]:
+    """Resolve one asset; with selenium_fallbacks, browser lookups are queued there instead of run."""
+    try:
+        time_budget.ensure_time_available(3, f"o ativo {asset_code}")
+    except ProcessingTimeoutError as timeout_error:
+        return None, str(timeout_error), selenium_driver
+
+    asset_url = resolve_indexed_asset_url(asset_code, table_name, time_budget)
+    logger.debug("Resolved URL %s.", asset_url, stage="data-com", sampled=True)
+    if not asset_url:
+        return None, f"URL do ativo {asset_code} não pôde ser resolvida.", selenium_driver
+
+    cached_date = dividend_date_cache.get(asset_url)
+    if cached_date:
+        return cached_date, None, selenium_driver
+
+    cached_miss_reason = dividend_date_cache.get_negative(asset_url)
+    if cached_miss_reason:
+        return None, describe_dividend_miss(asset_code, cached_miss_reason), selenium_driver
+
+    latest_dividend_date = None
+    static_page_read = False
+    replay_only = is_replay_mode()
+    if replay_only or ASSET_STRATEGY_BREAKER.should_try_http():
+        try:
+            latest_dividend_date, static_page_read = extract_latest_dividend_date(
+                asset_url, asset_code, time_budget, dividend_history_store
+            )
+        except ProcessingTimeoutError as timeout_error:
+            return None, str(timeout_error), selenium_driver
+        except AssetPageNotFoundError:
+            ASSET_STRATEGY_BREAKER.record_http_success()
+            dividend_date_cache.set_negative(asset_url, PAGE_NOT_FOUND_REASON)
+            return None, describe_dividend_miss(asset_code, PAGE_NOT_FOUND_REASON), selenium_driver
+    else:
+        logger.info("Static HTTP disabled by circuit breaker. Using Selenium.", stage="data-com", sampled=True)
+
+    if latest_dividend_date is None and replay_only:
+        return None, f"Nenhuma data de dividendo arquivada para {asset_code}.", selenium_driver
+
+    if latest_dividend_date is None and selenium_fallbacks is not None:
+        selenium_fallbacks.append(SeleniumFallback(asset_code, asset_url, static_page_read))
+        return None, None, selenium_driver
+
+    if latest_dividend_date is None:
+        try:
+            selenium_driver = selenium_driver or EXTRACTION_BACKENDS.get("selenium").setup_driver()
+            latest_dividend_date = extract_latest_dividend_date_with_selenium(
+                selenium_driver, asset_url, asset_code, time_budget, dividend_history_store
+            )
+        except ProcessingTimeoutError as timeout_error:
+            return None, str(timeout_error), selenium_driver
+        except Exception as selenium_error:
+            return (
+                None,
+                f"Falha ao ler dividendos via Selenium para {asset_code}: {selenium_error}",
+                selenium_driver,
+            )
+        record_selenium_fallback_result(static_page_read, latest_dividend_date)
+
+    latest_dividend_date, failure_reason = conclude_dividend_lookup(
+        asset_code, asset_url, latest_dividend_date, dividend_date_cache
+    )
+    return latest_dividend_date, failure_reason, selenium_driver
+
+
+def record_selenium_fallback_result(static_page_read: bool, latest_dividend_date: date | None) -> None:
+    if not static_page_read:
+        return
+    if latest_dividend_date is None:
+        ASSET_STRATEGY_BREAKER.record_http_success()
+    else:
+        ASSET_STRATEGY_BREAKER.record_http_failure()
+
+
+def conclude_dividend_lookup(
+    asset_code: str,
+    asset_url: str,
+    latest_dividend_date: date | None,
+    dividend_date_cache: DividendDateCache,
+) -> tuple[date | None, str | None]:
+    if latest_dividend_date is None:
+        dividend_date_cache.set_negative(asset_url, NO_DIVIDENDS_REASON)
+        return None, describe_dividend_miss(asset_code, NO_DIVIDENDS_REASON)
+    dividend_date_cache.set(asset_url, latest_dividend_date)
+    return latest_dividend_date, None
+
+
+def describe_dividend_miss(asset_code: str, reason: str) -> str:
+    if reason == PAGE_NOT_FOUND_REASON:
+        return f"Página do ativo {asset_code} não encontrada."
+    return f"Nenhuma data de dividendo encontrada para {asset_code}."
+
+
+def extract_latest_dividend_date(
+    asset_url: str,
+    asset_code: str,
+    time_budget: TimeBudget,
+    dividend_history_store: Optional[DividendHistoryStore] = None,
+) -> tuple[date | None, bool]:
+    try:
+        http_timeout = time_budget.clamp_timeout(15)
+        history_entries = EXTRACTION_BACKENDS.get("http").extract_dividend_history_via_http(
+            asset_url, http_timeout
+        )
+    except (ProcessingTimeoutError, AssetPageNotFoundError):
+        raise
+    except Exception as http_error:
+        logger.warning("HTTP dividend extraction failed for %s: %s", asset_url, http_error, stage="data-com")
+        ASSET_STRATEGY_BREAKER.record_http_failure()
+        return None, False
+
+    if not history_entries:
+        return None, True
+
+    ASSET_STRATEGY_BREAKER.record_http_success()
+    store_dividend_history(dividend_history_store, asset_url, asset_code, history_entries)
+    return max(entry.date_com for entry in history_entries), False
+
+
+def store_dividend_history(
+    dividend_history_store: Optional[DividendHistoryStore],
+    asset_url: str,
+    asset_code: str,
+    history_entries: List[DividendHistoryEntry],
+) -> None:
+    if dividend_history_store is None:
+        return
+    try:
+        dividend_history_store.merge_history(asset_url, asset_code, history_entries)
+    except Exception as store_error:
+        logger.warning("Unable to store dividend history: %s", store_error, asset=asset_code, stage="data-com")
+
+
+def extract_latest_dividend_date_with_selenium(
+    driver,
+    asset_url: str,
+    asset_code: str,
+    time_budget: TimeBudget,
+    dividend_history_store: Optional[DividendHistoryStore] = None,
+) -> date | None:
+    history_entries = EXTRACTION_BACKENDS.get("selenium").extract_dividend_history_with_selenium(
+        driver, asset_url, asset_code, time_budget
+    )
+    if not history_entries:
+        return None
+    store_dividend_history(dividend_history_store, asset_url, asset_code, history_entries)
+    return max(entry.date_com for entry in history_entries)
+
+
+def resolve_asset_url(code: str, table_name: str) -> str:
+    if table_name == 'assets':
+        path = 'acoes'
+    else:
+        primary = table_name.split('\n')[0].upper()
+        if primary == 'FIIS':
+            path = 'fiis'
+        elif primary.startswith('CRIPTOMOEDAS'):
+            path = 'criptomoedas'
+        elif primary.startswith('ETFS INTERN'):
+            path = 'etfs-global'
+        elif primary.startswith('ETFS'):
+            path = 'etfs'
+        elif primary.startswith('STOCKS'):
+            path = 'stocks'
+        elif primary.startswith('BDRS'):
+            path = 'bdrs'
+        else:
+            return None
+    return build_asset_url(path, code)
+
+
+def resolve_indexed_asset_url(
+    code: str,
+    table_name: str,
+    time_budget: Optional[TimeBudget] = None,
+) -> Optional[str]:
+    guessed_url = resolve_asset_url(code, table_name)
+    try:
+        probe_budget = time_budget.clamp_timeout(10) if time_budget else 10
+    except ProcessingTimeoutError:
+        return guessed_url
+    try:
+        return ASSET_URL_INDEX.resolve(code, guessed_url, probe_budget)
+    except Exception as index_error:
+        logger.warning("Asset URL index lookup failed: %s", index_error, asset=code, stage="data-com")
+        return guessed_url
+
+
+def lookup_indexed_asset_url(code: str, table_name: str) -> Optional[str]:
+    index_entry = ASSET_URL_INDEX.lookup(code)
+    if index_entry:
+        return index_entry.asset_url
+    return resolve_asset_url(code, table_name)
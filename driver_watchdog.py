@@ -0,0 +1,325 @@
+from __future__ import annotations
+
+import os
+import signal
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+from structured_logging import get_logger
+
+CHROMEDRIVER_PROCESS_NAME = "chromedriver"
+CHROME_PROCESS_PREFIXES = ("chrome", "google-chrome")
+# Set in the environment of every chromedriver started by setup_driver; Chrome inherits it, so
+# the orphan reaper can tell this app's browsers from any other Chrome on the host.
+DRIVER_TAG_VARIABLE = "INVESTIDOR10_SELENIUM_DRIVER"
+DRIVER_TAG_VALUE = "1"
+
+_WATCHDOG: Optional["DriverWatchdog"] = None
+_WATCHDOG_LOCK = threading.Lock()
+
+logger = get_logger("driver_watchdog", stage="watchdog")
+
+
+@dataclass
+class TrackedDriver:
+    driver: object
+    service_pid: int
+    owner_thread: threading.Thread
+    started_at: float
+
+
+class DriverWatchdog:
+    def __init__(
+        self,
+        max_rss_bytes: int = 1024 * 1024 * 1024,
+        max_lifetime_seconds: float = 900.0,
+        reap_interval_seconds: float = 60.0,
+        orphan_grace_seconds: float = 120.0,
+        reap_orphans: bool = False,
+    ) -> None:
+        self._max_rss_bytes = max_rss_bytes
+        self._max_lifetime_seconds = max_lifetime_seconds
+        self._reap_interval_seconds = reap_interval_seconds
+        self._orphan_grace_seconds = orphan_grace_seconds
+        self._reap_orphans = reap_orphans
+        self._lock = threading.Lock()
+        self._tracked: Dict[int, TrackedDriver] = {}
+        self._metrics: Dict[str, int] = {
+            "spawned": 0,
+            "quit": 0,
+            "recycled_rss": 0,
+            "recycled_lifetime": 0,
+            "killed_abandoned": 0,
+            "killed_over_limit": 0,
+            "orphans_reaped": 0,
+            "released_cancelled": 0,
+        }
+        self._reaper: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        if not os.path.isdir("/proc"):
+            return
+        with self._lock:
+            if self._reaper is None or not self._reaper.is_alive():
+                self._reaper = threading.Thread(target=self._run, name="driver-watchdog", daemon=True)
+                self._reaper.start()
+
+    def register(self, driver) -> None:
+        service_pid = _get_service_pid(driver)
+        if service_pid is None:
+            return
+        with self._lock:
+            self._tracked[id(driver)] = TrackedDriver(
+                driver=driver,
+                service_pid=service_pid,
+                owner_thread=threading.current_thread(),
+                started_at=time.monotonic(),
+            )
+            self._metrics["spawned"] += 1
+        self.start()
+
+    def quit(self, driver) -> None:
+        """Quit the driver and kill whatever the quit left behind."""
+        with self._lock:
+            tracked_driver = self._tracked.pop(id(driver), None)
+            self._metrics["quit"] += 1
+        leftover_pids = _list_process_tree(tracked_driver.service_pid) if tracked_driver else []
+        try:
+            driver.quit()
+        except Exception as quit_error:
+            logger.warning("Driver quit failed: %s", quit_error)
+        _kill_processes([pid for pid in leftover_pids if _is_alive(pid)])
+
+    def release_thread_drivers(self, owner_thread: threading.Thread) -> int:
+        """Kill every driver opened by a thread whose work was cancelled."""
+        with self._lock:
+            released_drivers = [
+                (driver_key, tracked_driver)
+                for driver_key, tracked_driver in self._tracked.items()
+                if tracked_driver.owner_thread is owner_thread
+            ]
+            for driver_key, _ in released_drivers:
+                del self._tracked[driver_key]
+            self._metrics["released_cancelled"] += len(released_drivers)
+        for _, tracked_driver in released_drivers:
+            logger.info("Releasing chromedriver %d of cancelled work.", tracked_driver.service_pid)
+            _kill_processes(_list_process_tree(tracked_driver.service_pid))
+        return len(released_drivers)
+
+    def recycle_reason(self, driver) -> Optional[str]:
+        """Return why the driver should be replaced before its next page, or None."""
+        with self._lock:
+            tracked_driver = self._tracked.get(id(driver))
+        if tracked_driver is None:
+            return None
+        if time.monotonic() - tracked_driver.started_at > self._max_lifetime_seconds:
+            self._increment("recycled_lifetime")
+            return "lifetime"
+        if _read_tree_rss_bytes(tracked_driver.service_pid) > self._max_rss_bytes:
+            self._increment("recycled_rss")
+            return "rss"
+        return None
+
+    def snapshot(self) -> Dict[str, object]:
+        with self._lock:
+            tracked_drivers = list(self._tracked.values())
+            metrics = dict(self._metrics)
+        now = time.monotonic()
+        return {
+            "max_rss_mb": self._max_rss_bytes // (1024 * 1024),
+            "max_lifetime_seconds": self._max_lifetime_seconds,
+            "open_drivers": [
+                {
+                    "service_pid": tracked_driver.service_pid,
+                    "owner_thread": tracked_driver.owner_thread.name,
+                    "age_seconds": round(now - tracked_driver.started_at, 1),
+                    "rss_mb": round(_read_tree_rss_bytes(tracked_driver.service_pid) / (1024 * 1024), 1),
+                }
+                for tracked_driver in tracked_drivers
+            ],
+            "metrics": metrics,
+        }
+
+    def reap(self) -> None:
+        """Kill abandoned or runaway drivers and orphaned Chrome processes."""
+        with self._lock:
+            tracked_drivers = list(self._tracked.items())
+        now = time.monotonic()
+        for driver_key, tracked_driver in tracked_drivers:
+            if not tracked_driver.owner_thread.is_alive():
+                kill_reason = "killed_abandoned"
+            elif (
+                now - tracked_driver.started_at > 2 * self._max_lifetime_seconds
+                or _read_tree_rss_bytes(tracked_driver.service_pid) > 2 * self._max_rss_bytes
+            ):
+                kill_reason = "killed_over_limit"
+            else:
+                continue
+            with self._lock:
+                if self._tracked.pop(driver_key, None) is None:
+                    continue
+                self._metrics[kill_reason] += 1
+            logger.warning("Killing chromedriver %d (%s).", tracked_driver.service_pid, kill_reason)
+            _kill_processes(_list_process_tree(tracked_driver.service_pid))
+
+        if self._reap_orphans:
+            self._reap_orphaned_processes()
+
+    def _reap_orphaned_processes(self) -> None:
+        with self._lock:
+            tracked_pids = {tracked_driver.service_pid for tracked_driver in self._tracked.values()}
+        orphan_parents = {1, os.getpid()}
+        for pid, parent_pid, process_name, age_seconds in _list_processes():
+            if pid in tracked_pids or parent_pid not in orphan_parents:
+                continue
+            if age_seconds < self._orphan_grace_seconds or not _is_driver_root_process(pid, process_name):
+                continue
+            logger.warning("Reaping orphaned %s %d.", process_name, pid)
+            _kill_processes(_list_process_tree(pid))
+            self._increment("orphans_reaped")
+
+    def _increment(self, metric_name: str) -> None:
+        with self._lock:
+            self._metrics[metric_name] += 1
+
+    def _run(self) -> None:
+        while True:
+            time.sleep(self._reap_interval_seconds)
+            try:
+                self.reap()
+            except Exception as reap_error:
+                logger.error("Reap failed: %s", reap_error)
+
+
+def get_driver_watchdog() -> DriverWatchdog:
+    global _WATCHDOG
+    with _WATCHDOG_LOCK:
+        if _WATCHDOG is None:
+            _WATCHDOG = DriverWatchdog(
+                max_rss_bytes=int(float(os.environ.get("SELENIUM_DRIVER_MAX_RSS_MB", "1024")) * 1024 * 1024),
+                max_lifetime_seconds=float(os.environ.get("SELENIUM_DRIVER_MAX_LIFETIME_SECONDS", "900")),
+                reap_interval_seconds=float(os.environ.get("SELENIUM_REAP_INTERVAL_SECONDS", "60")),
+                orphan_grace_seconds=float(os.environ.get("SELENIUM_ORPHAN_GRACE_SECONDS", "120")),
+                reap_orphans=os.environ.get("SELENIUM_REAP_ORPHANS", "false").strip().lower()
+                not in {"false", "0", "no", "off"},
+            )
+        return _WATCHDOG
+
+
+def tagged_driver_environment() -> Dict[str, str]:
+    """Return the environment to start chromedriver with, carrying the tag the orphan reaper looks for."""
+    return {**os.environ, DRIVER_TAG_VARIABLE: DRIVER_TAG_VALUE}
+
+
+def list_process_tree(root_pid: int) -> List[Tuple[int, str]]:
+    """Return (pid, name) for the process and all of its descendants."""
+    processes = _list_processes()
+    names = {pid: process_name for pid, _, process_name, _ in processes}
+    tree = {root_pid}
+    changed = True
+    while changed:
+        changed = False
+        for pid, parent_pid, _, _ in processes:
+            if parent_pid in tree and pid not in tree:
+                tree.add(pid)
+                changed = True
+    return [(pid, names.get(pid, "")) for pid in tree]
+
+
+def read_rss_bytes(pid: int) -> int:
+    try:
+        with open(f"/proc/{pid}/status", "r", encoding="utf-8") as status_file:
+            for line in status_file:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        return 0
+    return 0
+
+
+def is_chrome_process_name(process_name: str) -> bool:
+    return process_name.startswith(CHROME_PROCESS_PREFIXES)
+
+
+def _list_process_tree(root_pid: int) -> List[int]:
+    return [pid for pid, _ in list_process_tree(root_pid)]
+
+
+def _read_tree_rss_bytes(root_pid: int) -> int:
+    return sum(read_rss_bytes(pid) for pid in _list_process_tree(root_pid))
+
+
+def _list_processes() -> List[Tuple[int, int, str, float]]:
+    """Return (pid, parent pid, name, age in seconds) for every visible process."""
+    if not os.path.isdir("/proc"):
+        return []
+    clock_ticks = os.sysconf("SC_CLK_TCK")
+    try:
+        with open("/proc/uptime", "r", encoding="utf-8") as uptime_file:
+            uptime_seconds = float(uptime_file.read().split()[0])
+    except OSError:
+        uptime_seconds = 0.0
+    processes = []
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat", "r", encoding="utf-8") as stat_file:
+                stat_line = stat_file.read()
+        except OSError:
+            continue
+        process_name = stat_line[stat_line.index("(") + 1:stat_line.rindex(")")]
+        stat_fields = stat_line[stat_line.rindex(")") + 2:].split()
+        age_seconds = uptime_seconds - int(stat_fields[19]) / clock_ticks
+        processes.append((int(entry), int(stat_fields[1]), process_name, age_seconds))
+    return processes
+
+
+def _is_driver_root_process(pid: int, process_name: str) -> bool:
+    if process_name == CHROMEDRIVER_PROCESS_NAME:
+        return _carries_driver_tag(pid)
+    if not is_chrome_process_name(process_name):
+        return False
+    try:
+        with open(f"/proc/{pid}/cmdline", "rb") as cmdline_file:
+            arguments = cmdline_file.read().split(b"\0")
+    except OSError:
+        return False
+    is_child_process = any(argument.startswith(b"--type=") for argument in arguments)
+    return b"--headless" in arguments and not is_child_process and _carries_driver_tag(pid)
+
+
+def _carries_driver_tag(pid: int) -> bool:
+    try:
+        with open(f"/proc/{pid}/environ", "rb") as environ_file:
+            variables = environ_file.read().split(b"\0")
+    except OSError:
+        return False
+    return f"{DRIVER_TAG_VARIABLE}={DRIVER_TAG_VALUE}".encode("utf-8") in variables
+
+
+def _get_service_pid(driver) -> Optional[int]:
+    try:
+        return driver.service.process.pid
+    except AttributeError:
+        return None
+
+
+def _is_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except OSError:
+        return False
+    return True
+
+
+def _kill_processes(pids: List[int]) -> None:
+    for pid in pids:
+        if pid == os.getpid():
+            continue
+        try:
+            os.kill(pid, signal.SIGKILL)
+        except OSError:
+            pass
@@ -0,0 +1,55 @@
+import importlib
+import threading
+from types import ModuleType
+from typing import Dict, List
+
+from structured_logging import get_logger
+
+logger = get_logger("extraction_backends")
+
+
+class BackendUnavailableError(Exception):
+    """Raised when an extraction backend cannot be imported in this environment."""
+
+
+class ExtractionBackendRegistry:
+    def __init__(self) -> None:
+        self._module_names: Dict[str, str] = {}
+        self._loaded_backends: Dict[str, ModuleType] = {}
+        self._lock = threading.Lock()
+
+    def register(self, backend_name: str, module_name: str) -> None:
+        with self._lock:
+            self._module_names[backend_name] = module_name
+
+    def get(self, backend_name: str) -> ModuleType:
+        with self._lock:
+            loaded_backend = self._loaded_backends.get(backend_name)
+            if loaded_backend is not None:
+                return loaded_backend
+            module_name = self._module_names.get(backend_name)
+            if module_name is None:
+                raise BackendUnavailableError(f"Backend '{backend_name}' is not registered.")
+            try:
+                backend_module = importlib.import_module(module_name)
+            except ImportError as import_error:
+                raise BackendUnavailableError(
+                    f"Backend '{backend_name}' could not be loaded: {import_error}"
+                ) from import_error
+            initialize_backend = getattr(backend_module, "initialize_backend", None)
+            if callable(initialize_backend):
+                initialize_backend()
+            self._loaded_backends[backend_name] = backend_module
+            logger.info("Extraction backend '%s' loaded from %s.", backend_name, module_name)
+            return backend_module
+
+    def describe(self) -> List[Dict[str, object]]:
+        with self._lock:
+            return [
+                {
+                    "name": backend_name,
+                    "module": module_name,
+                    "loaded": backend_name in self._loaded_backends,
+                }
+                for backend_name, module_name in self._module_names.items()
+            ]
@@ -0,0 +1,9 @@
+"""Gunicorn settings picked up from the working directory (``gunicorn main:app``)."""
+
+
+def post_worker_init(worker):
+    # The watchdog is started by the entry points rather than on import, so processes that
+    # merely import main (such as spawned HTML parser processes) do not run a reaper.
+    from driver_watchdog import get_driver_watchdog
+
+    get_driver_watchdog().start()
@@ -0,0 +1,178 @@
+from __future__ import annotations
+
+import gzip
+import hashlib
+import importlib
+import importlib.util
+import os
+import sqlite3
+import threading
+import time
+from typing import Iterator, Optional, Tuple
+
+from structured_logging import get_logger
+
+ARCHIVE_MODE_OFF = "off"
+ARCHIVE_MODE_RECORD = "record"
+ARCHIVE_MODE_REPLAY = "replay"
+
+_ARCHIVE: Optional["HtmlArchive"] = None
+_ARCHIVE_LOCK = threading.Lock()
+
+logger = get_logger("html_archive")
+
+
+class ArchivedPageMissingError(LookupError):
+    """Raised in replay mode when a page was never archived."""
+
+
+class HtmlArchive:
+    def __init__(self, root_directory: str, compression: str = "gzip") -> None:
+        self._root_directory = root_directory
+        self._compression = compression if compression == "zstd" and _load_zstandard() else "gzip"
+        self._lock = threading.Lock()
+        os.makedirs(os.path.join(root_directory, "objects"), exist_ok=True)
+        self._connection = sqlite3.connect(
+            os.path.join(root_directory, "index.sqlite3"),
+            check_same_thread=False,
+        )
+        with self._lock, self._connection:
+            self._connection.execute(
+                """
+                CREATE TABLE IF NOT EXISTS archived_pages (
+                    url TEXT NOT NULL,
+                    content_hash TEXT NOT NULL,
+                    compression TEXT NOT NULL,
+                    fetched_at REAL NOT NULL
+                )
+                """
+            )
+            self._connection.execute(
+                "CREATE INDEX IF NOT EXISTS archived_pages_by_url ON archived_pages (url, fetched_at)"
+            )
+
+    def store(self, url: str, html_content: str) -> str:
+        raw_content = html_content.encode("utf-8")
+        content_hash = hashlib.sha256(raw_content).hexdigest()
+        object_path = self._object_path(content_hash, self._compression)
+        if not os.path.exists(object_path):
+            os.makedirs(os.path.dirname(object_path), exist_ok=True)
+            temporary_path = f"{object_path}.{threading.get_ident()}.tmp"
+            with open(temporary_path, "wb") as object_file:
+                object_file.write(_compress(raw_content, self._compression))
+            os.replace(temporary_path, object_path)
+        with self._lock, self._connection:
+            self._connection.execute(
+                "INSERT INTO archived_pages (url, content_hash, compression, fetched_at) VALUES (?, ?, ?, ?)",
+                (url, content_hash, self._compression, time.time()),
+            )
+        return content_hash
+
+    def load_latest(self, url: str, fetched_before: Optional[float] = None) -> Optional[str]:
+        with self._lock:
+            index_row = self._connection.execute(
+                """
+                SELECT content_hash, compression FROM archived_pages
+                WHERE url = ? AND fetched_at <= ?
+                ORDER BY fetched_at DESC LIMIT 1
+                """,
+                (url, fetched_before if fetched_before is not None else time.time()),
+            ).fetchone()
+        if not index_row:
+            return None
+        return self.load_content(index_row[0], index_row[1])
+
+    def has_page(self, url: str) -> bool:
+        with self._lock:
+            index_row = self._connection.execute(
+                "SELECT 1 FROM archived_pages WHERE url = ? LIMIT 1",
+                (url,),
+            ).fetchone()
+        return index_row is not None
+
+    def load_content(self, content_hash: str, compression: str) -> str:
+        with open(self._object_path(content_hash, compression), "rb") as object_file:
+            return _decompress(object_file.read(), compression).decode("utf-8")
+
+    def iter_latest_pages(self, url_prefix: str = "") -> Iterator[Tuple[str, float, str]]:
+        with self._lock:
+            index_rows = self._connection.execute(
+                """
+                SELECT url, MAX(fetched_at), content_hash, compression FROM archived_pages
+                WHERE url LIKE ? GROUP BY url ORDER BY url
+                """,
+                (f"{url_prefix}%",),
+            ).fetchall()
+        for url, fetched_at, content_hash, compression in index_rows:
+            yield url, fetched_at, self.load_content(content_hash, compression)
+
+    def _object_path(self, content_hash: str, compression: str) -> str:
+        extension = "html.zst" if compression == "zstd" else "html.gz"
+        return os.path.join(
+            self._root_directory, "objects", content_hash[:2], f"{content_hash}.{extension}"
+        )
+
+
+def get_archive_mode() -> str:
+    raw_mode = os.environ.get("HTML_ARCHIVE_MODE", ARCHIVE_MODE_OFF).strip().lower()
+    if raw_mode in (ARCHIVE_MODE_RECORD, ARCHIVE_MODE_REPLAY):
+        return raw_mode
+    return ARCHIVE_MODE_OFF
+
+
+def is_record_mode() -> bool:
+    return get_archive_mode() == ARCHIVE_MODE_RECORD
+
+
+def is_replay_mode() -> bool:
+    return get_archive_mode() == ARCHIVE_MODE_REPLAY
+
+
+def get_html_archive() -> Optional[HtmlArchive]:
+    global _ARCHIVE
+    if get_archive_mode() == ARCHIVE_MODE_OFF:
+        return None
+    with _ARCHIVE_LOCK:
+        if _ARCHIVE is None:
+            _ARCHIVE = HtmlArchive(
+                os.environ.get("HTML_ARCHIVE_DIR", os.path.join("data", "html_archive")),
+                os.environ.get("HTML_ARCHIVE_COMPRESSION", "gzip").strip().lower(),
+            )
+        return _ARCHIVE
+
+
+def replay_archived_html(url: str) -> Optional[str]:
+    """Return the archived page in replay mode; None when the live page should be fetched."""
+    if not is_replay_mode():
+        return None
+    archived_html = get_html_archive().load_latest(url)
+    if archived_html is None:
+        raise ArchivedPageMissingError(f"Page not archived: {url}")
+    return archived_html
+
+
+def archive_fetched_html(url: str, html_content: str) -> None:
+    if not is_record_mode():
+        return
+    try:
+        get_html_archive().store(url, html_content)
+    except Exception as archive_error:
+        logger.warning("Unable to archive HTML for %s: %s", url, archive_error)
+
+
+def _load_zstandard():
+    if importlib.util.find_spec("zstandard") is None:
+        return None
+    return importlib.import_module("zstandard")
+
+
+def _compress(raw_content: bytes, compression: str) -> bytes:
+    if compression == "zstd":
+        return _load_zstandard().ZstdCompressor(level=10).compress(raw_content)
+    return gzip.compress(raw_content, compresslevel=6)
+
+
+def _decompress(compressed_content: bytes, compression: str) -> bytes:
+    if compression == "zstd":
+        return _load_zstandard().ZstdDecompressor().decompress(compressed_content)
+    return gzip.decompress(compressed_content)
@@ -0,0 +1,60 @@
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Callable, Optional, TypeVar
+
+from structured_logging import get_logger
+
+ParseResult = TypeVar("ParseResult")
+
+_PARSE_POOL: Optional[ProcessPoolExecutor] = None
+_PARSE_POOL_LOCK = threading.Lock()
+
+logger = get_logger("html_parse_pool")
+
+
+def resolve_parse_process_count() -> int:
+    raw_value = os.environ.get("HTML_PARSE_PROCESSES", "0").strip().lower()
+    if raw_value == "auto":
+        return max(1, (os.cpu_count() or 1) - 1)
+    try:
+        return max(0, int(raw_value))
+    except ValueError:
+        return 0
+
+
+def get_parse_pool() -> Optional[ProcessPoolExecutor]:
+    global _PARSE_POOL
+    process_count = resolve_parse_process_count()
+    if process_count <= 0:
+        return None
+    with _PARSE_POOL_LOCK:
+        if _PARSE_POOL is None:
+            _PARSE_POOL = ProcessPoolExecutor(
+                max_workers=process_count,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _PARSE_POOL
+
+
+def shutdown_parse_pool() -> None:
+    global _PARSE_POOL
+    with _PARSE_POOL_LOCK:
+        if _PARSE_POOL is not None:
+            _PARSE_POOL.shutdown(wait=False, cancel_futures=True)
+            _PARSE_POOL = None
+
+
+def run_html_parser(parse_function: Callable[[str], ParseResult], html_content: str) -> ParseResult:
+    """Run a module-level parser in the process pool when enabled, otherwise in this thread."""
+    parse_pool = get_parse_pool()
+    if parse_pool is None:
+        return parse_function(html_content)
+    try:
+        return parse_pool.submit(parse_function, html_content).result()
+    except BrokenProcessPool as pool_error:
+        logger.warning("HTML parse pool unavailable, parsing in thread: %s", pool_error)
+        shutdown_parse_pool()
+        return parse_function(html_content)
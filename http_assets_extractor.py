@@ -4,6 +4,12 @@ from typing import List, Optional, Dict
 
 import requests
 
+from html_archive import archive_fetched_html, replay_archived_html
+from html_parse_pool import run_html_parser
+from structured_logging import get_logger
+
+logger = get_logger("http_assets_extractor")
+
 DEFAULT_REQUEST_HEADERS = {
     "User-Agent": (
         "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
@@ -17,9 +23,12 @@ DEFAULT_REQUEST_HEADERS = {
 
 def extract_assets_via_http(wallet_url: str, request_timeout_seconds: float | None = None) -> List[Dict[str, str]]:
     html_content = fetch_wallet_html(wallet_url, request_timeout_seconds)
-    return build_assets_from_static_html(html_content)
+    return run_html_parser(build_assets_from_static_html, html_content)
 
 def fetch_wallet_html(wallet_url: str, request_timeout_seconds: float | None = None) -> str:
+    archived_html = replay_archived_html(wallet_url)
+    if archived_html is not None:
+        return archived_html
     response = requests.get(
         wallet_url,
         timeout=request_timeout_seconds or 30,
@@ -28,13 +37,14 @@ def fetch_wallet_html(wallet_url: str, request_timeout_seconds: float | None = N
     if response.status_code == 403:
         raise requests.HTTPError("Forbidden while fetching wallet HTML", response=response)
     response.raise_for_status()
+    archive_fetched_html(wallet_url, response.text)
     return response.text
 
 
 def build_assets_from_static_html(html_content: str) -> List[Dict[str, str]]:
     beautiful_soup_constructor = load_beautiful_soup_constructor()
     if beautiful_soup_constructor is None:
-        print("BeautifulSoup not available. Skipping HTTP asset parsing.")
+        logger.warning("BeautifulSoup not available. Skipping HTTP asset parsing.", stage="assets")
         return []
 
     soup = beautiful_soup_constructor(html_content, "html.parser")
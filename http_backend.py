@@ -0,0 +1,4 @@
+from http_assets_extractor import extract_assets_via_http
+from http_dividends_extractor import extract_dividend_history_via_http
+
+__all__ = ["extract_assets_via_http", "extract_dividend_history_via_http"]
@@ -3,14 +3,27 @@ from typing import List
 
 import requests
 
+from dividend_history import AssetPageNotFoundError, DividendHistoryEntry, parse_dividend_history_row
+from html_archive import archive_fetched_html, replay_archived_html
+from html_parse_pool import run_html_parser
 from http_assets_extractor import DEFAULT_REQUEST_HEADERS, load_beautiful_soup_constructor
 
 
 def extract_dividend_dates_via_http(asset_url: str, request_timeout_seconds: float | None = None) -> List[datetime.date]:
+    return [entry.date_com for entry in extract_dividend_history_via_http(asset_url, request_timeout_seconds)]
+
+
+def extract_dividend_history_via_http(
+    asset_url: str,
+    request_timeout_seconds: float | None = None,
+) -> List[DividendHistoryEntry]:
     page_html = _download_asset_page_html(asset_url, request_timeout_seconds)
     if not page_html:
         return []
+    return run_html_parser(parse_dividend_history_from_html, page_html)
+
 
+def parse_dividend_history_from_html(page_html: str) -> List[DividendHistoryEntry]:
     beautiful_soup_constructor = load_beautiful_soup_constructor()
     if beautiful_soup_constructor is None:
         return []
@@ -20,28 +33,27 @@ def extract_dividend_dates_via_http(asset_url: str, request_timeout_seconds: flo
     if dividends_table is None:
         return []
 
-    parsed_dates: List[datetime.date] = []
+    history_entries: List[DividendHistoryEntry] = []
     for row in dividends_table.select("tbody tr"):
-        date_cells = row.find_all("td")
-        if len(date_cells) < 2:
-            continue
-        parsed_date = _parse_brazilian_date(date_cells[1].get_text(strip=True))
-        if parsed_date:
-            parsed_dates.append(parsed_date)
-    return parsed_dates
+        cell_values = [cell.get_text(strip=True) for cell in row.find_all("td")]
+        history_entry = parse_dividend_history_row(cell_values)
+        if history_entry:
+            history_entries.append(history_entry)
+    return history_entries
+
 
 def _download_asset_page_html(asset_url: str, request_timeout_seconds: float | None = None) -> str:
+    archived_html = replay_archived_html(asset_url)
+    if archived_html is not None:
+        return archived_html
     response = requests.get(
         asset_url,
         headers=DEFAULT_REQUEST_HEADERS,
         timeout=request_timeout_seconds or 30,
     )
+    if response.status_code in (404, 410):
+        raise AssetPageNotFoundError(f"Asset page not found: {asset_url}")
     response.raise_for_status()
+    archive_fetched_html(asset_url, response.text)
     return response.text
 
-
-def _parse_brazilian_date(date_value: str) -> datetime.date | None:
-    try:
-        return datetime.datetime.strptime(date_value, "%d/%m/%Y").date()
-    except Exception:
-        return None
@@ -0,0 +1,329 @@
+"""Drive the API with concurrent /data-com wallets against a local stub Investidor10 server.
+
+Examples:
+    python load_test.py --wallets 8 --assets-per-wallet 40 --label workers-1 --report reports/workers-1.json
+    python load_test.py --api-url http://localhost:5090 --api-pid 1234 --wallets 4
+    python load_test.py --wallets 2 --render-mode js --label selenium-path
+    python load_test.py --compare reports/workers-1.json reports/workers-2.json
+"""
+import argparse
+import json
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+
+import requests
+
+from data_com_jobs import FINISHED_JOB_STATUSES
+from driver_watchdog import CHROMEDRIVER_PROCESS_NAME, is_chrome_process_name, list_process_tree, read_rss_bytes
+
+RENDER_MODES = ("static", "js")
+
+
+class StubInvestidor10Handler(BaseHTTPRequestHandler):
+    assets_per_wallet = 20
+    latency_seconds = 0.0
+    render_mode = "static"
+
+    def do_HEAD(self) -> None:
+        self._respond(include_body=False)
+
+    def do_GET(self) -> None:
+        self._respond(include_body=True)
+
+    def _respond(self, include_body: bool) -> None:
+        if self.latency_seconds:
+            time.sleep(self.latency_seconds)
+        path_parts = [part for part in self.path.split("/") if part]
+        if len(path_parts) == 2 and path_parts[0] == "carteira":
+            body = self._render(self._build_wallet_page(path_parts[1]))
+        elif len(path_parts) == 2 and path_parts[0] == "acoes":
+            body = self._render(self._build_asset_page())
+        else:
+            self.send_response(404)
+            self.end_headers()
+            return
+        encoded_body = body.encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(encoded_body)))
+        self.end_headers()
+        if include_body:
+            self.wfile.write(encoded_body)
+
+    def _render(self, table_html: str) -> str:
+        if self.render_mode != "js":
+            return f"<html><body>{table_html}</body></html>"
+        # The table only exists after the script runs, so the static HTTP path finds nothing
+        # and every wallet and asset goes through Selenium.
+        return (
+            '<html><body><div id="stub-root"></div><script>'
+            f"document.getElementById('stub-root').innerHTML = {json.dumps(table_html)};"
+            "</script></body></html>"
+        )
+
+    def _build_wallet_page(self, wallet_id: str) -> str:
+        rows = "".join(
+            f"<tr><td>W{wallet_id}A{asset_index}</td><td>{asset_index + 1}</td><td>R$ 10,00</td></tr>"
+            for asset_index in range(self.assets_per_wallet)
+        )
+        return (
+            "<table><thead><tr><th>Ativo</th><th>Quantidade</th><th>Preço Médio</th>"
+            f"</tr></thead><tbody>{rows}</tbody></table>"
+        )
+
+    def _build_asset_page(self) -> str:
+        today = date.today()
+        rows = "".join(
+            f"<tr><td>Dividendos</td><td>{(today + timedelta(days=30 - 90 * index)).strftime('%d/%m/%Y')}</td>"
+            f"<td>{(today + timedelta(days=45 - 90 * index)).strftime('%d/%m/%Y')}</td><td>0,{index + 10:02d}</td></tr>"
+            for index in range(12)
+        )
+        return f'<table id="table-dividends-history"><tbody>{rows}</tbody></table>'
+
+    def log_message(self, *_) -> None:
+        return
+
+
+class ProcessTreeSampler:
+    def __init__(self, root_pid: int, interval_seconds: float = 0.2) -> None:
+        self._root_pid = root_pid
+        self._interval_seconds = interval_seconds
+        self._stop_event = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self.peak_rss_bytes = 0
+        self.peak_chrome_rss_bytes = 0
+        self.peak_driver_count = 0
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop_event.set()
+        self._thread.join()
+
+    def _run(self) -> None:
+        while not self._stop_event.is_set():
+            self.sample()
+            self._stop_event.wait(self._interval_seconds)
+
+    def sample(self) -> None:
+        total_rss = 0
+        chrome_rss = 0
+        driver_count = 0
+        for pid, process_name in list_process_tree(self._root_pid):
+            process_rss = read_rss_bytes(pid)
+            total_rss += process_rss
+            if process_name == CHROMEDRIVER_PROCESS_NAME or is_chrome_process_name(process_name):
+                chrome_rss += process_rss
+            if process_name == CHROMEDRIVER_PROCESS_NAME:
+                driver_count += 1
+        self.peak_rss_bytes = max(self.peak_rss_bytes, total_rss)
+        self.peak_chrome_rss_bytes = max(self.peak_chrome_rss_bytes, chrome_rss)
+        self.peak_driver_count = max(self.peak_driver_count, driver_count)
+
+
+def _percentile(sorted_values: List[float], percentile: float) -> Optional[float]:
+    if not sorted_values:
+        return None
+    rank = min(len(sorted_values) - 1, max(0, round(percentile / 100 * (len(sorted_values) - 1))))
+    return sorted_values[rank]
+
+
+def start_stub_server(
+    assets_per_wallet: int,
+    latency_seconds: float,
+    port: int = 0,
+    render_mode: str = "static",
+) -> ThreadingHTTPServer:
+    StubInvestidor10Handler.assets_per_wallet = assets_per_wallet
+    StubInvestidor10Handler.latency_seconds = latency_seconds
+    StubInvestidor10Handler.render_mode = render_mode
+    stub_server = ThreadingHTTPServer(("0.0.0.0", port), StubInvestidor10Handler)
+    threading.Thread(target=stub_server.serve_forever, daemon=True).start()
+    return stub_server
+
+
+def start_local_api(stub_base_url: str) -> str:
+    data_directory = tempfile.mkdtemp(prefix="investidor10-load-")
+    os.environ["INVESTIDOR10_BASE_URL"] = stub_base_url
+    os.environ.setdefault("ENABLE_SWAGGER", "false")
+    for variable_name, file_name in (
+        ("DIVIDEND_HISTORY_DB_PATH", "dividend_history.sqlite3"),
+        ("ASSET_URL_INDEX_DB_PATH", "asset_url_index.sqlite3"),
+        ("WALLET_SNAPSHOT_DB_PATH", "wallet_snapshots.sqlite3"),
+    ):
+        os.environ[variable_name] = os.path.join(data_directory, file_name)
+
+    from werkzeug.serving import make_server
+
+    import main
+
+    api_server = make_server("127.0.0.1", 0, main.app, threaded=True)
+    threading.Thread(target=api_server.serve_forever, daemon=True).start()
+    return f"http://127.0.0.1:{api_server.server_port}"
+
+
+def run_wallet(api_url: str, wallet_url: str, use_async: bool, timeout_seconds: float) -> Dict[str, object]:
+    started_at = time.perf_counter()
+    parameters = {
+        "wallet_url": wallet_url,
+        "async": "true" if use_async else "false",
+        "timeout_seconds": timeout_seconds,
+    }
+    try:
+        response = requests.get(f"{api_url}/data-com", params=parameters, timeout=timeout_seconds + 30)
+        payload = response.json()
+        if use_async and response.ok:
+            job_id = payload["job_id"]
+            poll_deadline = time.monotonic() + timeout_seconds + 30
+            while True:
+                time.sleep(0.5)
+                status_response = requests.get(
+                    f"{api_url}/data-com/status", params={"job_id": job_id}, timeout=30
+                )
+                payload = status_response.json()
+                if not status_response.ok or payload.get("status") in FINISHED_JOB_STATUSES:
+                    break
+                if time.monotonic() > poll_deadline:
+                    payload["status"] = "timeout"
+                    break
+        succeeded = response.ok and payload.get("status", "completed") == "completed"
+    except (requests.RequestException, ValueError) as request_error:
+        payload = {"error": str(request_error)}
+        succeeded = False
+    return {
+        "wallet_url": wallet_url,
+        "latency_seconds": time.perf_counter() - started_at,
+        "succeeded": succeeded,
+        "results": len(payload.get("results", []) or []),
+        "failures": len(payload.get("failures", []) or []),
+    }
+
+
+def run_load_test(arguments: argparse.Namespace) -> Dict[str, object]:
+    stub_server = start_stub_server(
+        arguments.assets_per_wallet, arguments.stub_latency_ms / 1000, arguments.stub_port, arguments.render_mode
+    )
+    stub_base_url = arguments.stub_url or f"http://127.0.0.1:{stub_server.server_port}"
+    api_url = arguments.api_url or start_local_api(stub_base_url)
+    sampler = ProcessTreeSampler(arguments.api_pid or os.getpid())
+    wallet_urls = [
+        f"{stub_base_url}/carteira/{round_index * arguments.wallets + wallet_index}/"
+        for round_index in range(arguments.rounds)
+        for wallet_index in range(arguments.wallets)
+    ]
+
+    sampler.start()
+    started_at = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=arguments.wallets) as executor:
+        wallet_reports = list(executor.map(
+            lambda wallet_url: run_wallet(api_url, wallet_url, arguments.use_async, arguments.timeout_seconds),
+            wallet_urls,
+        ))
+    elapsed_seconds = time.perf_counter() - started_at
+    sampler.stop()
+    stub_server.shutdown()
+
+    latencies = sorted(report["latency_seconds"] for report in wallet_reports)
+    completed_wallets = sum(1 for report in wallet_reports if report["succeeded"])
+    return {
+        "label": arguments.label,
+        "configuration": {
+            "wallets": arguments.wallets,
+            "rounds": arguments.rounds,
+            "assets_per_wallet": arguments.assets_per_wallet,
+            "async": arguments.use_async,
+            "stub_latency_ms": arguments.stub_latency_ms,
+            "render_mode": arguments.render_mode,
+            "api_url": arguments.api_url or "in-process",
+        },
+        "elapsed_seconds": elapsed_seconds,
+        "completed_wallets": completed_wallets,
+        "failed_wallets": len(wallet_reports) - completed_wallets,
+        "throughput_wallets_per_second": completed_wallets / elapsed_seconds if elapsed_seconds else 0.0,
+        "throughput_assets_per_second": (
+            completed_wallets * arguments.assets_per_wallet / elapsed_seconds if elapsed_seconds else 0.0
+        ),
+        "latency_p50_seconds": _percentile(latencies, 50),
+        "latency_p95_seconds": _percentile(latencies, 95),
+        "latency_p99_seconds": _percentile(latencies, 99),
+        "peak_rss_mb": sampler.peak_rss_bytes / (1024 * 1024),
+        "peak_chrome_rss_mb": sampler.peak_chrome_rss_bytes / (1024 * 1024),
+        "peak_open_drivers": sampler.peak_driver_count,
+    }
+
+
+def compare_reports(report_paths: List[str]) -> None:
+    reports = []
+    for report_path in report_paths:
+        with open(report_path, "r", encoding="utf-8") as report_file:
+            reports.append(json.load(report_file))
+    metric_names = [
+        "completed_wallets",
+        "failed_wallets",
+        "throughput_wallets_per_second",
+        "latency_p50_seconds",
+        "latency_p95_seconds",
+        "latency_p99_seconds",
+        "peak_rss_mb",
+        "peak_chrome_rss_mb",
+        "peak_open_drivers",
+    ]
+    labels = [report.get("label") or os.path.basename(path) for report, path in zip(reports, report_paths)]
+    print(f"{'metric':32}" + "".join(f"{label:>20}" for label in labels))
+    for metric_name in metric_names:
+        values = []
+        for report in reports:
+            value = report.get(metric_name)
+            values.append(f"{value:>20.3f}" if isinstance(value, float) else f"{str(value):>20}")
+        print(f"{metric_name:32}" + "".join(values))
+
+
+def main() -> None:
+    argument_parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    argument_parser.add_argument("--wallets", type=int, default=4, help="Concurrent wallets.")
+    argument_parser.add_argument("--rounds", type=int, default=1, help="Wallets per concurrency slot.")
+    argument_parser.add_argument("--assets-per-wallet", type=int, default=20)
+    argument_parser.add_argument("--stub-latency-ms", type=float, default=50.0)
+    argument_parser.add_argument("--stub-port", type=int, default=0, help="Fixed port for the stub server.")
+    argument_parser.add_argument(
+        "--render-mode",
+        choices=RENDER_MODES,
+        default="static",
+        help="'js' renders the stub tables from a script only, forcing the Selenium path.",
+    )
+    argument_parser.add_argument("--stub-url", help="Stub base URL as seen from the API (with --api-url).")
+    argument_parser.add_argument("--timeout-seconds", type=float, default=300.0)
+    argument_parser.add_argument("--async", dest="use_async", action="store_true")
+    argument_parser.add_argument("--api-url", help="Existing API to drive instead of an in-process one.")
+    argument_parser.add_argument("--api-pid", type=int, help="Root PID to sample when using --api-url.")
+    argument_parser.add_argument("--label", default="")
+    argument_parser.add_argument("--report", help="Write the JSON report to this path.")
+    argument_parser.add_argument("--compare", nargs="+", metavar="REPORT")
+    arguments = argument_parser.parse_args()
+
+    if arguments.compare:
+        compare_reports(arguments.compare)
+        return
+
+    report = run_load_test(arguments)
+    report_json = json.dumps(report, indent=2)
+    print(report_json)
+    if arguments.report:
+        report_directory = os.path.dirname(arguments.report)
+        if report_directory:
+            os.makedirs(report_directory, exist_ok=True)
+        with open(arguments.report, "w", encoding="utf-8") as report_file:
+            report_file.write(report_json)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+from __future__ import annotations
+
+import threading
+from dataclasses import dataclass
+from datetime import date, timedelta
+from statistics import median
+from typing import Dict, List, Optional
+
+CACHED_PRIORITY = 0
+DUE_SOON_PRIORITY = 1
+UNKNOWN_PRIORITY = 2
+SLOW_PRIORITY = 3
+
+DUE_SOON_WINDOW_DAYS = 45
+SLOW_LOOKUP_SECONDS = 12.0
+
+
+@dataclass
+class AssetLookup:
+    asset_code: str
+    table_name: str
+    asset_url: Optional[str]
+    position: int
+    priority: int = UNKNOWN_PRIORITY
+    estimated_seconds: float = 0.0
+
+
+@dataclass
+class SeleniumFallback:
+    asset_code: str
+    asset_url: str
+    static_page_read: bool
+    static_seconds: float = 0.0
+
+
+class AssetLatencyTracker:
+    def __init__(self, default_seconds: float = 5.0, smoothing_factor: float = 0.3) -> None:
+        self._default_seconds = default_seconds
+        self._smoothing_factor = smoothing_factor
+        self._estimates: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def record(self, asset_url: str, elapsed_seconds: float) -> None:
+        with self._lock:
+            previous_estimate = self._estimates.get(asset_url)
+            if previous_estimate is None:
+                self._estimates[asset_url] = elapsed_seconds
+                return
+            self._estimates[asset_url] = (
+                self._smoothing_factor * elapsed_seconds
+                + (1 - self._smoothing_factor) * previous_estimate
+            )
+
+    def estimate(self, asset_url: Optional[str]) -> float:
+        if not asset_url:
+            return self._default_seconds
+        with self._lock:
+            return self._estimates.get(asset_url, self._default_seconds)
+
+    def is_known(self, asset_url: Optional[str]) -> bool:
+        if not asset_url:
+            return False
+        with self._lock:
+            return asset_url in self._estimates
+
+
+def predict_next_date_com(history_dates: List[date]) -> Optional[date]:
+    """Project the next data-com from the median interval between past ones."""
+    unique_dates = sorted(set(history_dates))
+    if len(unique_dates) < 2:
+        return None
+    intervals = [
+        (current_date - previous_date).days
+        for previous_date, current_date in zip(unique_dates, unique_dates[1:])
+    ]
+    typical_interval = median(intervals)
+    if typical_interval <= 0:
+        return None
+    return unique_dates[-1] + timedelta(days=typical_interval)
+
+
+def classify_lookup(
+    is_cached: bool,
+    estimated_seconds: float,
+    latency_known: bool,
+    predicted_next_date: Optional[date],
+    latest_known_date: Optional[date],
+    today: date,
+) -> int:
+    if is_cached:
+        return CACHED_PRIORITY
+    if latency_known and estimated_seconds >= SLOW_LOOKUP_SECONDS:
+        return SLOW_PRIORITY
+    if latest_known_date and latest_known_date >= today:
+        return DUE_SOON_PRIORITY
+    if predicted_next_date and predicted_next_date <= today + timedelta(days=DUE_SOON_WINDOW_DAYS):
+        return DUE_SOON_PRIORITY
+    return UNKNOWN_PRIORITY
+
+
+def order_asset_lookups(lookups: List[AssetLookup]) -> List[AssetLookup]:
+    return sorted(
+        lookups,
+        key=lambda lookup: (lookup.priority, lookup.estimated_seconds, lookup.position),
+    )
@@ -1,64 +1,87 @@
-import re
-import sys
+import json
+import os
 import time
 from datetime import date, datetime, timezone
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Set, Tuple
+from uuid import uuid4
 from threading import Thread
 
-from flask import Flask, jsonify, render_template, request
-from flasgger import Swagger
+from flask import Flask, Response, jsonify, render_template, request, stream_with_context
 from flask_cors import CORS
-from selenium.common.exceptions import (
-    NoSuchElementException,
-    StaleElementReferenceException,
-    TimeoutException,
-)
-from selenium.webdriver.common.by import By
-from selenium.webdriver.remote.webelement import WebElement
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.support.ui import WebDriverWait
 
-from http_assets_extractor import extract_assets_via_http
-from http_dividends_extractor import extract_dividend_dates_via_http
-from data_com_jobs import DataComJobStore, DividendDateCache, DataComJobProgressUpdater
-from utils import extract_table_data, extract_table_header, setup_driver
-from wallet_entries import extract_wallet_entries
+from asset_task_queue import create_asset_task_queue
+from dividend_lookup import (
+    ASSET_STRATEGY_BREAKER,
+    ASSET_URL_INDEX,
+    DIVIDEND_DATE_CACHE,
+    DIVIDEND_DATE_CACHE_TTL_SECONDS,
+    DIVIDEND_HISTORY_STORE,
+    EXTRACTION_BACKENDS,
+    conclude_dividend_lookup,
+    lookup_indexed_asset_url,
+    record_selenium_fallback_result,
+    resolve_indexed_asset_url,
+    resolve_latest_dividend_date_for_asset,
+    store_dividend_history,
+)
+from driver_watchdog import get_driver_watchdog
+from html_archive import is_replay_mode
+from lookup_scheduler import (
+    CACHED_PRIORITY,
+    AssetLatencyTracker,
+    AssetLookup,
+    SeleniumFallback,
+    classify_lookup,
+    order_asset_lookups,
+    predict_next_date_com,
+)
+from strategy_breaker import StrategyCircuitBreaker
+from structured_logging import get_logger, log_context
+from dividend_history import AssetPageNotFoundError, DividendHistoryEntry
+from data_com_jobs import (
+    NO_DIVIDENDS_REASON,
+    DataComJobProgressUpdater,
+    DataComJobStore,
+    DividendDateCache,
+)
+from dividend_history_store import (
+    DividendHistoryStore,
+    serialize_history_entry,
+)
+from webhook_dispatcher import create_webhook_dispatcher, is_valid_callback_url
+from time_budget import ProcessingTimeoutError, TimeBudget, resolve_driver_timeouts
+from wallet_snapshots import (
+    DEFAULT_WALLET_SNAPSHOT_DB_PATH,
+    WalletSnapshot,
+    WalletSnapshotStore,
+    build_wallet_positions,
+    diff_wallet_positions,
+)
 
-sys.stdout.reconfigure(line_buffering=True)
+logger = get_logger("api")
 
 app = Flask(__name__)
 CORS(app, resources={r"/*": {"origins": [
     "http://localhost:8080", "https://localhost:8080"
 ]}})
-Swagger(app)
-
-DATA_COM_JOB_STORE = DataComJobStore()
-DIVIDEND_DATE_CACHE = DividendDateCache(ttl_seconds=6 * 60 * 60)
+if os.environ.get("ENABLE_SWAGGER", "true").strip().lower() not in {"false", "0", "no"}:
+    from flasgger import Swagger
 
+    Swagger(app)
 
-class ProcessingTimeoutError(Exception):
-    """Raised when the processing budget is exceeded."""
-
-
-class TimeBudget:
-    """Manages a time budget for long-running tasks."""
-
-    def __init__(self, total_seconds: float):
-        safe_seconds = total_seconds if total_seconds > 0 else 60
-        self.deadline = time.monotonic() + safe_seconds
-
-    def remaining_seconds(self) -> float:
-        return max(0.0, self.deadline - time.monotonic())
-
-    def ensure_time_available(self, minimum_required: float, context: str) -> None:
-        if self.remaining_seconds() < minimum_required:
-            raise ProcessingTimeoutError(f"Tempo limite atingido ao processar {context}.")
-
-    def clamp_timeout(self, requested_seconds: float) -> float:
-        remaining = self.remaining_seconds()
-        if remaining <= 0:
-            raise ProcessingTimeoutError("Tempo limite atingido.")
-        return max(1.0, min(requested_seconds, remaining))
+DATA_COM_JOB_STORE = DataComJobStore()
+WEBHOOK_DISPATCHER = create_webhook_dispatcher()
+WALLET_SNAPSHOT_STORE = WalletSnapshotStore(
+    os.environ.get("WALLET_SNAPSHOT_DB_PATH", DEFAULT_WALLET_SNAPSHOT_DB_PATH)
+)
+ASSET_LATENCY_TRACKER = AssetLatencyTracker()
+WALLET_STRATEGY_BREAKER = StrategyCircuitBreaker("wallet")
+ASSET_TASK_QUEUE = create_asset_task_queue()
+ASSET_TASK_POLL_SECONDS = 0.5
+ASSET_TASK_CLAIM_TIMEOUT_SECONDS = float(os.environ.get("ASSET_TASK_CLAIM_TIMEOUT_SECONDS", "15"))
+WALLET_ENTRIES_PARALLEL_DRIVERS = int(os.environ.get("WALLET_ENTRIES_PARALLEL_DRIVERS", "1"))
+SELENIUM_DIVIDEND_TABS = int(os.environ.get("SELENIUM_DIVIDEND_TABS", "4"))
+DRIVER_WATCHDOG = get_driver_watchdog()
 
 
 @app.route("/")
@@ -88,129 +111,6 @@ def _extract_timeout_seconds(data: Dict[str, object]) -> float:
     return max(5.0, min(raw_timeout, 300.0))
 
 
-def _resolve_wait_seconds(time_budget: Optional[TimeBudget], requested_seconds: float) -> float:
-    if time_budget is None:
-        return requested_seconds
-    return time_budget.clamp_timeout(requested_seconds)
-
-
-def _ensure_time_budget_available(
-    time_budget: Optional[TimeBudget],
-    minimum_required: float,
-    context: str,
-) -> None:
-    if time_budget is None:
-        return
-    time_budget.ensure_time_available(minimum_required, context)
-
-
-def _resolve_driver_timeouts(
-    time_budget: Optional[TimeBudget],
-    page_load_seconds: float,
-    script_timeout_seconds: float,
-) -> tuple[float, float]:
-    if time_budget is None:
-        return page_load_seconds, script_timeout_seconds
-    return (
-        time_budget.clamp_timeout(page_load_seconds),
-        time_budget.clamp_timeout(script_timeout_seconds),
-    )
-
-
-def _format_log_timestamp() -> str:
-    return datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S %z")
-
-def extract_assets_data(driver, url, time_budget: Optional[TimeBudget] = None):
-    collapsed_tables = []
-    page_load_timeout, script_timeout = _resolve_driver_timeouts(time_budget, 60, 60)
-    driver.set_page_load_timeout(page_load_timeout)
-    driver.set_script_timeout(script_timeout)
-    try:
-        driver.get(url)
-    except TimeoutException:
-        collapsed_tables.append({
-            "table_name": "assets",
-            "error": "Tempo limite ao carregar a carteira via Selenium."
-        })
-        return collapsed_tables
-    try:
-        wait_seconds = _resolve_wait_seconds(time_budget, 20)
-        WebDriverWait(driver, wait_seconds).until(
-            EC.presence_of_element_located((By.CSS_SELECTOR, "table"))
-        )
-        assets_table = driver.find_element(By.CSS_SELECTOR, "table")
-        header = extract_table_header(assets_table)
-        assets_data = extract_table_data(assets_table)
-        collapsed_tables.append({
-            "table_name": "assets",
-            "header": header,
-            "rows": assets_data
-        })
-    except TimeoutException:
-        collapsed_tables.append({
-            "table_name": "assets",
-            "error": "Tempo limite ao carregar a tabela principal de ativos."
-        })
-    except Exception as exception_info:
-        print(f"{_format_log_timestamp()} [assets] Erro ao ler a tabela principal: {exception_info}")
-        collapsed_tables.append({
-            "table_name": "assets",
-            "error": str(exception_info)
-        })
-    toggle_elements = driver.find_elements(
-        By.XPATH, "//*[contains(@onclick, 'MyWallets.toogleClass')]"
-    )
-    for element in toggle_elements:
-        _ensure_time_budget_available(time_budget, 4, "a leitura de grupos de ativos")
-        try:
-            table_name = element.find_element(
-                By.CLASS_NAME, "name_value"
-            ).text.strip()
-        except:
-            table_name = "Unknown Table"
-        if "AÇÕES" in table_name.upper():
-            continue
-        onclick = element.get_attribute("onclick")
-        match = re.search(r"toogleClass\('([^']+)'", onclick)
-        if match:
-            selector = match.group(1)
-            try:
-                driver.execute_script(
-                    "arguments[0].scrollIntoView({block: 'center'});", element
-                )
-                driver.execute_script("arguments[0].click();", element)
-                wait_seconds = _resolve_wait_seconds(time_budget, 15)
-                WebDriverWait(driver, wait_seconds).until(
-                    EC.presence_of_element_located((By.CSS_SELECTOR, f"{selector} table"))
-                )
-                container = driver.find_element(
-                    By.CSS_SELECTOR, selector
-                )
-                table = container.find_element(By.TAG_NAME, "table")
-                header = extract_table_header(table)
-                rows = extract_table_data(table)
-                collapsed_tables.append({
-                    "table_name": table_name,
-                    "header": header,
-                    "rows": rows
-                })
-            except TimeoutException:
-                collapsed_tables.append({
-                    "table_name": table_name,
-                    "error": "Tempo limite ao carregar os dados deste grupo de ativos."
-                })
-            except Exception as e:
-                collapsed_tables.append({
-                    "table_name": table_name,
-                    "error": str(e)
-                })
-        else:
-            collapsed_tables.append({
-                "table_name": table_name,
-                "error": "Could not identify target selector"
-            })
-    return collapsed_tables
-
 @app.route("/wallet-entries", methods=["GET"])
 def get_wallet_entries():
     """Retrieve detailed wallet entries.
@@ -220,6 +120,16 @@ def get_wallet_entries():
         in: query
         type: string
         required: true
+      - name: parallel
+        in: query
+        type: boolean
+        required: false
+        description: Scrape the paginated tables with a pool of drivers instead of page by page.
+      - name: stream
+        in: query
+        type: boolean
+        required: false
+        description: Stream table headers and row batches as NDJSON while the pages are read.
     responses:
       200:
         description: Wallet entries extracted from the provided URL
@@ -227,18 +137,48 @@ def get_wallet_entries():
     data = request.get_json(silent=True) or request.args
     if "wallet_entries_url" not in data:
         return jsonify({"error": "wallet_entries_url parameter not provided"}), 400
-    driver = setup_driver()
+    use_parallel_pages = _extract_boolean_flag(data, "parallel", WALLET_ENTRIES_PARALLEL_DRIVERS > 1)
+    selenium_backend = EXTRACTION_BACKENDS.get("selenium")
+    if _extract_boolean_flag(data, "stream", False):
+        return Response(
+            stream_with_context(_stream_wallet_entries(selenium_backend, data["wallet_entries_url"])),
+            mimetype="application/x-ndjson",
+        )
+    driver = selenium_backend.setup_driver()
     try:
-        print(f"{_format_log_timestamp()} [wallet-entries] Iniciando coleta para {data['wallet_entries_url']}.")
-        result = extract_wallet_entries(driver, data["wallet_entries_url"])
-        print(f"{_format_log_timestamp()} [wallet-entries] Coleta concluída.")
+        logger.info("Iniciando coleta para %s.", data["wallet_entries_url"], stage="wallet-entries")
+        if use_parallel_pages:
+            result = selenium_backend.extract_wallet_entries_in_parallel(
+                driver,
+                data["wallet_entries_url"],
+                selenium_backend.setup_driver,
+                selenium_backend.quit_driver,
+                max_workers=max(1, WALLET_ENTRIES_PARALLEL_DRIVERS),
+            )
+        else:
+            result = selenium_backend.extract_wallet_entries(driver, data["wallet_entries_url"])
+        logger.info("Coleta concluída.", stage="wallet-entries")
         return jsonify(result)
     except Exception as exception_info:
-        print(f"{_format_log_timestamp()} [wallet-entries] Falha: {exception_info}")
+        logger.error("Falha: %s", exception_info, stage="wallet-entries")
         return jsonify({"error": str(exception_info)}), 500
     finally:
-        driver.quit()
-        
+        selenium_backend.quit_driver(driver)
+
+
+def _stream_wallet_entries(selenium_backend, wallet_entries_url: str):
+    driver = selenium_backend.setup_driver()
+    try:
+        logger.info("Iniciando coleta em streaming para %s.", wallet_entries_url, stage="wallet-entries")
+        for wallet_entries_event in selenium_backend.iter_wallet_entries_events(driver, wallet_entries_url):
+            yield json.dumps(wallet_entries_event, ensure_ascii=False) + "\n"
+        logger.info("Coleta em streaming concluída.", stage="wallet-entries")
+    except Exception as exception_info:
+        logger.error("Falha: %s", exception_info, stage="wallet-entries")
+        yield json.dumps({"type": "error", "error": str(exception_info)}, ensure_ascii=False) + "\n"
+    finally:
+        selenium_backend.quit_driver(driver)
+
 @app.route("/assets", methods=["GET"])
 def get_assets(wallet_url=None, jsonfy_return=True):
     """Retrieve wallet asset tables.
@@ -259,7 +199,7 @@ def get_assets(wallet_url=None, jsonfy_return=True):
         wallet_url = request_payload["wallet_url"]
         
     try:
-        print(f"{_format_log_timestamp()} [assets] Iniciando coleta para {wallet_url}.")
+        logger.info("Iniciando coleta para %s.", wallet_url, stage="assets")
         timeout_seconds = _extract_timeout_seconds(request_payload)
         time_budget = TimeBudget(timeout_seconds)
         result = collect_assets_tables(wallet_url, time_budget)
@@ -276,13 +216,13 @@ def get_assets(wallet_url=None, jsonfy_return=True):
                     'rows': rows,
                     'error': tbl.get('error')
                 })
-            print(f"{_format_log_timestamp()} [assets] Coleta concluída com {len(tables)} tabela(s).")
+            logger.info("Coleta concluída com %d tabela(s).", len(tables), stage="assets")
             return jsonify({'tables': tables})
         return result
     except ProcessingTimeoutError as timeout_error:
         return jsonify({"error": str(timeout_error)}), 504
     except Exception as exception_info:
-        print(f"{_format_log_timestamp()} [assets] Falha: {exception_info}")
+        logger.error("Falha: %s", exception_info, stage="assets")
         return jsonify({"error": str(exception_info)}), 500
 
 @app.route("/data-com", methods=["GET"])
@@ -294,6 +234,14 @@ def get_data_com():
         in: query
         type: string
         required: true
+      - name: incremental
+        in: query
+        type: boolean
+        required: false
+      - name: callback_url
+        in: query
+        type: string
+        required: false
     responses:
       200:
         description: Upcoming dividend dates
@@ -302,11 +250,23 @@ def get_data_com():
     if "wallet_url" not in data:
         return jsonify({"error": "wallet_url parameter not provided"}), 400
 
+    should_run_incrementally = _extract_boolean_flag(data, "incremental", False)
     should_run_async = _extract_async_preference(data)
+    callback_url = data.get("callback_url")
+    if callback_url:
+        if not should_run_async:
+            return jsonify({"error": "callback_url requires async=true"}), 400
+        if not WEBHOOK_DISPATCHER.signs_deliveries:
+            return jsonify({"error": "callback_url requires WEBHOOK_SECRET to be configured"}), 400
+        if not is_valid_callback_url(callback_url):
+            return jsonify({"error": "callback_url must be an http(s) URL on a public host"}), 400
+
     if should_run_async:
         job_id = start_data_com_job(
             wallet_url=data["wallet_url"],
             timeout_seconds=_extract_timeout_seconds(data),
+            incremental=should_run_incrementally,
+            callback_url=callback_url,
         )
         return jsonify({
             "job_id": job_id,
@@ -317,18 +277,30 @@ def get_data_com():
     time_budget = TimeBudget(timeout_seconds)
 
     try:
-        print(f"{_format_log_timestamp()} [data-com] Executando get_data_com...")
+        logger.info("Executando get_data_com...", stage="data-com")
         tables = collect_assets_tables(data["wallet_url"], time_budget)
-        print(f"{_format_log_timestamp()} [data-com] Tabelas coletadas.")
+        logger.info("Tabelas coletadas.", stage="data-com")
     except ProcessingTimeoutError as timeout_error:
         return jsonify({"error": str(timeout_error)}), 504
     except Exception as exception_info:
         return jsonify({"error": str(exception_info)}), 500
 
     try:
-        print("Executing fetch_latest_data_com...")
-        results_payload = build_data_com_payload(tables, time_budget, DIVIDEND_DATE_CACHE)
-        print("fetch_latest_data_com RETURNED!!: ", results_payload)
+        data_com_plan = plan_wallet_data_com(data["wallet_url"], tables, should_run_incrementally)
+        results_payload = build_data_com_payload(
+            tables,
+            time_budget,
+            DIVIDEND_DATE_CACHE,
+            dividend_history_store=DIVIDEND_HISTORY_STORE,
+            asset_codes=data_com_plan.get("assets_to_resolve"),
+        )
+        results_payload = finalize_wallet_data_com(data["wallet_url"], data_com_plan, results_payload)
+        logger.info(
+            "Datas-com resolvidas: %d resultado(s), %d falha(s).",
+            len(results_payload["results"]),
+            len(results_payload["failures"]),
+            stage="data-com",
+        )
         return jsonify(results_payload)
     except ProcessingTimeoutError as timeout_error:
         return jsonify({"error": str(timeout_error)}), 504
@@ -336,6 +308,140 @@ def get_data_com():
         return jsonify({"error": str(exception_info)}), 500
 
 
+@app.route("/dividends/history", methods=["GET"])
+def get_dividends_history():
+    """Get the locally stored dividend history of an asset.
+    ---
+    parameters:
+      - name: asset_url
+        in: query
+        type: string
+        required: false
+      - name: asset
+        in: query
+        type: string
+        required: false
+      - name: table_name
+        in: query
+        type: string
+        required: false
+      - name: refresh
+        in: query
+        type: boolean
+        required: false
+    responses:
+      200:
+        description: Dividend history stored for the asset
+    """
+    data = request.get_json(silent=True) or request.args
+    asset_code = data.get("asset")
+    asset_url = data.get("asset_url")
+    if not asset_url and asset_code:
+        asset_url = resolve_indexed_asset_url(asset_code, data.get("table_name", "assets"))
+    if not asset_url:
+        return jsonify({"error": "asset_url or asset parameter not provided"}), 400
+
+    should_refresh = _extract_boolean_flag(data, "refresh", False)
+    never_stored = (
+        DIVIDEND_HISTORY_STORE.get_last_updated_at(asset_url) is None
+        and DIVIDEND_DATE_CACHE.get_negative(asset_url) is None
+    )
+    if should_refresh or never_stored:
+        time_budget = TimeBudget(_extract_timeout_seconds(data))
+        try:
+            history_entries = _fetch_dividend_history(asset_url, asset_code, time_budget)
+            DIVIDEND_HISTORY_STORE.merge_history(asset_url, asset_code, history_entries)
+            if not history_entries:
+                DIVIDEND_DATE_CACHE.set_negative(asset_url, NO_DIVIDENDS_REASON)
+        except ProcessingTimeoutError as timeout_error:
+            return jsonify({"error": str(timeout_error)}), 504
+        except AssetPageNotFoundError as not_found_error:
+            return jsonify({"error": str(not_found_error)}), 404
+        except Exception as exception_info:
+            logger.warning("Falha ao atualizar %s: %s", asset_url, exception_info, stage="dividends-history")
+            if DIVIDEND_HISTORY_STORE.get_last_updated_at(asset_url) is None:
+                return jsonify({"error": str(exception_info)}), 500
+
+    history_entries = DIVIDEND_HISTORY_STORE.get_history(asset_url)
+    updated_at = DIVIDEND_HISTORY_STORE.get_last_updated_at(asset_url)
+    return jsonify({
+        "asset_url": asset_url,
+        "updated_at": (
+            datetime.fromtimestamp(updated_at, timezone.utc).isoformat()
+            if updated_at else None
+        ),
+        "history": [serialize_history_entry(entry) for entry in history_entries],
+    })
+
+
+def _fetch_dividend_history(
+    asset_url: str,
+    asset_code: Optional[str],
+    time_budget: TimeBudget,
+) -> List[DividendHistoryEntry]:
+    history_entries = EXTRACTION_BACKENDS.get("http").extract_dividend_history_via_http(
+        asset_url, time_budget.clamp_timeout(15)
+    )
+    if history_entries or is_replay_mode():
+        return history_entries
+    selenium_backend = EXTRACTION_BACKENDS.get("selenium")
+    selenium_driver = selenium_backend.setup_driver()
+    try:
+        return selenium_backend.extract_dividend_history_with_selenium(
+            selenium_driver, asset_url, asset_code or asset_url, time_budget
+        ) or []
+    finally:
+        selenium_backend.quit_driver(selenium_driver)
+
+
+@app.route("/dividend-calendar", methods=["GET"])
+def get_dividend_calendar():
+    """Get the monthly dividend calendar and trailing yields of a wallet.
+    ---
+    parameters:
+      - name: wallet_url
+        in: query
+        type: string
+        required: true
+      - name: months
+        in: query
+        type: integer
+        required: false
+    responses:
+      200:
+        description: Upcoming data-com/payment dates by month, trailing 12-month totals and yield-on-cost
+    """
+    data = request.get_json(silent=True) or request.args
+    if "wallet_url" not in data:
+        return jsonify({"error": "wallet_url parameter not provided"}), 400
+
+    try:
+        horizon_months = max(1, min(int(data.get("months", 12)), 36))
+    except (TypeError, ValueError):
+        horizon_months = 12
+
+    time_budget = TimeBudget(_extract_timeout_seconds(data))
+    try:
+        tables = collect_assets_tables(data["wallet_url"], time_budget)
+    except ProcessingTimeoutError as timeout_error:
+        return jsonify({"error": str(timeout_error)}), 504
+    except Exception as exception_info:
+        return jsonify({"error": str(exception_info)}), 500
+
+    from dividend_calendar import build_dividend_calendar, extract_wallet_positions
+
+    normalized_tables = _normalize_tables_payload(tables) or []
+    positions = extract_wallet_positions(normalized_tables, lookup_indexed_asset_url)
+    histories = DIVIDEND_HISTORY_STORE.get_histories(
+        [position.asset_url for position in positions if position.asset_url]
+    )
+    calendar_payload = build_dividend_calendar(positions, histories, date.today(), horizon_months)
+    calendar_payload["missing_history"] = [
+        summary["asset"] for summary in calendar_payload["assets"] if not summary["has_history"]
+    ]
+    return jsonify(calendar_payload)
+
+
 @app.route("/data-com/status", methods=["GET"])
 def get_data_com_status():
     data = request.get_json(silent=True) or request.args
@@ -358,40 +464,103 @@ def get_data_com_status():
     return jsonify(payload)
 
 
-def start_data_com_job(wallet_url: str, timeout_seconds: float) -> str:
+@app.route("/data-com/jobs/<job_id>", methods=["DELETE"])
+def cancel_data_com_job(job_id: str):
+    """Cancel a running data-com job, keeping the results gathered so far.
+    ---
+    parameters:
+      - name: job_id
+        in: path
+        type: string
+        required: true
+    responses:
+      202:
+        description: Cancellation requested; poll /data-com/status for the partial results
+      200:
+        description: The job had already finished
+      404:
+        description: Unknown job_id
+    """
+    job_status = DATA_COM_JOB_STORE.request_cancellation(job_id)
+    if job_status is None:
+        return jsonify({"error": "job_id not found"}), 404
+    if job_status != "cancelling":
+        return jsonify({"job_id": job_id, "status": job_status}), 200
+    logger.info("Cancelamento solicitado.", job_id=job_id, stage="data-com")
+    return jsonify({"job_id": job_id, "status": job_status}), 202
+
+
+def start_data_com_job(
+    wallet_url: str,
+    timeout_seconds: float,
+    incremental: bool = False,
+    callback_url: Optional[str] = None,
+) -> str:
     job_id = DATA_COM_JOB_STORE.create_job()
 
+    def create_progress_updater(total_assets: int) -> DataComJobProgressUpdater:
+        return DataComJobProgressUpdater(
+            DATA_COM_JOB_STORE,
+            job_id,
+            total_assets,
+            callback_url=callback_url,
+            webhook_dispatcher=WEBHOOK_DISPATCHER,
+        )
+
+    time_budget = TimeBudget(timeout_seconds)
+
     def run_job() -> None:
-        time_budget = TimeBudget(timeout_seconds)
+        with log_context(job_id=job_id):
+            _run_data_com_job()
+
+    def _run_data_com_job() -> None:
+        progress_updater = create_progress_updater(0)
         try:
-            print(
-                f"{datetime.now(timezone.utc).strftime('%Y-%m-%d %H:%M:%S %z')} "
-                f"[data-com][job {job_id}] Iniciando coleta de ativos para {wallet_url}."
-            )
+            logger.info("Iniciando coleta de ativos para %s.", wallet_url, stage="data-com")
             tables = collect_assets_tables(wallet_url, time_budget)
-            total_assets = count_assets_in_tables(tables)
-            progress_updater = DataComJobProgressUpdater(
-                DATA_COM_JOB_STORE,
-                job_id,
-                total_assets,
+            data_com_plan = plan_wallet_data_com(wallet_url, tables, incremental)
+            assets_to_resolve = data_com_plan.get("assets_to_resolve")
+            total_assets = (
+                len(assets_to_resolve) if assets_to_resolve is not None
+                else count_assets_in_tables(tables)
             )
+            progress_updater = create_progress_updater(total_assets)
             progress_updater.mark_running()
             results_payload = build_data_com_payload(
                 tables,
                 time_budget,
                 DIVIDEND_DATE_CACHE,
                 progress_updater,
+                dividend_history_store=DIVIDEND_HISTORY_STORE,
+                asset_codes=assets_to_resolve,
             )
+            results_payload = finalize_wallet_data_com(wallet_url, data_com_plan, results_payload)
+            if time_budget.is_cancelled():
+                progress_updater.mark_cancelled(results_payload["results"], results_payload["failures"])
+                return
             progress_updater.mark_completed(
                 results_payload["results"],
                 results_payload["failures"],
             )
         except ProcessingTimeoutError as timeout_error:
-            DataComJobProgressUpdater(DATA_COM_JOB_STORE, job_id, 0).mark_failed(str(timeout_error))
+            if time_budget.is_cancelled():
+                progress_updater.mark_cancelled()
+                return
+            progress_updater.mark_failed(str(timeout_error))
         except Exception as exception_info:
-            DataComJobProgressUpdater(DATA_COM_JOB_STORE, job_id, 0).mark_failed(str(exception_info))
+            if time_budget.is_cancelled():
+                progress_updater.mark_cancelled()
+                return
+            progress_updater.mark_failed(str(exception_info))
+
+    job_thread = Thread(target=run_job, daemon=True)
+
+    def cancel_job() -> None:
+        time_budget.cancel()
+        DRIVER_WATCHDOG.release_thread_drivers(job_thread)
 
-    Thread(target=run_job, daemon=True).start()
+    DATA_COM_JOB_STORE.set_cancel_handler(job_id, cancel_job)
+    job_thread.start()
     return job_id
 
 
@@ -400,6 +569,8 @@ def build_data_com_payload(
     time_budget: TimeBudget,
     dividend_date_cache: DividendDateCache,
     progress_updater: Optional[DataComJobProgressUpdater] = None,
+    dividend_history_store: Optional[DividendHistoryStore] = None,
+    asset_codes: Optional[Set[str]] = None,
 ) -> Dict[str, List[Dict[str, str]]]:
     tables = _normalize_tables_payload(assets_json)
     if tables is None:
@@ -410,47 +581,95 @@ def build_data_com_payload(
     failures: List[Dict[str, str]] = []
     processed_assets = 0
 
-    for table_payload in tables:
-        table_name = table_payload.get('table_name', '')
-        for raw_row in table_payload.get('rows', []):
-            row = raw_row.split(' | ') if isinstance(raw_row, str) else raw_row
-            if not row:
-                continue
-            asset_code = row[0]
-            latest_dividend_date, failure_reason, selenium_driver = _resolve_latest_dividend_date_for_asset(
+    def record_lookup_outcome(asset_code: str, latest_dividend_date: Optional[date], failure_reason: Optional[str]) -> None:
+        nonlocal processed_assets
+        if latest_dividend_date:
+            results.append({
+                'asset': asset_code,
+                'date_com_date': latest_dividend_date
+            })
+        if failure_reason:
+            failures.append({
+                'asset': asset_code,
+                'reason': failure_reason
+            })
+        processed_assets += 1
+        if progress_updater:
+            progress_message = (
+                f"Ativo {asset_code} processado."
+                if not failure_reason
+                else f"Ativo {asset_code} processado com falha."
+            )
+            progress_updater.report_progress(
+                processed_assets,
                 asset_code,
-                table_name,
+                _format_results_snapshot(results),
+                failures,
+                progress_message,
+            )
+
+    asset_lookups = _plan_asset_lookups(tables, dividend_date_cache, dividend_history_store, asset_codes)
+    remote_batch = None
+    selenium_fallbacks: Optional[List[SeleniumFallback]] = [] if SELENIUM_DIVIDEND_TABS > 1 else None
+    try:
+        if ASSET_TASK_QUEUE is not None:
+            remote_batch = _publish_remote_lookups(asset_lookups, time_budget)
+            asset_lookups = [
+                asset_lookup for asset_lookup in asset_lookups if asset_lookup.priority == CACHED_PRIORITY
+            ]
+        for asset_lookup in asset_lookups:
+            if time_budget.is_cancelled():
+                break
+            if selenium_driver and EXTRACTION_BACKENDS.get("selenium").should_recycle_driver(selenium_driver):
+                EXTRACTION_BACKENDS.get("selenium").quit_driver(selenium_driver)
+                selenium_driver = None
+            asset_code = asset_lookup.asset_code
+            is_cached_lookup = asset_lookup.priority == CACHED_PRIORITY
+            if not is_cached_lookup and time_budget.remaining_seconds() < asset_lookup.estimated_seconds:
+                latest_dividend_date = None
+                failure_reason = (
+                    f"Tempo insuficiente para processar o ativo {asset_code} "
+                    f"(estimativa de {asset_lookup.estimated_seconds:.0f}s)."
+                )
+            else:
+                lookup_started_at = time.monotonic()
+                deferred_lookups = len(selenium_fallbacks) if selenium_fallbacks is not None else 0
+                with log_context(asset=asset_code):
+                    latest_dividend_date, failure_reason, selenium_driver = resolve_latest_dividend_date_for_asset(
+                        asset_code,
+                        asset_lookup.table_name,
+                        time_budget,
+                        selenium_driver,
+                        dividend_date_cache,
+                        dividend_history_store,
+                        selenium_fallbacks,
+                    )
+                if selenium_fallbacks and len(selenium_fallbacks) > deferred_lookups:
+                    # Its latency is recorded once the tab fallback finishes.
+                    selenium_fallbacks[-1].static_seconds = time.monotonic() - lookup_started_at
+                    continue
+                if not is_cached_lookup and asset_lookup.asset_url and not time_budget.is_cancelled():
+                    ASSET_LATENCY_TRACKER.record(
+                        asset_lookup.asset_url,
+                        time.monotonic() - lookup_started_at,
+                    )
+            record_lookup_outcome(asset_code, latest_dividend_date, failure_reason)
+        if selenium_fallbacks and not time_budget.is_cancelled():
+            selenium_driver = _resolve_selenium_fallbacks_in_tabs(
+                selenium_fallbacks,
                 time_budget,
                 selenium_driver,
                 dividend_date_cache,
+                dividend_history_store,
+                record_lookup_outcome,
             )
-            if latest_dividend_date:
-                results.append({
-                    'asset': asset_code,
-                    'date_com_date': latest_dividend_date
-                })
-            if failure_reason:
-                failures.append({
-                    'asset': asset_code,
-                    'reason': failure_reason
-                })
-            processed_assets += 1
-            if progress_updater:
-                progress_message = (
-                    f"Ativo {asset_code} processado."
-                    if not failure_reason
-                    else f"Ativo {asset_code} processado com falha."
-                )
-                progress_updater.report_progress(
-                    processed_assets,
-                    asset_code,
-                    _format_results_snapshot(results),
-                    failures,
-                    progress_message,
-                )
-
-    if selenium_driver:
-        selenium_driver.quit()
+        if remote_batch:
+            _gather_remote_lookups(remote_batch, time_budget, dividend_date_cache, record_lookup_outcome)
+    finally:
+        if selenium_driver:
+            EXTRACTION_BACKENDS.get("selenium").quit_driver(selenium_driver)
+        if remote_batch:
+            ASSET_TASK_QUEUE.purge_batch(remote_batch[0])
 
     filtered_results = _filter_and_sort_dividend_dates(results)
     formatted_results = [
@@ -464,6 +683,199 @@ def build_data_com_payload(
     }
 
 
+def _publish_remote_lookups(
+    asset_lookups: List[AssetLookup],
+    time_budget: TimeBudget,
+) -> Optional[Tuple[str, Dict[str, AssetLookup]]]:
+    """Queue every lookup that is not answered by the cache for the asset workers."""
+    remote_lookups = [asset_lookup for asset_lookup in asset_lookups if asset_lookup.priority != CACHED_PRIORITY]
+    if not remote_lookups:
+        return None
+    batch_id = str(uuid4())
+    deadline_at = time.time() + time_budget.remaining_seconds()
+    published_tasks = {
+        ASSET_TASK_QUEUE.publish(batch_id, asset_lookup.asset_code, asset_lookup.table_name, deadline_at): asset_lookup
+        for asset_lookup in remote_lookups
+    }
+    logger.info("%d ativo(s) enviados aos workers.", len(published_tasks), stage="data-com")
+    return batch_id, published_tasks
+
+
+def _gather_remote_lookups(
+    remote_batch: Tuple[str, Dict[str, AssetLookup]],
+    time_budget: TimeBudget,
+    dividend_date_cache: DividendDateCache,
+    record_lookup_outcome,
+) -> None:
+    batch_id, pending_lookups = remote_batch[0], dict(remote_batch[1])
+    claim_deadline = time.monotonic() + ASSET_TASK_CLAIM_TIMEOUT_SECONDS
+    unclaimed_batch = False
+    while pending_lookups and time_budget.remaining_seconds() > 0:
+        for task_id, task_result in ASSET_TASK_QUEUE.collect_results(batch_id).items():
+            asset_lookup = pending_lookups.pop(task_id, None)
+            if asset_lookup is None:
+                continue
+            latest_dividend_date = _parse_brazilian_date(task_result.get("date_com") or "")
+            asset_url = task_result.get("asset_url")
+            if latest_dividend_date and asset_url:
+                dividend_date_cache.set(asset_url, latest_dividend_date)
+            elif task_result.get("negative_reason") and asset_url:
+                dividend_date_cache.set_negative(asset_url, task_result["negative_reason"])
+            if asset_lookup.asset_url and task_result.get("elapsed_seconds") is not None:
+                ASSET_LATENCY_TRACKER.record(asset_lookup.asset_url, float(task_result["elapsed_seconds"]))
+            record_lookup_outcome(asset_lookup.asset_code, latest_dividend_date, task_result.get("failure_reason"))
+        if not pending_lookups:
+            break
+        if time.monotonic() > claim_deadline and not ASSET_TASK_QUEUE.count_leased(batch_id):
+            unclaimed_batch = True
+            logger.warning(
+                "Nenhum worker pegou os ativos em %.0fs. Verifique se asset_worker.py está rodando.",
+                ASSET_TASK_CLAIM_TIMEOUT_SECONDS,
+                stage="data-com",
+            )
+            break
+        time.sleep(ASSET_TASK_POLL_SECONDS)
+
+    if time_budget.is_cancelled():
+        return
+    for asset_lookup in pending_lookups.values():
+        failure_reason = (
+            f"Nenhum worker disponível para o ativo {asset_lookup.asset_code}."
+            if unclaimed_batch
+            else f"Tempo limite atingido aguardando os workers para o ativo {asset_lookup.asset_code}."
+        )
+        record_lookup_outcome(asset_lookup.asset_code, None, failure_reason)
+
+
+def plan_wallet_data_com(wallet_url: str, tables, incremental: bool) -> Dict[str, object]:
+    current_positions = build_wallet_positions(_normalize_tables_payload(tables) or [])
+    data_com_plan: Dict[str, object] = {
+        "positions": current_positions,
+        "assets_to_resolve": None,
+        "reused_results": [],
+        "diff": None,
+    }
+    if not incremental:
+        return data_com_plan
+
+    previous_snapshot = WALLET_SNAPSHOT_STORE.get(wallet_url)
+    if previous_snapshot is None:
+        return data_com_plan
+
+    wallet_diff = diff_wallet_positions(previous_snapshot.positions, current_positions)
+    previous_results = {result["asset"]: result for result in previous_snapshot.results}
+    assets_to_resolve = set(wallet_diff.added) | set(wallet_diff.changed)
+    reused_results: List[Dict[str, object]] = []
+    for asset_code in wallet_diff.unchanged:
+        previous_result = previous_results.get(asset_code)
+        if previous_result is None:
+            assets_to_resolve.add(asset_code)
+            continue
+        # Results saved before they carried their own timestamp fall back to the snapshot time.
+        resolved_at = previous_result.get("resolved_at", previous_snapshot.captured_at)
+        if time.time() - resolved_at <= DIVIDEND_DATE_CACHE_TTL_SECONDS:
+            reused_results.append(dict(previous_result, resolved_at=resolved_at))
+        else:
+            assets_to_resolve.add(asset_code)
+
+    logger.info(
+        "Modo incremental: %d ativo(s) a resolver, %d reaproveitado(s).",
+        len(assets_to_resolve),
+        len(reused_results),
+        stage="data-com",
+    )
+    data_com_plan.update({
+        "assets_to_resolve": assets_to_resolve,
+        "reused_results": reused_results,
+        "diff": wallet_diff,
+    })
+    return data_com_plan
+
+
+def finalize_wallet_data_com(
+    wallet_url: str,
+    data_com_plan: Dict[str, object],
+    results_payload: Dict[str, List[Dict[str, str]]],
+) -> Dict[str, object]:
+    today = date.today()
+    resolved_at = time.time()
+    snapshot_results = [
+        result for result in data_com_plan["reused_results"]
+        + [dict(result, resolved_at=resolved_at) for result in results_payload["results"]]
+        if (_parse_brazilian_date(result["date_com"]) or date.min) >= today
+    ]
+    snapshot_results.sort(key=lambda result: _parse_brazilian_date(result["date_com"]))
+    merged_payload: Dict[str, object] = {
+        "results": [
+            {key: value for key, value in result.items() if key != "resolved_at"}
+            for result in snapshot_results
+        ],
+        "failures": results_payload["failures"],
+    }
+    wallet_diff = data_com_plan["diff"]
+    if wallet_diff is not None:
+        diff_payload = wallet_diff.to_payload()
+        diff_payload["reused"] = [result["asset"] for result in data_com_plan["reused_results"]]
+        merged_payload["diff"] = diff_payload
+    try:
+        WALLET_SNAPSHOT_STORE.save(WalletSnapshot(
+            wallet_url=wallet_url,
+            positions=data_com_plan["positions"],
+            results=snapshot_results,
+            failures=results_payload["failures"],
+        ))
+    except Exception as snapshot_error:
+        logger.warning("Falha ao salvar snapshot da carteira: %s", snapshot_error, stage="data-com")
+    return merged_payload
+
+
+def _plan_asset_lookups(
+    tables: List[Dict[str, object]],
+    dividend_date_cache: DividendDateCache,
+    dividend_history_store: Optional[DividendHistoryStore] = None,
+    asset_codes: Optional[Set[str]] = None,
+) -> List[AssetLookup]:
+    today = date.today()
+    asset_lookups: List[AssetLookup] = []
+    for table_payload in tables:
+        table_name = table_payload.get('table_name', '')
+        for raw_row in table_payload.get('rows', []):
+            row = raw_row.split(' | ') if isinstance(raw_row, str) else raw_row
+            if not row:
+                continue
+            asset_code = row[0]
+            if asset_codes is not None and asset_code not in asset_codes:
+                continue
+            asset_url = lookup_indexed_asset_url(asset_code, table_name)
+            if asset_url:
+                is_cached = (
+                    dividend_date_cache.get(asset_url) is not None
+                    or dividend_date_cache.get_negative(asset_url) is not None
+                )
+            else:
+                is_cached = ASSET_URL_INDEX.lookup(asset_code) is not None
+            history_dates: List[date] = []
+            if asset_url and dividend_history_store and not is_cached:
+                history_dates = [entry.date_com for entry in dividend_history_store.get_history(asset_url)]
+            estimated_seconds = 0.0 if is_cached else ASSET_LATENCY_TRACKER.estimate(asset_url)
+            asset_lookups.append(AssetLookup(
+                asset_code=asset_code,
+                table_name=table_name,
+                asset_url=asset_url,
+                position=len(asset_lookups),
+                priority=classify_lookup(
+                    is_cached,
+                    estimated_seconds,
+                    ASSET_LATENCY_TRACKER.is_known(asset_url),
+                    predict_next_date_com(history_dates),
+                    max(history_dates) if history_dates else None,
+                    today,
+                ),
+                estimated_seconds=estimated_seconds,
+            ))
+    return order_asset_lookups(asset_lookups)
+
+
 def _format_results_snapshot(results: List[Dict[str, object]]) -> List[Dict[str, str]]:
     formatted_results: List[Dict[str, str]] = []
     for result_item in results:
@@ -477,63 +889,71 @@ def _format_results_snapshot(results: List[Dict[str, object]]) -> List[Dict[str,
     return formatted_results
 
 
-def _resolve_latest_dividend_date_for_asset(
-    asset_code: str,
-    table_name: str,
+def _resolve_selenium_fallbacks_in_tabs(
+    selenium_fallbacks: List[SeleniumFallback],
     time_budget: TimeBudget,
     selenium_driver: object | None,
     dividend_date_cache: DividendDateCache,
-) -> tuple[date | None, str | None, object | None]:
-    try:
-        time_budget.ensure_time_available(3, f"o ativo {asset_code}")
-    except ProcessingTimeoutError as timeout_error:
-        return None, str(timeout_error), selenium_driver
-
-    asset_url = resolve_asset_url(asset_code, table_name)
-    print(f"Resolving URL for {asset_code}: {asset_url}")
-    if not asset_url:
-        return None, f"URL do ativo {asset_code} não pôde ser resolvida.", selenium_driver
-
-    cached_date = dividend_date_cache.get(asset_url)
-    if cached_date:
-        return cached_date, None, selenium_driver
-
+    dividend_history_store: Optional[DividendHistoryStore],
+    record_lookup_outcome,
+) -> object | None:
+    """Read the dividend pages the static HTTP path could not answer in parallel browser tabs."""
+    pending_fallbacks = {fallback.asset_code: fallback for fallback in selenium_fallbacks}
+    logger.info("Lendo %d ativo(s) via Selenium em abas paralelas.", len(pending_fallbacks), stage="data-com")
+    selenium_backend = EXTRACTION_BACKENDS.get("selenium")
+    unresolved_reasons: Dict[str, str] = {}
     try:
-        latest_dividend_date = _extract_latest_dividend_date(asset_url, time_budget)
-    except ProcessingTimeoutError as timeout_error:
-        return None, str(timeout_error), selenium_driver
-
-    if latest_dividend_date is None:
-        selenium_driver = selenium_driver or setup_driver()
-        try:
-            latest_dividend_date = _extract_latest_dividend_date_with_selenium(
-                selenium_driver, asset_url, asset_code, time_budget
-            )
-        except ProcessingTimeoutError as timeout_error:
-            return None, str(timeout_error), selenium_driver
-        except Exception as selenium_error:
-            return (
-                None,
-                f"Falha ao ler dividendos via Selenium para {asset_code}: {selenium_error}",
-                selenium_driver,
+        selenium_driver = selenium_driver or selenium_backend.setup_driver()
+        for tab_result in selenium_backend.iter_dividend_histories_in_tabs(
+            selenium_driver,
+            [(fallback.asset_code, fallback.asset_url) for fallback in selenium_fallbacks],
+            time_budget,
+            max_tabs=SELENIUM_DIVIDEND_TABS,
+        ):
+            asset_code, history_entries = tab_result.asset_code, tab_result.history_entries
+            fallback = pending_fallbacks.pop(asset_code)
+            ASSET_LATENCY_TRACKER.record(fallback.asset_url, fallback.static_seconds + tab_result.elapsed_seconds)
+            if tab_result.timed_out:
+                # A page that never finished loading is a failure, not an asset without dividends.
+                record_lookup_outcome(
+                    asset_code, None, f"Tempo limite ao carregar a página de dividendos de {asset_code}."
+                )
+                continue
+            latest_dividend_date = None
+            if history_entries:
+                store_dividend_history(dividend_history_store, fallback.asset_url, asset_code, history_entries)
+                latest_dividend_date = max(entry.date_com for entry in history_entries)
+            record_selenium_fallback_result(fallback.static_page_read, latest_dividend_date)
+            latest_dividend_date, failure_reason = conclude_dividend_lookup(
+                asset_code, fallback.asset_url, latest_dividend_date, dividend_date_cache
             )
+            record_lookup_outcome(asset_code, latest_dividend_date, failure_reason)
+    except ProcessingTimeoutError as timeout_error:
+        unresolved_reasons = {asset_code: str(timeout_error) for asset_code in pending_fallbacks}
+    except Exception as selenium_error:
+        unresolved_reasons = {
+            asset_code: f"Falha ao ler dividendos via Selenium para {asset_code}: {selenium_error}"
+            for asset_code in pending_fallbacks
+        }
 
-    if latest_dividend_date is None:
-        return None, f"Nenhuma data de dividendo encontrada para {asset_code}.", selenium_driver
+    for asset_code, failure_reason in unresolved_reasons.items():
+        record_lookup_outcome(asset_code, None, failure_reason)
+    return selenium_driver
 
-    if latest_dividend_date:
-        dividend_date_cache.set(asset_url, latest_dividend_date)
 
-    return latest_dividend_date, None, selenium_driver
+def _extract_async_preference(data: Dict[str, object]) -> bool:
+    return _extract_boolean_flag(data, "async", True)
 
 
-def _extract_async_preference(data: Dict[str, object]) -> bool:
-    raw_value = data.get("async", "true")
+def _extract_boolean_flag(data: Dict[str, object], flag_name: str, default_value: bool) -> bool:
+    raw_value = data.get(flag_name)
+    if raw_value is None:
+        return default_value
     if isinstance(raw_value, str):
         return raw_value.strip().lower() not in {"false", "0", "no"}
     if isinstance(raw_value, bool):
         return raw_value
-    return True
+    return default_value
 
 
 def count_assets_in_tables(assets_json) -> int:
@@ -557,85 +977,6 @@ def _normalize_tables_payload(assets_json) -> List[Dict[str, object]] | None:
     return None
 
 
-def _extract_latest_dividend_date(asset_url: str, time_budget: TimeBudget) -> date | None:
-    try:
-        http_timeout = time_budget.clamp_timeout(15)
-        dividend_dates = extract_dividend_dates_via_http(asset_url, http_timeout)
-    except ProcessingTimeoutError:
-        raise
-    except Exception as http_error:
-        print(f"HTTP dividend extraction failed for {asset_url}: {http_error}")
-        return None
-
-    if not dividend_dates:
-        return None
-
-    return max(dividend_dates)
-
-
-def _extract_latest_dividend_date_with_selenium(
-    driver,
-    asset_url: str,
-    asset_code: str,
-    time_budget: TimeBudget,
-) -> date | None:
-    try:
-        page_load_timeout, script_timeout = _resolve_driver_timeouts(time_budget, 35, 35)
-        driver.set_page_load_timeout(page_load_timeout)
-        driver.set_script_timeout(script_timeout)
-        max_wait = time_budget.clamp_timeout(15)
-        driver.get(asset_url)
-        WebDriverWait(driver, max_wait).until(
-            EC.presence_of_element_located((By.ID, 'table-dividends-history'))
-        )
-    except ProcessingTimeoutError:
-        raise
-    except TimeoutException:
-        print(f"Timeout while waiting for dividends history for {asset_code}.")
-        return None
-
-    for attempt_number in range(3):
-        time_budget.ensure_time_available(3, f"a leitura de dividendos de {asset_code}")
-        try:
-            dividends_history_table = driver.find_element(By.ID, 'table-dividends-history')
-        except NoSuchElementException:
-            print(f"Table not found for {asset_code}.")
-            return None
-
-        try:
-            selenium_dates = _collect_dividend_dates_from_table(dividends_history_table)
-            if not selenium_dates:
-                return None
-
-            print(f"Dates found for {asset_code}: {selenium_dates}")
-            return max(selenium_dates)
-        except StaleElementReferenceException:
-            remaining_attempts = 2 - attempt_number
-            print(
-                f"Stale element encountered while reading dividends for {asset_code}. "
-                f"Retrying ({remaining_attempts} attempts left)."
-            )
-            remaining_wait = time_budget.clamp_timeout(5)
-            WebDriverWait(driver, remaining_wait).until(
-                EC.presence_of_element_located((By.ID, 'table-dividends-history'))
-            )
-
-    print(f"Unable to read dividends table for {asset_code} after retries.")
-    return None
-
-
-def _collect_dividend_dates_from_table(dividends_table: WebElement) -> List[date]:
-    selenium_dates: List[date] = []
-    for dividends_row in dividends_table.find_elements(By.CSS_SELECTOR, 'tbody tr'):
-        cells = dividends_row.find_elements(By.TAG_NAME, 'td')
-        if len(cells) < 2:
-            continue
-        parsed_date = _parse_brazilian_date(cells[1].text.strip())
-        if parsed_date:
-            selenium_dates.append(parsed_date)
-    return selenium_dates
-
-
 def _parse_brazilian_date(date_value: str) -> date | None:
     try:
         return datetime.strptime(date_value, '%d/%m/%Y').date()
@@ -653,55 +994,68 @@ def _filter_and_sort_dividend_dates(results: List[Dict[str, object]]) -> List[Di
     filtered.sort(key=lambda item: item['date_com_date'])
     return filtered
 
-def resolve_asset_url(code: str, table_name: str) -> str:
-    slug = code.lower()
-    if table_name == 'assets':
-        path = 'acoes'
-    else:
-        primary = table_name.split('\n')[0].upper()
-        if primary == 'FIIS':
-            path = 'fiis'
-        elif primary.startswith('CRIPTOMOEDAS'):
-            path = 'criptomoedas'
-        elif primary.startswith('ETFS INTERN'):
-            path = 'etfs-global'
-        elif primary.startswith('ETFS'):
-            path = 'etfs'
-        elif primary.startswith('STOCKS'):
-            path = 'stocks'
-        elif primary.startswith('BDRS'):
-            path = 'bdrs'
-        else:
-            return None
-    return f"https://investidor10.com.br/{path}/{slug}/"
-
-
 def collect_assets_tables(wallet_url: str, time_budget: Optional[TimeBudget] = None):
     driver = None
     try:
         assets_via_http = []
-        try:
-            http_timeout = time_budget.clamp_timeout(15) if time_budget else 30
-            assets_via_http = extract_assets_via_http(wallet_url, http_timeout)
-        except ProcessingTimeoutError:
-            raise
-        except Exception as extraction_error:
-            print(f"{_format_log_timestamp()} [assets] HTTP assets extraction failed: {extraction_error}")
+        replay_only = is_replay_mode()
+        if replay_only or WALLET_STRATEGY_BREAKER.should_try_http():
+            try:
+                http_timeout = time_budget.clamp_timeout(15) if time_budget else 30
+                assets_via_http = EXTRACTION_BACKENDS.get("http").extract_assets_via_http(
+                    wallet_url, http_timeout
+                )
+            except ProcessingTimeoutError:
+                raise
+            except Exception as extraction_error:
+                logger.warning("HTTP assets extraction failed: %s", extraction_error, stage="assets")
 
-        if contains_usable_asset_rows(assets_via_http):
-            return assets_via_http
+            if contains_usable_asset_rows(assets_via_http):
+                WALLET_STRATEGY_BREAKER.record_http_success()
+                return assets_via_http
 
-        if assets_via_http:
-            print(f"{_format_log_timestamp()} [assets] HTTP assets extraction returned no usable rows. Falling back to Selenium scraping.")
+            if replay_only:
+                return assets_via_http
+
+            WALLET_STRATEGY_BREAKER.record_http_failure()
+            if assets_via_http:
+                logger.info("HTTP assets extraction returned no usable rows. Falling back to Selenium scraping.", stage="assets")
+        else:
+            logger.info("HTTP extraction disabled by circuit breaker. Using Selenium scraping.", stage="assets")
 
         if time_budget:
             time_budget.ensure_time_available(10, "coleta via Selenium")
-        page_load_timeout, script_timeout = _resolve_driver_timeouts(time_budget, 60, 60)
-        driver = setup_driver(page_load_timeout, script_timeout)
-        return extract_assets_data(driver, wallet_url, time_budget)
+        selenium_backend = EXTRACTION_BACKENDS.get("selenium")
+        page_load_timeout, script_timeout = resolve_driver_timeouts(time_budget, 60, 60)
+        driver = selenium_backend.setup_driver(page_load_timeout, script_timeout)
+        return selenium_backend.extract_assets_data(driver, wallet_url, time_budget)
     finally:
         if driver:
-            driver.quit()
+            EXTRACTION_BACKENDS.get("selenium").quit_driver(driver)
+
+@app.route("/diagnostics/strategies", methods=["GET"])
+def get_strategy_diagnostics():
+    """Show the extraction strategy currently selected by each circuit breaker.
+    ---
+    responses:
+      200:
+        description: Circuit breaker state for wallet and asset pages
+    """
+    return jsonify({
+        "wallet": WALLET_STRATEGY_BREAKER.snapshot(),
+        "asset": ASSET_STRATEGY_BREAKER.snapshot(),
+        "backends": EXTRACTION_BACKENDS.describe(),
+    })
+
+@app.route("/diagnostics/drivers", methods=["GET"])
+def get_driver_diagnostics():
+    """Show the Chrome drivers tracked by the watchdog and its kill counters.
+    ---
+    responses:
+      200:
+        description: Open drivers, resource limits and watchdog metrics
+    """
+    return jsonify(DRIVER_WATCHDOG.snapshot())
 
 @app.route("/test", methods=["GET"])
 def test():
@@ -709,6 +1063,12 @@ def test():
     return jsonify({"message": "Test successful"})
 
 if __name__ == "__main__":
+    if os.environ.get("HTML_PARSE_PROCESSES", "0").strip() not in ("", "0"):
+        # Spawned parser processes re-import the script that started them, which here is this
+        # whole module; `python serve.py` starts the same app without that cost.
+        logger.warning("HTML_PARSE_PROCESSES ignorado com python main.py; use python serve.py.")
+        os.environ["HTML_PARSE_PROCESSES"] = "0"
+    DRIVER_WATCHDOG.start()
     app.run(
         host="0.0.0.0",
         port=5000
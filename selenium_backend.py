@@ -0,0 +1,531 @@
+import re
+import time
+from dataclasses import dataclass
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from selenium.common.exceptions import (
+    NoSuchElementException,
+    StaleElementReferenceException,
+    TimeoutException,
+)
+from selenium.webdriver.common.by import By
+from selenium.webdriver.remote.webelement import WebElement
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.webdriver.support.ui import WebDriverWait
+
+from dividend_history import DividendHistoryEntry, parse_dividend_history_row
+from html_archive import archive_fetched_html, is_record_mode
+from structured_logging import get_logger
+from time_budget import (
+    ProcessingCancelledError,
+    ProcessingTimeoutError,
+    TimeBudget,
+    ensure_time_budget_available,
+    resolve_driver_timeouts,
+    resolve_wait_seconds,
+)
+from utils import (
+    block_resources_in_current_tab,
+    extract_table_data,
+    extract_table_header,
+    is_batch_group_expansion_enabled,
+    quit_driver,
+    setup_driver,
+    should_recycle_driver,
+)
+from wallet_entries import (
+    extract_wallet_entries,
+    extract_wallet_entries_in_parallel,
+    iter_wallet_entries_events,
+)
+
+__all__ = [
+    "DividendPageUnreadableError",
+    "DividendTabResult",
+    "extract_assets_data",
+    "extract_dividend_history_with_selenium",
+    "extract_wallet_entries",
+    "extract_wallet_entries_in_parallel",
+    "iter_dividend_histories_in_tabs",
+    "iter_wallet_entries_events",
+    "quit_driver",
+    "setup_driver",
+    "should_recycle_driver",
+]
+
+DIVIDEND_TAB_LOAD_SECONDS = 15
+DIVIDEND_TAB_SETTLE_SECONDS = 2
+DIVIDEND_TAB_POLL_SECONDS = 0.25
+TAB_PENDING = "pending"
+TAB_LOADED = "loaded"
+TAB_TIMED_OUT = "timed_out"
+# A new tab reports "complete" for about:blank until the asset page navigation commits.
+TAB_READY_STATE_SCRIPT = "return location.href === 'about:blank' ? 'loading' : document.readyState;"
+
+logger = get_logger("selenium_backend")
+
+
+class DividendPageUnreadableError(ProcessingTimeoutError):
+    """The asset page did not finish loading, or its dividends table could not be read."""
+
+
+def _wait_for(driver, wait_seconds: float, condition, time_budget: Optional[TimeBudget] = None):
+    """WebDriverWait that also stops polling as soon as the time budget is cancelled."""
+    def cancellable_condition(current_driver):
+        if time_budget is not None and time_budget.is_cancelled():
+            raise ProcessingCancelledError("Processamento cancelado.")
+        return condition(current_driver)
+
+    return WebDriverWait(driver, wait_seconds).until(cancellable_condition)
+
+
+def extract_assets_data(driver, url, time_budget: Optional[TimeBudget] = None):
+    collapsed_tables = []
+    assets_table_read = False
+    page_load_timeout, script_timeout = resolve_driver_timeouts(time_budget, 60, 60)
+    driver.set_page_load_timeout(page_load_timeout)
+    driver.set_script_timeout(script_timeout)
+    try:
+        driver.get(url)
+    except TimeoutException:
+        collapsed_tables.append({
+            "table_name": "assets",
+            "error": "Tempo limite ao carregar a carteira via Selenium."
+        })
+        return collapsed_tables
+    try:
+        wait_seconds = resolve_wait_seconds(time_budget, 20)
+        _wait_for(driver, wait_seconds, EC.presence_of_element_located((By.CSS_SELECTOR, "table")), time_budget)
+        assets_table = driver.find_element(By.CSS_SELECTOR, "table")
+        header = extract_table_header(assets_table)
+        assets_data = extract_table_data(assets_table)
+        collapsed_tables.append({
+            "table_name": "assets",
+            "header": header,
+            "rows": assets_data
+        })
+        assets_table_read = True
+    except TimeoutException:
+        collapsed_tables.append({
+            "table_name": "assets",
+            "error": "Tempo limite ao carregar a tabela principal de ativos."
+        })
+    except ProcessingCancelledError:
+        raise
+    except Exception as exception_info:
+        logger.warning("Erro ao ler a tabela principal: %s", exception_info, stage="assets")
+        collapsed_tables.append({
+            "table_name": "assets",
+            "error": str(exception_info)
+        })
+    group_tables = None
+    if is_batch_group_expansion_enabled():
+        group_tables = _expand_wallet_groups_in_batch(driver, time_budget)
+        if group_tables is None:
+            logger.info("Expansão em lote indisponível. Expandindo grupos um a um.", stage="assets")
+    if group_tables is None:
+        group_tables = _expand_wallet_groups_sequentially(driver, time_budget)
+    collapsed_tables.extend(group_tables)
+    if assets_table_read:
+        _archive_page_source(driver, url)
+    return collapsed_tables
+
+
+WALLET_GROUPS_BATCH_SCRIPT = """
+const timeoutMs = arguments[0];
+const done = arguments[arguments.length - 1];
+const cellTexts = (cells) => Array.from(cells)
+    .map((cell) => (cell.innerText || '').trim())
+    .filter((text) => text !== '');
+const groups = [];
+document.querySelectorAll("[onclick*='MyWallets.toogleClass']").forEach((element) => {
+    const nameElement = element.querySelector('.name_value');
+    const tableName = nameElement ? (nameElement.innerText || '').trim() : 'Unknown Table';
+    if (tableName.toUpperCase().includes('AÇÕES')) {
+        return;
+    }
+    const match = (element.getAttribute('onclick') || '').match(/toogleClass\\('([^']+)'/);
+    if (!match) {
+        groups.push({table_name: tableName, error: 'Could not identify target selector'});
+        return;
+    }
+    const group = {table_name: tableName, selector: match[1]};
+    try {
+        element.click();
+    } catch (clickError) {
+        group.error = String(clickError);
+    }
+    groups.push(group);
+});
+const startedAt = Date.now();
+const collect = () => {
+    const pending = groups.filter((group) => !group.error && !group.rows);
+    pending.forEach((group) => {
+        let table = null;
+        try {
+            table = document.querySelector(group.selector + ' table');
+        } catch (selectorError) {
+            group.error = String(selectorError);
+            return;
+        }
+        if (!table) {
+            return;
+        }
+        const headerRow = table.querySelector('thead tr');
+        group.header = headerRow ? cellTexts(headerRow.querySelectorAll('th')).join(' | ') : '';
+        group.rows = Array.from(table.querySelectorAll('tbody tr'))
+            .map((row) => cellTexts(row.querySelectorAll('td')).join(' | '))
+            .filter((row) => row !== '');
+    });
+    const stillPending = groups.some((group) => !group.error && !group.rows);
+    if (stillPending && Date.now() - startedAt < timeoutMs) {
+        setTimeout(collect, 250);
+        return;
+    }
+    done(groups.map((group) => {
+        if (group.error) {
+            return {table_name: group.table_name, error: group.error};
+        }
+        if (!group.rows) {
+            return {table_name: group.table_name, timed_out: true};
+        }
+        return {table_name: group.table_name, header: group.header, rows: group.rows};
+    }));
+};
+collect();
+"""
+
+
+def _expand_wallet_groups_in_batch(driver, time_budget: Optional[TimeBudget] = None):
+    ensure_time_budget_available(time_budget, 4, "a leitura de grupos de ativos")
+    wait_seconds = resolve_wait_seconds(time_budget, 15)
+    previous_script_timeout = driver.timeouts.script
+    try:
+        driver.set_script_timeout(wait_seconds + 5)
+        raw_groups = driver.execute_async_script(
+            WALLET_GROUPS_BATCH_SCRIPT, int(wait_seconds * 1000)
+        )
+    except Exception as batch_error:
+        logger.warning("Falha na expansão em lote dos grupos: %s", batch_error, stage="assets")
+        return None
+    finally:
+        driver.set_script_timeout(previous_script_timeout)
+    if not isinstance(raw_groups, list):
+        return None
+
+    group_tables = []
+    for raw_group in raw_groups:
+        table_name = raw_group.get("table_name", "Unknown Table")
+        if raw_group.get("timed_out"):
+            group_tables.append({
+                "table_name": table_name,
+                "error": "Tempo limite ao carregar os dados deste grupo de ativos."
+            })
+        elif raw_group.get("error"):
+            group_tables.append({
+                "table_name": table_name,
+                "error": raw_group["error"]
+            })
+        else:
+            group_tables.append({
+                "table_name": table_name,
+                "header": raw_group.get("header", ""),
+                "rows": raw_group.get("rows", [])
+            })
+    return group_tables
+
+
+def _expand_wallet_groups_sequentially(driver, time_budget: Optional[TimeBudget] = None):
+    group_tables = []
+    toggle_elements = driver.find_elements(
+        By.XPATH, "//*[contains(@onclick, 'MyWallets.toogleClass')]"
+    )
+    for element in toggle_elements:
+        ensure_time_budget_available(time_budget, 4, "a leitura de grupos de ativos")
+        try:
+            table_name = element.find_element(
+                By.CLASS_NAME, "name_value"
+            ).text.strip()
+        except:
+            table_name = "Unknown Table"
+        if "AÇÕES" in table_name.upper():
+            continue
+        onclick = element.get_attribute("onclick")
+        match = re.search(r"toogleClass\('([^']+)'", onclick)
+        if match:
+            selector = match.group(1)
+            try:
+                if _is_group_expanded(driver, selector):
+                    # Already opened by a batch pass that failed halfway; clicking again would collapse it.
+                    logger.debug("Grupo %s já expandido.", table_name, stage="assets")
+                else:
+                    driver.execute_script(
+                        "arguments[0].scrollIntoView({block: 'center'});", element
+                    )
+                    driver.execute_script("arguments[0].click();", element)
+                wait_seconds = resolve_wait_seconds(time_budget, 15)
+                _wait_for(
+                    driver,
+                    wait_seconds,
+                    EC.presence_of_element_located((By.CSS_SELECTOR, f"{selector} table")),
+                    time_budget,
+                )
+                container = driver.find_element(
+                    By.CSS_SELECTOR, selector
+                )
+                table = container.find_element(By.TAG_NAME, "table")
+                header = extract_table_header(table)
+                rows = extract_table_data(table)
+                group_tables.append({
+                    "table_name": table_name,
+                    "header": header,
+                    "rows": rows
+                })
+            except TimeoutException:
+                group_tables.append({
+                    "table_name": table_name,
+                    "error": "Tempo limite ao carregar os dados deste grupo de ativos."
+                })
+            except ProcessingCancelledError:
+                raise
+            except Exception as e:
+                group_tables.append({
+                    "table_name": table_name,
+                    "error": str(e)
+                })
+        else:
+            group_tables.append({
+                "table_name": table_name,
+                "error": "Could not identify target selector"
+            })
+    return group_tables
+
+
+def _is_group_expanded(driver, selector: str) -> bool:
+    try:
+        group_tables = driver.find_elements(By.CSS_SELECTOR, f"{selector} table")
+        return any(group_table.is_displayed() for group_table in group_tables)
+    except Exception:
+        return False
+
+
+def extract_dividend_history_with_selenium(
+    driver,
+    asset_url: str,
+    asset_code: str,
+    time_budget: TimeBudget,
+) -> List[DividendHistoryEntry] | None:
+    """Return the dividend history, or None when the loaded page has no dividends table.
+
+    Raises DividendPageUnreadableError when the page did not load or the table could not
+    be read, so that a slow page is reported as a failure instead of an asset without dividends.
+    """
+    page_load_timeout, script_timeout = resolve_driver_timeouts(time_budget, 35, 35)
+    driver.set_page_load_timeout(page_load_timeout)
+    driver.set_script_timeout(script_timeout)
+    max_wait = time_budget.clamp_timeout(15)
+    try:
+        driver.get(asset_url)
+    except TimeoutException:
+        logger.info("Timeout while loading the asset page.", asset=asset_code, stage="selenium")
+        raise DividendPageUnreadableError(f"Tempo limite ao carregar a página de dividendos de {asset_code}.")
+    try:
+        _wait_for(driver, max_wait, EC.presence_of_element_located((By.ID, 'table-dividends-history')), time_budget)
+    except TimeoutException:
+        if not _is_page_complete(driver):
+            logger.info("Timeout while waiting for dividends history.", asset=asset_code, stage="selenium")
+            raise DividendPageUnreadableError(f"Tempo limite ao carregar a página de dividendos de {asset_code}.")
+        logger.info("Dividends table not found.", asset=asset_code, stage="selenium")
+        _archive_page_source(driver, asset_url)
+        return None
+
+    for attempt_number in range(3):
+        time_budget.ensure_time_available(3, f"a leitura de dividendos de {asset_code}")
+        try:
+            dividends_history_table = driver.find_element(By.ID, 'table-dividends-history')
+        except NoSuchElementException:
+            logger.info("Dividends table not found.", asset=asset_code, stage="selenium")
+            _archive_page_source(driver, asset_url)
+            return None
+
+        try:
+            history_entries = _collect_dividend_history_from_table(dividends_history_table)
+            _archive_page_source(driver, asset_url)
+            if not history_entries:
+                return None
+
+            logger.debug(
+                "%d dividend date(s) found.", len(history_entries), asset=asset_code, stage="selenium", sampled=True
+            )
+            return history_entries
+        except StaleElementReferenceException:
+            remaining_attempts = 2 - attempt_number
+            logger.info(
+                "Stale element encountered while reading dividends. Retrying (%d attempts left).",
+                remaining_attempts,
+                asset=asset_code,
+                stage="selenium",
+            )
+            remaining_wait = time_budget.clamp_timeout(5)
+            try:
+                _wait_for(
+                    driver,
+                    remaining_wait,
+                    EC.presence_of_element_located((By.ID, 'table-dividends-history')),
+                    time_budget,
+                )
+            except TimeoutException:
+                break
+
+    logger.warning("Unable to read dividends table after retries.", asset=asset_code, stage="selenium")
+    raise DividendPageUnreadableError(f"Não foi possível ler a tabela de dividendos de {asset_code}.")
+
+
+def _archive_page_source(driver, url: str) -> None:
+    """Archive the rendered page under its URL, as the HTTP fetches do, so replay covers both paths."""
+    if not is_record_mode():
+        return
+    try:
+        page_source = driver.page_source
+    except Exception as page_source_error:
+        logger.debug("Unable to read the page source: %s", page_source_error, stage="selenium")
+        return
+    archive_fetched_html(url, page_source)
+
+
+def _is_page_complete(driver) -> bool:
+    try:
+        return driver.execute_script("return document.readyState;") == "complete"
+    except Exception:
+        return False
+
+
+@dataclass
+class _DividendTab:
+    asset_code: str
+    asset_url: str
+    opened_at: float
+    deadline: float
+    loaded_at: Optional[float] = None
+
+
+@dataclass
+class DividendTabResult:
+    asset_code: str
+    history_entries: Optional[List[DividendHistoryEntry]]
+    elapsed_seconds: float
+    timed_out: bool = False
+
+
+def iter_dividend_histories_in_tabs(
+    driver,
+    asset_pages: List[Tuple[str, str]],
+    time_budget: TimeBudget,
+    max_tabs: int = 4,
+) -> Iterator[DividendTabResult]:
+    """Yield the dividend history (or None) of each asset as parallel tabs of one browser finish loading.
+
+    Up to max_tabs asset pages load at the same time; each finished tab is closed and
+    replaced by the next queued asset, so the page latency is paid once per group of
+    tabs instead of once per asset.
+    """
+    queued_pages = list(asset_pages)
+    open_tabs: Dict[str, _DividendTab] = {}
+    home_handle = driver.current_window_handle
+    try:
+        while queued_pages or open_tabs:
+            time_budget.ensure_time_available(1, "a leitura de dividendos em abas")
+            while queued_pages and len(open_tabs) < max_tabs:
+                asset_code, asset_url = queued_pages.pop(0)
+                opened_at = time.monotonic()
+                tab_handle = _open_tab(driver, home_handle, asset_url)
+                open_tabs[tab_handle] = _DividendTab(
+                    asset_code=asset_code,
+                    asset_url=asset_url,
+                    opened_at=opened_at,
+                    deadline=opened_at + time_budget.clamp_timeout(DIVIDEND_TAB_LOAD_SECONDS),
+                )
+            for tab_handle, dividend_tab in list(open_tabs.items()):
+                tab_state, history_entries = _poll_dividend_tab(driver, tab_handle, dividend_tab)
+                if tab_state == TAB_PENDING:
+                    continue
+                _close_tab(driver, tab_handle)
+                del open_tabs[tab_handle]
+                yield DividendTabResult(
+                    asset_code=dividend_tab.asset_code,
+                    history_entries=history_entries,
+                    elapsed_seconds=time.monotonic() - dividend_tab.opened_at,
+                    timed_out=tab_state == TAB_TIMED_OUT,
+                )
+            if open_tabs:
+                time.sleep(DIVIDEND_TAB_POLL_SECONDS)
+    finally:
+        for tab_handle in open_tabs:
+            _close_tab(driver, tab_handle)
+        driver.switch_to.window(home_handle)
+
+
+def _open_tab(driver, home_handle: str, url: str) -> str:
+    known_handles = set(driver.window_handles)
+    driver.switch_to.window(home_handle)
+    driver.execute_script("window.open('about:blank', '_blank');")
+    new_handles = [handle for handle in driver.window_handles if handle not in known_handles]
+    if not new_handles:
+        raise RuntimeError(f"Unable to open a tab for {url}.")
+    driver.switch_to.window(new_handles[0])
+    block_resources_in_current_tab(driver)
+    # Navigating from a script returns at once, so the other tabs keep loading meanwhile.
+    driver.execute_script("window.location.href = arguments[0];", url)
+    return new_handles[0]
+
+
+def _close_tab(driver, tab_handle: str) -> None:
+    try:
+        driver.switch_to.window(tab_handle)
+        driver.close()
+    except Exception as close_error:
+        logger.debug("Unable to close tab: %s", close_error, stage="selenium")
+
+
+def _poll_dividend_tab(driver, tab_handle: str, dividend_tab: _DividendTab):
+    """Return (tab state, history) for one tab without waiting on it.
+
+    The tab is loaded once its table is read, or once the page has finished loading and
+    the settle window passed without the table. Reaching the deadline before either is a
+    timeout, which says nothing about the asset having dividends.
+    """
+    driver.switch_to.window(tab_handle)
+    now = time.monotonic()
+    dividend_tables = driver.find_elements(By.ID, 'table-dividends-history')
+    if dividend_tables:
+        try:
+            history_entries = _collect_dividend_history_from_table(dividend_tables[0])
+        except StaleElementReferenceException:
+            pass
+        else:
+            _archive_page_source(driver, dividend_tab.asset_url)
+            return TAB_LOADED, history_entries or None
+    elif driver.execute_script(TAB_READY_STATE_SCRIPT) != "complete":
+        dividend_tab.loaded_at = None
+    else:
+        if dividend_tab.loaded_at is None:
+            dividend_tab.loaded_at = now
+        if now - dividend_tab.loaded_at >= DIVIDEND_TAB_SETTLE_SECONDS:
+            logger.info("Dividends table not found.", asset=dividend_tab.asset_code, stage="selenium")
+            _archive_page_source(driver, dividend_tab.asset_url)
+            return TAB_LOADED, None
+
+    if now >= dividend_tab.deadline:
+        logger.info("Timeout while waiting for dividends history.", asset=dividend_tab.asset_code, stage="selenium")
+        return TAB_TIMED_OUT, None
+    return TAB_PENDING, None
+
+
+def _collect_dividend_history_from_table(dividends_table: WebElement) -> List[DividendHistoryEntry]:
+    history_entries: List[DividendHistoryEntry] = []
+    for dividends_row in dividends_table.find_elements(By.CSS_SELECTOR, 'tbody tr'):
+        cells = dividends_row.find_elements(By.TAG_NAME, 'td')
+        history_entry = parse_dividend_history_row([cell.text.strip() for cell in cells])
+        if history_entry:
+            history_entries.append(history_entry)
+    return history_entries
@@ -0,0 +1,14 @@
+"""Start the API with Flask's built-in server.
+
+    python serve.py
+
+The app is imported inside the ``__main__`` guard: the HTML parse pool (``HTML_PARSE_PROCESSES``)
+spawns processes that re-import this script, and they only need the parser modules, not the
+app, its stores and its driver watchdog.
+"""
+
+if __name__ == "__main__":
+    from main import DRIVER_WATCHDOG, app
+
+    DRIVER_WATCHDOG.start()
+    app.run(host="0.0.0.0", port=5000)
@@ -0,0 +1,102 @@
+from __future__ import annotations
+
+import threading
+import time
+from collections import deque
+from typing import Deque, Dict, Optional
+
+CLOSED_STATE = "closed"
+OPEN_STATE = "open"
+HALF_OPEN_STATE = "half_open"
+
+
+class StrategyCircuitBreaker:
+    """Decides whether the static HTTP path is worth trying before Selenium."""
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int = 3,
+        cool_down_seconds: float = 300.0,
+        probe_timeout_seconds: float = 60.0,
+        window_size: int = 20,
+    ) -> None:
+        self._name = name
+        self._failure_threshold = failure_threshold
+        self._cool_down_seconds = cool_down_seconds
+        self._probe_timeout_seconds = probe_timeout_seconds
+        self._recent_outcomes: Deque[bool] = deque(maxlen=window_size)
+        self._state = CLOSED_STATE
+        self._consecutive_failures = 0
+        self._opened_at: Optional[float] = None
+        self._probe_started_at: Optional[float] = None
+        self._trip_count = 0
+        self._lock = threading.Lock()
+
+    def should_try_http(self) -> bool:
+        with self._lock:
+            now = time.monotonic()
+            if self._state == CLOSED_STATE:
+                return True
+            if self._state == OPEN_STATE:
+                if now - (self._opened_at or now) < self._cool_down_seconds:
+                    return False
+                self._state = HALF_OPEN_STATE
+                self._probe_started_at = now
+                return True
+            if self._probe_started_at is None or now - self._probe_started_at > self._probe_timeout_seconds:
+                self._probe_started_at = now
+                return True
+            return False
+
+    def record_http_success(self) -> None:
+        with self._lock:
+            self._recent_outcomes.append(True)
+            self._consecutive_failures = 0
+            self._state = CLOSED_STATE
+            self._opened_at = None
+            self._probe_started_at = None
+
+    def record_http_failure(self) -> None:
+        with self._lock:
+            self._recent_outcomes.append(False)
+            self._consecutive_failures += 1
+            should_open = (
+                self._state == HALF_OPEN_STATE
+                or self._consecutive_failures >= self._failure_threshold
+            )
+            if should_open and self._state != OPEN_STATE:
+                self._trip_count += 1
+            if should_open:
+                self._state = OPEN_STATE
+                self._opened_at = time.monotonic()
+                self._probe_started_at = None
+
+    def current_strategy(self) -> str:
+        with self._lock:
+            if self._state == CLOSED_STATE:
+                return "http_first"
+            if self._state == HALF_OPEN_STATE:
+                return "probing_http"
+            return "selenium_only"
+
+    def snapshot(self) -> Dict[str, object]:
+        strategy = self.current_strategy()
+        with self._lock:
+            recent_count = len(self._recent_outcomes)
+            recent_failures = recent_count - sum(self._recent_outcomes)
+            cool_down_remaining = None
+            if self._state == OPEN_STATE and self._opened_at is not None:
+                cool_down_remaining = max(
+                    0.0, self._cool_down_seconds - (time.monotonic() - self._opened_at)
+                )
+            return {
+                "name": self._name,
+                "state": self._state,
+                "strategy": strategy,
+                "consecutive_failures": self._consecutive_failures,
+                "recent_outcomes": recent_count,
+                "recent_failure_rate": (recent_failures / recent_count) if recent_count else 0.0,
+                "trip_count": self._trip_count,
+                "cool_down_remaining_seconds": cool_down_remaining,
+            }
@@ -0,0 +1,137 @@
+from __future__ import annotations
+
+import atexit
+import contextlib
+import contextvars
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import sys
+import threading
+from datetime import datetime, timezone
+from typing import Dict, Iterator, Optional
+
+ROOT_LOGGER_NAME = "investidor10"
+RESERVED_KEYWORDS = {"exc_info", "stack_info", "stacklevel", "extra"}
+
+_LOG_CONTEXT: contextvars.ContextVar[Dict[str, object]] = contextvars.ContextVar("log_context", default={})
+_LISTENER: Optional[logging.handlers.QueueListener] = None
+_CONFIGURE_LOCK = threading.Lock()
+
+
+class StructuredLogger(logging.LoggerAdapter):
+    """Logger that accepts structured fields as keyword arguments.
+
+    ``logger.info("Ativo processado.", asset="PETR4", sampled=True)`` attaches ``asset`` to
+    the JSON record; ``sampled=True`` marks high-volume per-asset messages subject to
+    LOG_SAMPLE_RATE.
+    """
+
+    def process(self, msg, kwargs):
+        fields = dict(self.extra)
+        for keyword in list(kwargs):
+            if keyword not in RESERVED_KEYWORDS:
+                fields[keyword] = kwargs.pop(keyword)
+        kwargs["extra"] = {"fields": fields}
+        return msg, kwargs
+
+
+class JsonLogFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        log_entry: Dict[str, object] = {
+            "timestamp": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        log_entry.update(getattr(record, "context", {}))
+        log_entry.update(
+            (field_name, field_value)
+            for field_name, field_value in getattr(record, "fields", {}).items()
+            if field_name != "sampled"
+        )
+        if record.exc_info:
+            log_entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(log_entry, ensure_ascii=False, default=str)
+
+
+class TextLogFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        fields = {**getattr(record, "context", {}), **getattr(record, "fields", {})}
+        fields.pop("sampled", None)
+        stage = fields.pop("stage", None)
+        timestamp = datetime.fromtimestamp(record.created, timezone.utc).strftime("%Y-%m-%d %H:%M:%S %z")
+        prefix = f"{timestamp} {record.levelname}" + (f" [{stage}]" if stage else "")
+        suffix = " ".join(f"{field_name}={field_value}" for field_name, field_value in fields.items())
+        return f"{prefix} {record.getMessage()}" + (f" ({suffix})" if suffix else "")
+
+
+class ContextFilter(logging.Filter):
+    """Copy the current log context into the record before it leaves the calling thread."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.context = dict(_LOG_CONTEXT.get())
+        return True
+
+
+class SamplingFilter(logging.Filter):
+    def __init__(self, sample_rate: float) -> None:
+        super().__init__()
+        self._sample_rate = sample_rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING or not getattr(record, "fields", {}).get("sampled"):
+            return True
+        return random.random() < self._sample_rate
+
+
+def configure_logging() -> None:
+    """Route the application loggers through a queue drained by a background thread."""
+    global _LISTENER
+    with _CONFIGURE_LOCK:
+        if _LISTENER is not None:
+            return
+        stream_handler = logging.StreamHandler(sys.stdout)
+        if os.environ.get("LOG_FORMAT", "json").strip().lower() == "text":
+            stream_handler.setFormatter(TextLogFormatter())
+        else:
+            stream_handler.setFormatter(JsonLogFormatter())
+
+        log_queue: "queue.Queue[logging.LogRecord]" = queue.Queue(-1)
+        queue_handler = logging.handlers.QueueHandler(log_queue)
+        queue_handler.addFilter(ContextFilter())
+        queue_handler.addFilter(SamplingFilter(_read_sample_rate()))
+
+        root_logger = logging.getLogger(ROOT_LOGGER_NAME)
+        root_logger.setLevel(os.environ.get("LOG_LEVEL", "INFO").strip().upper())
+        root_logger.addHandler(queue_handler)
+        root_logger.propagate = False
+
+        _LISTENER = logging.handlers.QueueListener(log_queue, stream_handler, respect_handler_level=True)
+        _LISTENER.start()
+        atexit.register(_LISTENER.stop)
+
+
+def get_logger(name: str, **fields: object) -> StructuredLogger:
+    configure_logging()
+    return StructuredLogger(logging.getLogger(f"{ROOT_LOGGER_NAME}.{name}"), fields)
+
+
+@contextlib.contextmanager
+def log_context(**fields: object) -> Iterator[None]:
+    """Attach fields such as job_id to every record logged by this thread inside the block."""
+    context_token = _LOG_CONTEXT.set({**_LOG_CONTEXT.get(), **fields})
+    try:
+        yield
+    finally:
+        _LOG_CONTEXT.reset(context_token)
+
+
+def _read_sample_rate() -> float:
+    try:
+        return max(0.0, min(1.0, float(os.environ.get("LOG_SAMPLE_RATE", "1"))))
+    except ValueError:
+        return 1.0
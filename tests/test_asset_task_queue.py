@@ -0,0 +1,71 @@
+import time
+
+from asset_task_queue import AssetTaskQueue
+
+
+def _queue(tmp_path, max_attempts=3):
+    return AssetTaskQueue(str(tmp_path / "asset_tasks.sqlite3"), max_attempts=max_attempts)
+
+
+def _expire_leases(task_queue):
+    # Backdate every lease instead of sleeping through it.
+    task_queue._connection.execute("UPDATE asset_tasks SET lease_expires_at = ?", (time.time() - 1,))
+
+
+def test_a_leased_task_is_not_handed_to_another_worker(tmp_path):
+    task_queue = _queue(tmp_path)
+    task_id = task_queue.publish("batch", "MXRF11", "FIIs", time.time() + 60)
+
+    task = task_queue.lease("worker-a", lease_seconds=30)
+
+    assert task.task_id == task_id and task.asset_code == "MXRF11" and task.attempts == 1
+    assert task_queue.lease("worker-b", lease_seconds=30) is None
+    assert task_queue.count_leased("batch") == 1
+
+
+def test_an_expired_lease_goes_to_the_next_worker(tmp_path):
+    task_queue = _queue(tmp_path)
+    task_id = task_queue.publish("batch", "MXRF11", "FIIs", time.time() + 60)
+    task_queue.lease("worker-a", lease_seconds=30)
+    _expire_leases(task_queue)
+
+    task = task_queue.lease("worker-b", lease_seconds=30)
+
+    assert task.task_id == task_id and task.attempts == 2
+    assert not task_queue.extend_lease(task_id, "worker-a", 30)
+    assert not task_queue.complete(task_id, "worker-a", {"date_com": "01/01/2030"})
+    assert task_queue.extend_lease(task_id, "worker-b", 30)
+    assert task_queue.complete(task_id, "worker-b", {"date_com": "01/01/2030"})
+    assert task_queue.collect_results("batch") == {task_id: {"date_com": "01/01/2030"}}
+
+
+def test_a_task_fails_after_its_last_attempt_expires(tmp_path):
+    task_queue = _queue(tmp_path, max_attempts=2)
+    task_id = task_queue.publish("batch", "MXRF11", "FIIs", time.time() + 60)
+    for worker_id in ("worker-a", "worker-b"):
+        assert task_queue.lease(worker_id, lease_seconds=30) is not None
+        _expire_leases(task_queue)
+
+    assert task_queue.lease("worker-c", lease_seconds=30) is None
+    failure_reason = task_queue.collect_results("batch")[task_id]["failure_reason"]
+    assert "MXRF11" in failure_reason and "2 tentativa" in failure_reason
+
+
+def test_tasks_past_their_deadline_are_not_leased(tmp_path):
+    task_queue = _queue(tmp_path)
+    task_queue.publish("batch", "MXRF11", "FIIs", time.time() - 1)
+
+    assert task_queue.lease("worker-a", lease_seconds=30) is None
+    assert task_queue.count_leased("batch") == 0
+
+
+def test_purging_a_batch_revokes_its_leases(tmp_path):
+    task_queue = _queue(tmp_path)
+    task_id = task_queue.publish("batch", "MXRF11", "FIIs", time.time() + 60)
+    task_queue.publish("other", "HGLG11", "FIIs", time.time() + 60)
+    task_queue.lease("worker-a", lease_seconds=30)
+
+    task_queue.purge_batch("batch")
+
+    assert not task_queue.extend_lease(task_id, "worker-a", 30)
+    assert task_queue.lease("worker-b", lease_seconds=30).asset_code == "HGLG11"
@@ -0,0 +1,63 @@
+import asset_url_index
+from asset_url_index import AssetUrlIndex
+
+
+def _index(tmp_path):
+    return AssetUrlIndex(str(tmp_path / "asset_url_index.sqlite3"), negative_ttl_seconds=60)
+
+
+def test_inconclusive_probe_stops_probing_and_keeps_the_guess(tmp_path, monkeypatch):
+    probed_urls = []
+
+    def fake_probe(candidate_url, request_timeout_seconds):
+        probed_urls.append(candidate_url)
+        return None
+
+    monkeypatch.setattr(asset_url_index, "probe_asset_url", fake_probe)
+    index = _index(tmp_path)
+    guessed_url = asset_url_index.build_asset_url("fiis", "MXRF11")
+
+    assert index.resolve("MXRF11", guessed_url, probe_budget_seconds=30) == guessed_url
+    assert probed_urls == [guessed_url]
+    assert index.lookup("MXRF11") is None
+
+
+def test_missing_pages_are_cached_as_negative(tmp_path, monkeypatch):
+    monkeypatch.setattr(asset_url_index, "probe_asset_url", lambda candidate_url, request_timeout_seconds: False)
+    index = _index(tmp_path)
+
+    assert index.resolve("XXXX11", None, probe_budget_seconds=30) is None
+    cached_entry = index.lookup("XXXX11")
+    assert cached_entry.asset_url is None and cached_entry.reason == "not_found"
+
+
+def test_found_page_is_indexed(tmp_path, monkeypatch):
+    found_url = asset_url_index.build_asset_url("fiagros", "RURA11")
+    monkeypatch.setattr(
+        asset_url_index, "probe_asset_url", lambda candidate_url, request_timeout_seconds: candidate_url == found_url
+    )
+    index = _index(tmp_path)
+
+    assert index.resolve("RURA11", asset_url_index.build_asset_url("fiis", "RURA11"), 30) == found_url
+    assert index.lookup("RURA11").asset_url == found_url
+
+
+def test_replay_mode_uses_the_archived_url_without_probing(tmp_path, monkeypatch):
+    import html_archive
+
+    monkeypatch.setenv("HTML_ARCHIVE_MODE", "replay")
+    archive = html_archive.HtmlArchive(str(tmp_path / "archive"))
+    monkeypatch.setattr(html_archive, "_ARCHIVE", archive)
+    archived_url = asset_url_index.build_asset_url("fiagros", "RURA11")
+    archive.store(archived_url, "<html></html>")
+
+    def fail_probe(candidate_url, request_timeout_seconds):
+        raise AssertionError("replay mode must not probe")
+
+    monkeypatch.setattr(asset_url_index, "probe_asset_url", fail_probe)
+    index = _index(tmp_path)
+    guessed_url = asset_url_index.build_asset_url("fiis", "RURA11")
+
+    assert index.resolve("RURA11", guessed_url, 30) == archived_url
+    assert index.resolve("XPTO11", asset_url_index.build_asset_url("fiis", "XPTO11"), 30).endswith("/fiis/xpto11/")
+    assert index.lookup("RURA11") is None
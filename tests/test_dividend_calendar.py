@@ -0,0 +1,44 @@
+import math
+from datetime import date
+
+from dividend_calendar import build_dividend_calendar, extract_wallet_positions
+from dividend_history import DividendHistoryEntry
+
+
+def _resolve_url(asset_code, table_name):
+    return f"https://example.test/{asset_code.lower()}/"
+
+
+def test_rows_shorter_than_the_header_leave_their_columns_unknown():
+    tables = [{
+        "table_name": "FIIs",
+        "header": "Ativo | Quantidade | Preço médio",
+        "rows": ["MXRF11 | 100 | 10,50", "HGLG11 | 160,00"],
+    }]
+
+    positions = extract_wallet_positions(tables, _resolve_url)
+
+    assert (positions[0].asset, positions[0].quantity, positions[0].average_price) == ("MXRF11", 100.0, 10.5)
+    assert positions[1].asset == "HGLG11"
+    assert math.isnan(positions[1].quantity) and math.isnan(positions[1].average_price)
+
+
+def test_unknown_quantity_has_no_trailing_total():
+    tables = [{
+        "table_name": "FIIs",
+        "header": "Ativo | Quantidade | Preço médio",
+        "rows": ["MXRF11 | 100 | 10,00", "HGLG11 | 160,00"],
+    }]
+    positions = extract_wallet_positions(tables, _resolve_url)
+    histories = {
+        position.asset_url: [DividendHistoryEntry(date(2024, 5, 31), date(2024, 6, 14), 0.1, "Dividendos")]
+        for position in positions
+    }
+
+    calendar = build_dividend_calendar(positions, histories, date(2024, 6, 1))
+
+    totals = {asset["asset"]: asset["trailing_12m_total"] for asset in calendar["assets"]}
+    assert totals == {"MXRF11": 10.0, "HGLG11": None}
+    assert calendar["trailing_12m_total"] == 10.0
+    payment_events = [event for month in calendar["calendar"] for event in month["events"] if event["event"] == "payment"]
+    assert {event["asset"]: event["expected_total"] for event in payment_events} == {"MXRF11": 10.0, "HGLG11": None}
@@ -0,0 +1,108 @@
+import sqlite3
+from datetime import date
+
+from dividend_history_store import DividendHistoryStore
+from dividend_history import DividendHistoryEntry
+
+ASSET_URL = "https://investidor10.com.br/acoes/petr4/"
+
+
+def _entry(date_com, payment_date=None, amount=None, dividend_type="Dividendos"):
+    return DividendHistoryEntry(
+        date_com=date_com,
+        payment_date=payment_date,
+        amount=amount,
+        dividend_type=dividend_type,
+    )
+
+
+def test_merge_history_fills_in_payment_date_without_duplicating(tmp_path):
+    store = DividendHistoryStore(str(tmp_path / "history.sqlite3"))
+    store.merge_history(ASSET_URL, "PETR4", [_entry(date(2026, 5, 2), amount=0.5)])
+
+    changed_rows = store.merge_history(
+        ASSET_URL, "PETR4", [_entry(date(2026, 5, 2), payment_date=date(2026, 5, 20), amount=0.5)]
+    )
+
+    assert changed_rows == 1
+    assert store.get_history(ASSET_URL) == [
+        _entry(date(2026, 5, 2), payment_date=date(2026, 5, 20), amount=0.5)
+    ]
+
+
+def test_merge_history_corrects_amount_and_keeps_known_payment_date(tmp_path):
+    store = DividendHistoryStore(str(tmp_path / "history.sqlite3"))
+    store.merge_history(ASSET_URL, "PETR4", [_entry(date(2026, 5, 2), date(2026, 5, 20), 0.5)])
+
+    store.merge_history(ASSET_URL, "PETR4", [_entry(date(2026, 5, 2), amount=0.55)])
+
+    assert store.get_history(ASSET_URL) == [_entry(date(2026, 5, 2), date(2026, 5, 20), 0.55)]
+
+
+def test_merge_history_reports_no_change_for_a_repeated_scrape(tmp_path):
+    store = DividendHistoryStore(str(tmp_path / "history.sqlite3"))
+    history = [_entry(date(2026, 5, 2), date(2026, 5, 20), 0.5), _entry(date(2026, 2, 1), date(2026, 2, 15), 0.4)]
+    assert store.merge_history(ASSET_URL, "PETR4", history) == 2
+
+    assert store.merge_history(ASSET_URL, "PETR4", history) == 0
+    assert len(store.get_history(ASSET_URL)) == 2
+
+
+def test_merge_history_keeps_distinct_types_on_the_same_date(tmp_path):
+    store = DividendHistoryStore(str(tmp_path / "history.sqlite3"))
+
+    store.merge_history(ASSET_URL, "PETR4", [
+        _entry(date(2026, 5, 2), amount=0.5, dividend_type="Dividendos"),
+        _entry(date(2026, 5, 2), amount=0.2, dividend_type="JSCP"),
+    ])
+
+    assert len(store.get_history(ASSET_URL)) == 2
+
+
+def test_merge_history_skips_entries_older_than_the_latest_stored(tmp_path):
+    store = DividendHistoryStore(str(tmp_path / "history.sqlite3"))
+    store.merge_history(ASSET_URL, "PETR4", [_entry(date(2026, 5, 2), amount=0.5)])
+
+    store.merge_history(ASSET_URL, "PETR4", [_entry(date(2025, 1, 2), amount=0.3)])
+
+    assert [entry.date_com for entry in store.get_history(ASSET_URL)] == [date(2026, 5, 2)]
+
+
+def test_empty_scrape_does_not_mark_the_asset_as_updated(tmp_path):
+    store = DividendHistoryStore(str(tmp_path / "history.sqlite3"))
+
+    store.merge_history(ASSET_URL, "PETR4", [])
+
+    assert store.get_last_updated_at(ASSET_URL) is None
+
+
+def test_legacy_store_keyed_by_payment_date_is_collapsed(tmp_path):
+    database_path = str(tmp_path / "history.sqlite3")
+    connection = sqlite3.connect(database_path)
+    connection.execute(
+        """
+        CREATE TABLE dividend_history (
+            asset_url TEXT NOT NULL,
+            asset_code TEXT,
+            dividend_type TEXT NOT NULL DEFAULT '',
+            date_com TEXT NOT NULL,
+            payment_date TEXT NOT NULL DEFAULT '',
+            amount REAL,
+            stored_at REAL NOT NULL,
+            PRIMARY KEY (asset_url, date_com, payment_date, dividend_type)
+        )
+        """
+    )
+    connection.executemany(
+        "INSERT INTO dividend_history VALUES (?, ?, ?, ?, ?, ?, ?)",
+        [
+            (ASSET_URL, "PETR4", "Dividendos", "2026-05-02", "", 0.5, 1.0),
+            (ASSET_URL, "PETR4", "Dividendos", "2026-05-02", "2026-05-20", 0.5, 2.0),
+        ],
+    )
+    connection.commit()
+    connection.close()
+
+    store = DividendHistoryStore(database_path)
+
+    assert store.get_history(ASSET_URL) == [_entry(date(2026, 5, 2), date(2026, 5, 20), 0.5)]
@@ -0,0 +1,46 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+import driver_watchdog
+from driver_watchdog import DriverWatchdog, tagged_driver_environment
+
+
+@pytest.mark.skipif(not os.path.isdir("/proc"), reason="needs /proc")
+def test_only_processes_started_with_the_tag_carry_it():
+    sleep_command = [sys.executable, "-c", "import time; time.sleep(30)"]
+    tagged_process = subprocess.Popen(sleep_command, env=tagged_driver_environment())
+    untagged_process = subprocess.Popen(sleep_command)
+    try:
+        assert driver_watchdog._carries_driver_tag(tagged_process.pid)
+        assert not driver_watchdog._carries_driver_tag(untagged_process.pid)
+    finally:
+        tagged_process.kill()
+        untagged_process.kill()
+        tagged_process.wait()
+        untagged_process.wait()
+
+
+def test_orphan_reaper_leaves_untagged_drivers_alone(monkeypatch):
+    killed_pids = []
+    monkeypatch.setattr(driver_watchdog, "_list_processes", lambda: [
+        (101, 1, "chromedriver", 600.0),
+        (102, 1, "chromedriver", 600.0),
+        (103, 1, "chromedriver", 5.0),
+    ])
+    monkeypatch.setattr(driver_watchdog, "_carries_driver_tag", lambda pid: pid in (101, 103))
+    monkeypatch.setattr(driver_watchdog, "_list_process_tree", lambda pid: [pid])
+    monkeypatch.setattr(driver_watchdog, "_kill_processes", killed_pids.extend)
+
+    DriverWatchdog(orphan_grace_seconds=120, reap_orphans=True).reap()
+
+    assert killed_pids == [101]
+
+
+def test_orphan_reaping_is_off_by_default(monkeypatch):
+    monkeypatch.delenv("SELENIUM_REAP_ORPHANS", raising=False)
+    monkeypatch.setattr(driver_watchdog, "_WATCHDOG", None)
+
+    assert not driver_watchdog.get_driver_watchdog()._reap_orphans
@@ -0,0 +1,223 @@
+import time
+
+import pytest
+from selenium.common.exceptions import StaleElementReferenceException, TimeoutException
+
+import html_archive
+import selenium_backend
+from selenium_backend import (
+    TAB_LOADED,
+    TAB_PENDING,
+    TAB_TIMED_OUT,
+    DividendPageUnreadableError,
+    _DividendTab,
+    _poll_dividend_tab,
+)
+from time_budget import TimeBudget
+
+
+class FakeCell:
+    def __init__(self, text):
+        self.text = text
+
+
+class FakeRow:
+    def __init__(self, cell_texts):
+        self._cells = [FakeCell(text) for text in cell_texts]
+
+    def find_elements(self, by, value):
+        return self._cells
+
+
+class FakeTable:
+    def __init__(self, rows):
+        self._rows = [FakeRow(row) for row in rows]
+
+    def find_elements(self, by, value):
+        return self._rows
+
+
+class FakeSwitchTo:
+    def window(self, handle):
+        return None
+
+
+class FakeTabDriver:
+    def __init__(self, ready_state="loading", tables=()):
+        self.ready_state = ready_state
+        self.tables = list(tables)
+        self.switch_to = FakeSwitchTo()
+        self.page_source = "<html><table id='table-dividends-history'></table></html>"
+
+    def find_elements(self, by, value):
+        return self.tables
+
+    def execute_script(self, script, *arguments):
+        return self.ready_state
+
+
+def _tab(deadline_in_seconds, loaded_seconds_ago=None):
+    now = time.monotonic()
+    return _DividendTab(
+        asset_code="MXRF11",
+        asset_url="https://example.test/fiis/mxrf11/",
+        opened_at=now,
+        deadline=now + deadline_in_seconds,
+        loaded_at=None if loaded_seconds_ago is None else now - loaded_seconds_ago,
+    )
+
+
+def test_a_page_still_loading_at_the_deadline_times_out():
+    assert _poll_dividend_tab(FakeTabDriver("loading"), "tab", _tab(-1)) == (TAB_TIMED_OUT, None)
+
+
+def test_a_loaded_page_inside_the_settle_window_at_the_deadline_times_out():
+    dividend_tab = _tab(-1)
+
+    assert _poll_dividend_tab(FakeTabDriver("complete"), "tab", dividend_tab) == (TAB_TIMED_OUT, None)
+    assert dividend_tab.loaded_at is not None
+
+
+def test_a_loaded_page_without_the_table_after_settling_has_no_dividends():
+    dividend_tab = _tab(-1, loaded_seconds_ago=selenium_backend.DIVIDEND_TAB_SETTLE_SECONDS + 1)
+
+    assert _poll_dividend_tab(FakeTabDriver("complete"), "tab", dividend_tab) == (TAB_LOADED, None)
+
+
+def test_a_loading_page_before_the_deadline_is_pending_and_restarts_the_settle_window():
+    dividend_tab = _tab(10, loaded_seconds_ago=1)
+
+    assert _poll_dividend_tab(FakeTabDriver("loading"), "tab", dividend_tab) == (TAB_PENDING, None)
+    assert dividend_tab.loaded_at is None
+
+
+def test_the_table_is_read_even_past_the_deadline():
+    dividends_table = FakeTable([["Dividendos", "31/05/2024", "14/06/2024", "0,10"]])
+
+    tab_state, history_entries = _poll_dividend_tab(FakeTabDriver("loading", [dividends_table]), "tab", _tab(-1))
+
+    assert tab_state == TAB_LOADED
+    assert [(entry.date_com.isoformat(), entry.amount) for entry in history_entries] == [("2024-05-31", 0.1)]
+
+
+@pytest.mark.parametrize("ready_state, expected_timeout", [("loading", True), ("complete", False)])
+def test_iter_dividend_histories_in_tabs_reports_timeouts(monkeypatch, ready_state, expected_timeout):
+    class FakeBudget:
+        def ensure_time_available(self, minimum_required, context):
+            return None
+
+        def clamp_timeout(self, timeout_seconds):
+            return 0
+
+    monkeypatch.setattr(selenium_backend, "DIVIDEND_TAB_SETTLE_SECONDS", 0)
+    monkeypatch.setattr(selenium_backend, "_open_tab", lambda driver, home_handle, url: f"tab:{url}")
+    monkeypatch.setattr(selenium_backend, "_close_tab", lambda driver, tab_handle: None)
+    driver = FakeTabDriver(ready_state)
+    driver.current_window_handle = "home"
+
+    tab_results = list(selenium_backend.iter_dividend_histories_in_tabs(
+        driver, [("MXRF11", "https://example.test/fiis/mxrf11/")], FakeBudget()
+    ))
+
+    assert [(result.asset_code, result.history_entries, result.timed_out) for result in tab_results] == [
+        ("MXRF11", None, expected_timeout)
+    ]
+
+
+class FakePageDriver(FakeTabDriver):
+    def __init__(self, ready_state="complete", tables=(), page_load_times_out=False):
+        super().__init__(ready_state, tables)
+        self.page_load_times_out = page_load_times_out
+
+    def set_page_load_timeout(self, seconds):
+        return None
+
+    def set_script_timeout(self, seconds):
+        return None
+
+    def get(self, url):
+        if self.page_load_times_out:
+            raise TimeoutException("page load")
+
+    def find_element(self, by, value):
+        return self.tables[0]
+
+
+def _raise_wait_timeout(driver, wait_seconds, condition, time_budget=None):
+    raise TimeoutException("wait")
+
+
+def _read_page(driver):
+    return selenium_backend.extract_dividend_history_with_selenium(
+        driver, "https://example.test/fiis/mxrf11/", "MXRF11", TimeBudget(60)
+    )
+
+
+def test_page_load_timeout_is_reported_as_unreadable():
+    with pytest.raises(DividendPageUnreadableError):
+        _read_page(FakePageDriver(page_load_times_out=True))
+
+
+def test_table_wait_timeout_on_a_page_still_loading_is_unreadable(monkeypatch):
+    monkeypatch.setattr(selenium_backend, "_wait_for", _raise_wait_timeout)
+
+    with pytest.raises(DividendPageUnreadableError):
+        _read_page(FakePageDriver(ready_state="interactive"))
+
+
+def test_loaded_page_without_the_table_has_no_dividends(monkeypatch):
+    monkeypatch.setattr(selenium_backend, "_wait_for", _raise_wait_timeout)
+
+    assert _read_page(FakePageDriver(ready_state="complete")) is None
+
+
+def test_exhausted_stale_retries_are_unreadable(monkeypatch):
+    class StaleTable:
+        def find_elements(self, by, value):
+            raise StaleElementReferenceException("stale")
+
+    monkeypatch.setattr(selenium_backend, "_wait_for", lambda *arguments, **keywords: True)
+
+    with pytest.raises(DividendPageUnreadableError):
+        _read_page(FakePageDriver(tables=[StaleTable()]))
+
+
+def test_read_table_returns_its_history(monkeypatch):
+    monkeypatch.setattr(selenium_backend, "_wait_for", lambda *arguments, **keywords: True)
+    dividends_table = FakeTable([["Dividendos", "31/05/2024", "14/06/2024", "0,10"]])
+
+    history_entries = _read_page(FakePageDriver(tables=[dividends_table]))
+
+    assert [entry.amount for entry in history_entries] == [0.1]
+
+
+@pytest.fixture
+def recorded_archive(monkeypatch, tmp_path):
+    monkeypatch.setenv("HTML_ARCHIVE_MODE", "record")
+    archive = html_archive.HtmlArchive(str(tmp_path))
+    monkeypatch.setattr(html_archive, "_ARCHIVE", archive)
+    return archive
+
+
+def test_read_table_archives_the_rendered_page(monkeypatch, recorded_archive):
+    monkeypatch.setattr(selenium_backend, "_wait_for", lambda *arguments, **keywords: True)
+    driver = FakePageDriver(tables=[FakeTable([["Dividendos", "31/05/2024", "14/06/2024", "0,10"]])])
+
+    _read_page(driver)
+
+    assert recorded_archive.load_latest("https://example.test/fiis/mxrf11/") == driver.page_source
+
+
+def test_unreadable_page_is_not_archived(recorded_archive):
+    with pytest.raises(DividendPageUnreadableError):
+        _read_page(FakePageDriver(page_load_times_out=True))
+
+    assert not recorded_archive.has_page("https://example.test/fiis/mxrf11/")
+
+
+def test_loaded_tab_archives_the_rendered_page(recorded_archive):
+    driver = FakeTabDriver("complete", [FakeTable([["Dividendos", "31/05/2024", "14/06/2024", "0,10"]])])
+
+    _poll_dividend_tab(driver, "tab", _tab(10))
+
+    assert recorded_archive.load_latest("https://example.test/fiis/mxrf11/") == driver.page_source
@@ -0,0 +1,97 @@
+import strategy_breaker
+from strategy_breaker import CLOSED_STATE, HALF_OPEN_STATE, OPEN_STATE, StrategyCircuitBreaker
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+
+def _breaker(monkeypatch, **options):
+    clock = FakeClock()
+    monkeypatch.setattr(strategy_breaker.time, "monotonic", clock.monotonic)
+    return StrategyCircuitBreaker("asset", **options), clock
+
+
+def _open(breaker, failures=3):
+    for _ in range(failures):
+        breaker.record_http_failure()
+
+
+def test_opens_after_consecutive_failures_only(monkeypatch):
+    breaker, _ = _breaker(monkeypatch, failure_threshold=3)
+    breaker.record_http_failure()
+    breaker.record_http_failure()
+    breaker.record_http_success()
+    breaker.record_http_failure()
+
+    assert breaker.snapshot()["state"] == CLOSED_STATE
+    assert breaker.should_try_http()
+
+    breaker.record_http_failure()
+    breaker.record_http_failure()
+
+    assert breaker.snapshot()["state"] == OPEN_STATE
+    assert breaker.current_strategy() == "selenium_only"
+    assert not breaker.should_try_http()
+
+
+def test_half_opens_for_a_single_probe_after_the_cool_down(monkeypatch):
+    breaker, clock = _breaker(monkeypatch, cool_down_seconds=300, probe_timeout_seconds=60)
+    _open(breaker)
+
+    clock.now += 299
+    assert not breaker.should_try_http()
+    clock.now += 2
+    assert breaker.should_try_http()
+    assert breaker.current_strategy() == "probing_http"
+    assert not breaker.should_try_http()
+
+    clock.now += 61
+    assert breaker.should_try_http()
+
+
+def test_successful_probe_closes_the_breaker(monkeypatch):
+    breaker, clock = _breaker(monkeypatch, cool_down_seconds=300)
+    _open(breaker)
+    clock.now += 301
+    assert breaker.should_try_http()
+
+    breaker.record_http_success()
+
+    snapshot = breaker.snapshot()
+    assert snapshot["state"] == CLOSED_STATE and snapshot["consecutive_failures"] == 0
+    assert breaker.should_try_http()
+
+
+def test_failed_probe_reopens_for_a_new_cool_down(monkeypatch):
+    breaker, clock = _breaker(monkeypatch, cool_down_seconds=300)
+    _open(breaker)
+    clock.now += 301
+    assert breaker.should_try_http()
+    assert breaker.snapshot()["state"] == HALF_OPEN_STATE
+
+    breaker.record_http_failure()
+
+    snapshot = breaker.snapshot()
+    assert snapshot["state"] == OPEN_STATE
+    assert snapshot["trip_count"] == 2
+    assert snapshot["cool_down_remaining_seconds"] == 300
+    assert not breaker.should_try_http()
+
+
+def test_snapshot_reports_the_recent_failure_rate(monkeypatch):
+    breaker, _ = _breaker(monkeypatch, window_size=4)
+    for succeeded in (True, False, True, True, False, False):
+        if succeeded:
+            breaker.record_http_success()
+        else:
+            breaker.record_http_failure()
+
+    snapshot = breaker.snapshot()
+    assert snapshot["recent_outcomes"] == 4
+    assert snapshot["recent_failure_rate"] == 0.5
+    assert snapshot["trip_count"] == 0
@@ -0,0 +1,79 @@
+import time
+
+import pytest
+
+import main
+from wallet_snapshots import WalletSnapshot, WalletSnapshotStore, build_wallet_positions
+
+WALLET_URL = "https://example.test/wallet/1"
+TABLES = [{
+    "table_name": "FIIs",
+    "header": "Ativo | Quantidade",
+    "rows": ["MXRF11 | 100", "HGLG11 | 10"],
+}]
+
+
+@pytest.fixture
+def snapshot_store(monkeypatch, tmp_path):
+    store = WalletSnapshotStore(str(tmp_path / "wallet_snapshots.sqlite3"))
+    monkeypatch.setattr(main, "WALLET_SNAPSHOT_STORE", store)
+    return store
+
+
+def _save_snapshot(store, results, captured_at):
+    store.save(WalletSnapshot(
+        wallet_url=WALLET_URL,
+        positions=build_wallet_positions(TABLES),
+        results=results,
+        captured_at=captured_at,
+    ))
+
+
+def test_unchanged_assets_with_stale_results_are_resolved_again(snapshot_store):
+    now = time.time()
+    stale_at = now - main.DIVIDEND_DATE_CACHE_TTL_SECONDS - 60
+    _save_snapshot(snapshot_store, [
+        {"asset": "MXRF11", "date_com": "31/12/2099", "resolved_at": stale_at},
+        {"asset": "HGLG11", "date_com": "30/12/2099", "resolved_at": now},
+    ], captured_at=now)
+
+    data_com_plan = main.plan_wallet_data_com(WALLET_URL, TABLES, incremental=True)
+
+    assert data_com_plan["assets_to_resolve"] == {"MXRF11"}
+    assert [result["asset"] for result in data_com_plan["reused_results"]] == ["HGLG11"]
+
+
+def test_reused_results_keep_their_resolution_time(snapshot_store):
+    resolved_at = time.time() - 60
+    _save_snapshot(snapshot_store, [
+        {"asset": "HGLG11", "date_com": "30/12/2099", "resolved_at": resolved_at},
+    ], captured_at=time.time())
+    data_com_plan = main.plan_wallet_data_com(WALLET_URL, TABLES, incremental=True)
+
+    payload = main.finalize_wallet_data_com(WALLET_URL, data_com_plan, {
+        "results": [{"asset": "MXRF11", "date_com": "31/12/2099"}],
+        "failures": [],
+    })
+
+    assert payload["results"] == [
+        {"asset": "HGLG11", "date_com": "30/12/2099"},
+        {"asset": "MXRF11", "date_com": "31/12/2099"},
+    ]
+    saved_results = {result["asset"]: result for result in snapshot_store.get(WALLET_URL).results}
+    assert saved_results["HGLG11"]["resolved_at"] == resolved_at
+    assert saved_results["MXRF11"]["resolved_at"] > resolved_at
+
+
+@pytest.mark.parametrize("query, signing_secret, expected_error", [
+    ("&async=false", "secret", "callback_url requires async=true"),
+    ("", None, "callback_url requires WEBHOOK_SECRET to be configured"),
+])
+def test_data_com_rejects_callbacks_that_would_be_ignored_or_unsigned(monkeypatch, query, signing_secret, expected_error):
+    monkeypatch.setattr(main.WEBHOOK_DISPATCHER, "_signing_secret", signing_secret)
+
+    response = main.app.test_client().get(
+        f"/data-com?wallet_url={WALLET_URL}&callback_url=https://hooks.example.com/data-com{query}"
+    )
+
+    assert response.status_code == 400
+    assert response.get_json() == {"error": expected_error}
@@ -0,0 +1,26 @@
+from wallet_entries import merge_page_rows
+
+
+def test_pages_are_concatenated_in_page_order():
+    scraped_pages = {
+        2: ["COMPRA | MXRF11 | 05/01/2024"],
+        0: ["COMPRA | HGLG11 | 01/01/2024", "VENDA | HGLG11 | 02/01/2024"],
+        1: ["COMPRA | MXRF11 | 03/01/2024"],
+    }
+
+    assert merge_page_rows(scraped_pages) == [
+        "COMPRA | HGLG11 | 01/01/2024",
+        "VENDA | HGLG11 | 02/01/2024",
+        "COMPRA | MXRF11 | 03/01/2024",
+        "COMPRA | MXRF11 | 05/01/2024",
+    ]
+
+
+def test_identical_orders_on_different_pages_are_kept():
+    repeated_order = "COMPRA | MXRF11 | 03/01/2024 | 10 | R$ 10,00"
+
+    assert merge_page_rows({0: [repeated_order], 1: [repeated_order]}) == [repeated_order, repeated_order]
+
+
+def test_no_pages_give_no_rows():
+    assert merge_page_rows({}) == []
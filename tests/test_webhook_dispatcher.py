@@ -0,0 +1,50 @@
+import socket
+
+import pytest
+
+import webhook_dispatcher
+from webhook_dispatcher import is_valid_callback_url
+
+
+def _resolve_to(monkeypatch, *addresses):
+    def fake_getaddrinfo(host, port, proto=0):
+        return [(socket.AF_INET, socket.SOCK_STREAM, proto, "", (address, port)) for address in addresses]
+
+    monkeypatch.setattr(webhook_dispatcher.socket, "getaddrinfo", fake_getaddrinfo)
+
+
+@pytest.mark.parametrize("address", ["127.0.0.1", "10.0.0.5", "192.168.1.10", "169.254.169.254", "::1", "fd00::1"])
+def test_rejects_hosts_resolving_to_internal_addresses(monkeypatch, address):
+    _resolve_to(monkeypatch, address)
+
+    assert not is_valid_callback_url("https://hooks.example.com/data-com")
+
+
+def test_rejects_when_any_resolved_address_is_internal(monkeypatch):
+    _resolve_to(monkeypatch, "93.184.216.34", "10.0.0.5")
+
+    assert not is_valid_callback_url("https://hooks.example.com/data-com")
+
+
+def test_accepts_public_hosts(monkeypatch):
+    _resolve_to(monkeypatch, "93.184.216.34")
+
+    assert is_valid_callback_url("https://hooks.example.com/data-com")
+
+
+def test_rejects_non_http_and_unresolvable_urls(monkeypatch):
+    def failing_getaddrinfo(host, port, proto=0):
+        raise socket.gaierror("unknown host")
+
+    monkeypatch.setattr(webhook_dispatcher.socket, "getaddrinfo", failing_getaddrinfo)
+
+    assert not is_valid_callback_url("ftp://hooks.example.com/")
+    assert not is_valid_callback_url("https://missing.example.com/")
+
+
+def test_allowlisted_hosts_skip_the_address_check(monkeypatch):
+    _resolve_to(monkeypatch, "10.0.0.5")
+    monkeypatch.setenv("WEBHOOK_ALLOWED_HOSTS", "receiver.internal, other.internal")
+
+    assert is_valid_callback_url("http://receiver.internal:8080/hook")
+    assert not is_valid_callback_url("http://unlisted.internal/hook")
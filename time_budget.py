@@ -0,0 +1,77 @@
+import threading
+import time
+from typing import Optional
+
+
+class ProcessingTimeoutError(Exception):
+    """Raised when the processing budget is exceeded."""
+
+
+class ProcessingCancelledError(ProcessingTimeoutError):
+    """Raised when the task owning the budget was cancelled."""
+
+
+class TimeBudget:
+    """Manages a time budget for long-running tasks."""
+
+    def __init__(self, total_seconds: float):
+        safe_seconds = total_seconds if total_seconds > 0 else 60
+        self.deadline = time.monotonic() + safe_seconds
+        self._cancelled = threading.Event()
+
+    def cancel(self) -> None:
+        """Exhaust the budget so every later check stops the task."""
+        self._cancelled.set()
+
+    def is_cancelled(self) -> bool:
+        return self._cancelled.is_set()
+
+    def remaining_seconds(self) -> float:
+        if self._cancelled.is_set():
+            return 0.0
+        return max(0.0, self.deadline - time.monotonic())
+
+    def ensure_time_available(self, minimum_required: float, context: str) -> None:
+        self._ensure_not_cancelled()
+        if self.remaining_seconds() < minimum_required:
+            raise ProcessingTimeoutError(f"Tempo limite atingido ao processar {context}.")
+
+    def clamp_timeout(self, requested_seconds: float) -> float:
+        self._ensure_not_cancelled()
+        remaining = self.remaining_seconds()
+        if remaining <= 0:
+            raise ProcessingTimeoutError("Tempo limite atingido.")
+        return max(1.0, min(requested_seconds, remaining))
+
+    def _ensure_not_cancelled(self) -> None:
+        if self._cancelled.is_set():
+            raise ProcessingCancelledError("Processamento cancelado.")
+
+
+def resolve_wait_seconds(time_budget: Optional[TimeBudget], requested_seconds: float) -> float:
+    if time_budget is None:
+        return requested_seconds
+    return time_budget.clamp_timeout(requested_seconds)
+
+
+def ensure_time_budget_available(
+    time_budget: Optional[TimeBudget],
+    minimum_required: float,
+    context: str,
+) -> None:
+    if time_budget is None:
+        return
+    time_budget.ensure_time_available(minimum_required, context)
+
+
+def resolve_driver_timeouts(
+    time_budget: Optional[TimeBudget],
+    page_load_seconds: float,
+    script_timeout_seconds: float,
+) -> tuple[float, float]:
+    if time_budget is None:
+        return page_load_seconds, script_timeout_seconds
+    return (
+        time_budget.clamp_timeout(page_load_seconds),
+        time_budget.clamp_timeout(script_timeout_seconds),
+    )
@@ -1,22 +1,127 @@
+import os
 import time
+from typing import Optional
+
 from selenium import webdriver
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.common.by import By
 
-def setup_driver(page_load_timeout_seconds: float = 300, script_timeout_seconds: float = 300):
+from driver_watchdog import get_driver_watchdog, tagged_driver_environment
+from structured_logging import get_logger
+
+LEAN_BLOCKED_URL_PATTERNS = [
+    "*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.svg", "*.ico",
+    "*.woff", "*.woff2", "*.ttf", "*.otf", "*.eot",
+    "*.css",
+    "*.mp4", "*.webm", "*.mp3",
+    "*googletagmanager.com*", "*google-analytics.com*", "*doubleclick.net*",
+    "*googlesyndication.com*", "*googleadservices.com*", "*adservice.google.com*",
+    "*facebook.net*", "*facebook.com/tr*", "*hotjar.com*", "*clarity.ms*",
+    "*tiktok.com*", "*taboola.com*", "*outbrain.com*", "*criteo.com*",
+    "*onesignal.com*", "*fonts.googleapis.com*", "*fonts.gstatic.com*",
+]
+
+LEAN_DISABLED_FEATURES = [
+    "Translate",
+    "OptimizationHints",
+    "MediaRouter",
+    "InterestFeedContentSuggestions",
+    "CalculateNativeWinOcclusion",
+    "AutofillServerCommunication",
+]
+
+logger = get_logger("utils")
+
+
+def _read_boolean_env(variable_name: str, default_value: bool) -> bool:
+    raw_value = os.environ.get(variable_name)
+    if raw_value is None:
+        return default_value
+    return raw_value.strip().lower() not in {"false", "0", "no", "off"}
+
+
+def is_lean_browser_enabled() -> bool:
+    return _read_boolean_env("SELENIUM_LEAN_MODE", True)
+
+
+def is_resource_blocking_enabled() -> bool:
+    return _read_boolean_env("SELENIUM_BLOCK_RESOURCES", True)
+
+
+def is_batch_group_expansion_enabled() -> bool:
+    return _read_boolean_env("SELENIUM_BATCH_EXPAND", True)
+
+
+def setup_driver(
+    page_load_timeout_seconds: float = 300,
+    script_timeout_seconds: float = 300,
+    lean_mode: Optional[bool] = None,
+):
+    use_lean_mode = is_lean_browser_enabled() if lean_mode is None else lean_mode
     options = Options()
     options.add_argument('--headless')
     options.add_argument('--no-sandbox')
     options.add_argument('--disable-dev-shm-usage')
-    options.add_argument('--remote-debugging-port=9222')
+    if use_lean_mode:
+        _apply_lean_browser_options(options)
     options.binary_location = "/usr/bin/google-chrome"
-    service = Service(executable_path="/usr/local/bin/chromedriver")
+    service = Service(executable_path="/usr/local/bin/chromedriver", env=tagged_driver_environment())
     driver = webdriver.Chrome(service=service, options=options)
+    get_driver_watchdog().register(driver)
     driver.set_page_load_timeout(page_load_timeout_seconds)
     driver.set_script_timeout(script_timeout_seconds)
+    if use_lean_mode and is_resource_blocking_enabled():
+        _block_non_essential_resources(driver)
     return driver
 
+
+def quit_driver(driver) -> None:
+    get_driver_watchdog().quit(driver)
+
+
+def should_recycle_driver(driver) -> bool:
+    recycle_reason = get_driver_watchdog().recycle_reason(driver)
+    if recycle_reason:
+        logger.info("Recycling Chrome driver (%s limit reached).", recycle_reason, stage="selenium")
+    return recycle_reason is not None
+
+
+def _apply_lean_browser_options(options: Options) -> None:
+    options.page_load_strategy = 'eager'
+    options.add_argument('--disable-extensions')
+    options.add_argument('--disable-gpu')
+    options.add_argument('--disable-background-networking')
+    options.add_argument('--disable-default-apps')
+    options.add_argument('--disable-sync')
+    options.add_argument('--disable-component-update')
+    options.add_argument('--disable-notifications')
+    options.add_argument('--mute-audio')
+    options.add_argument('--no-first-run')
+    options.add_argument('--metrics-recording-only')
+    options.add_argument(f"--disable-features={','.join(LEAN_DISABLED_FEATURES)}")
+    if is_resource_blocking_enabled():
+        options.add_argument('--blink-settings=imagesEnabled=false')
+        options.add_experimental_option("prefs", {
+            "profile.managed_default_content_settings.images": 2,
+            "profile.managed_default_content_settings.fonts": 2,
+            "profile.managed_default_content_settings.notifications": 2,
+        })
+
+
+def block_resources_in_current_tab(driver) -> None:
+    """Network.setBlockedURLs only covers the target it was sent to, so new tabs need it again."""
+    if is_lean_browser_enabled() and is_resource_blocking_enabled():
+        _block_non_essential_resources(driver)
+
+
+def _block_non_essential_resources(driver) -> None:
+    try:
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": LEAN_BLOCKED_URL_PATTERNS})
+    except Exception as cdp_error:
+        logger.warning("Unable to enable resource blocking via CDP: %s", cdp_error, stage="selenium")
+
 def extract_table_header(table):
     try:
         header_elem = table.find_element(By.TAG_NAME, "thead")
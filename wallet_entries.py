@@ -1,11 +1,37 @@
-from datetime import datetime, timezone
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Tuple
 
 from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
 import time
 
+from structured_logging import get_logger
+
+PAGINATED_TABLE_IDS = {
+    1: "ticker-entries",
+    2: "crypto-entries",
+}
+WALLET_ENTRIES_TABLE_COUNT = 4
+
+DATATABLE_PAGE_COUNT_SCRIPT = """
+var tableSelector = '#' + arguments[0];
+if (!window.jQuery || !jQuery.fn.dataTable || !jQuery.fn.dataTable.isDataTable(tableSelector)) {
+    return null;
+}
+return jQuery(tableSelector).DataTable().page.info().pages;
+"""
+
+DATATABLE_JUMP_SCRIPT = """
+var table = jQuery('#' + arguments[0]).DataTable();
+table.page(arguments[1]).draw('page');
+"""
+
+DATATABLE_CURRENT_PAGE_SCRIPT = """
+return jQuery('#' + arguments[0]).DataTable().page.info().page;
+"""
+
+logger = get_logger("wallet_entries", stage="wallet-entries")
 
-def _format_log_timestamp() -> str:
-    return datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S %z")
 
 def extract_table_header(table):
     header_elem = table.find_element(By.TAG_NAME, "thead")
@@ -14,8 +40,8 @@ def extract_table_header(table):
     header = " | ".join([col.text.strip() for col in header_cols if col.text.strip() != ""])
     return "Order Type | " + header if header else "Order Type"
 
-def extract_detailed_table_data(driver, table, paginate_id=None):
-    detailed_rows = []
+def _read_visible_rows(table):
+    visible_rows = []
     row_elements = table.find_elements(By.CSS_SELECTOR, "tbody tr")
     for row in row_elements:
         row_class = row.get_attribute("class") or ""
@@ -27,8 +53,13 @@ def extract_detailed_table_data(driver, table, paginate_id=None):
             order_type = "N/A"
         cells = row.find_elements(By.TAG_NAME, "td")
         cell_texts = [cell.text.strip() for cell in cells]
-        detailed_rows.append(f"{order_type} | " + " | ".join(cell_texts))
-    
+        visible_rows.append(f"{order_type} | " + " | ".join(cell_texts))
+    return visible_rows
+
+def iter_detailed_table_pages(driver, table, paginate_id=None):
+    """Yield the rows of each page as soon as it has been read."""
+    yield _read_visible_rows(table)
+
     if paginate_id:
         while True:
             try:
@@ -40,54 +71,228 @@ def extract_detailed_table_data(driver, table, paginate_id=None):
                 time.sleep(2)
                 driver.execute_script("arguments[0].click();", next_button)
                 time.sleep(10)
-                row_elements = table.find_elements(By.CSS_SELECTOR, "tbody tr")
-                for row in row_elements:
-                    row_class = row.get_attribute("class") or ""
-                    if "Compra" in row_class:
-                        order_type = "COMPRA"
-                    elif "Venda" in row_class:
-                        order_type = "VENDA"
-                    else:
-                        order_type = "N/A"
-                    cells = row.find_elements(By.TAG_NAME, "td")
-                    cell_texts = [cell.text.strip() for cell in cells]
-                    detailed_rows.append(f"{order_type} | " + " | ".join(cell_texts))
+                page_rows = _read_visible_rows(table)
             except Exception as pagination_exception:
-                print(f"{_format_log_timestamp()} [wallet-entries] Pagination error: {pagination_exception}")
+                logger.warning("Pagination error: %s", pagination_exception)
                 break
+            yield page_rows
+
+def extract_detailed_table_data(driver, table, paginate_id=None):
+    detailed_rows = []
+    for page_rows in iter_detailed_table_pages(driver, table, paginate_id):
+        detailed_rows.extend(page_rows)
     return detailed_rows
 
+def _get_paginate_id(index):
+    if index in PAGINATED_TABLE_IDS:
+        return f"{PAGINATED_TABLE_IDS[index]}_paginate"
+    return None
+
 def process_table(driver, table, index):
     header = extract_table_header(table)
-    paginate_id = None
-    if index == 1:
-        paginate_id = "ticker-entries_paginate"
-    elif index == 2:
-        paginate_id = "crypto-entries_paginate"
-    detailed_rows = extract_detailed_table_data(driver, table, paginate_id)
-    print(f"{_format_log_timestamp()} [wallet-entries] Processing table {index}.")
-    print(f"{_format_log_timestamp()} [wallet-entries] Header: {header}")
-    #print(f"Extracted {len(detailed_rows)} row(s) from table {index}.")
-    for row in detailed_rows:
-        print(row)
+    detailed_rows = extract_detailed_table_data(driver, table, _get_paginate_id(index))
+    logger.info("Table %d: %d row(s). Header: %s", index, len(detailed_rows), header)
     return {
         "table_index": index,
         "header": header,
         "rows": detailed_rows
     }
 
-def extract_wallet_entries(driver, url):
-    print(f"{_format_log_timestamp()} [wallet-entries] Accessing wallet entries...")
+def _open_wallet_entries_tables(driver, url):
     driver.get(url)
     time.sleep(10)
     tables = driver.find_elements(By.CSS_SELECTOR, "table")
-    if len(tables) < 4:
-        print(f"{_format_log_timestamp()} [wallet-entries] Insufficient tables found on the page.")
+    if len(tables) < WALLET_ENTRIES_TABLE_COUNT:
+        logger.warning("Insufficient tables found on the page.")
+        return None
+    logger.info("%d table(s) found (adjusted to 4).", len(tables))
+    return tables[:WALLET_ENTRIES_TABLE_COUNT]
+
+def iter_wallet_entries_events(driver, url, batch_size: int = 100):
+    """Yield table headers and row batches while the pages are being read."""
+    logger.info("Accessing wallet entries (streaming)...")
+    tables = _open_wallet_entries_tables(driver, url)
+    if tables is None:
+        yield {"type": "error", "error": "Insufficient tables found on the page."}
+        return
+    total_rows = 0
+    for index, table in enumerate(tables, start=1):
+        header = extract_table_header(table)
+        yield {"type": "table", "table_index": index, "header": header}
+        table_rows = 0
+        for page_rows in iter_detailed_table_pages(driver, table, _get_paginate_id(index)):
+            for batch_start in range(0, len(page_rows), batch_size):
+                yield {
+                    "type": "rows",
+                    "table_index": index,
+                    "rows": page_rows[batch_start:batch_start + batch_size],
+                }
+            table_rows += len(page_rows)
+        logger.info("Table %d: %d row(s) streamed.", index, table_rows)
+        total_rows += table_rows
+    yield {"type": "end", "tables": len(tables), "rows": total_rows}
+
+def extract_wallet_entries(driver, url):
+    logger.info("Accessing wallet entries...")
+    tables = _open_wallet_entries_tables(driver, url)
+    if tables is None:
         return []
-    tables = tables[:4]
-    print(f"{_format_log_timestamp()} [wallet-entries] {len(tables)} table(s) found (adjusted to 4).")
     results = []
     for i, table in enumerate(tables, start=1):
         result = process_table(driver, table, i)
         results.append(result)
     return results
+
+def extract_wallet_entries_in_parallel(
+    driver,
+    url: str,
+    create_driver: Callable[[], object],
+    release_driver: Callable[[object], None],
+    max_workers: int = 3,
+    page_settle_seconds: float = 2.0,
+):
+    """Scrape the paginated tables with a pool of drivers, each jumping straight to its own page range."""
+    logger.info("Accessing wallet entries (parallel, %d driver(s))...", max_workers)
+    tables = _open_wallet_entries_page(driver, url)
+    if tables is None:
+        logger.warning("Insufficient tables found on the page.")
+        return []
+
+    page_counts: Dict[int, Optional[int]] = {
+        table_index: _read_page_count(driver, table_id)
+        for table_index, table_id in PAGINATED_TABLE_IDS.items()
+    }
+    page_ranges = _split_page_ranges(page_counts, max_workers)
+    pages_by_table: Dict[int, Dict[int, List[str]]] = {table_index: {} for table_index in PAGINATED_TABLE_IDS}
+
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+        range_futures = [
+            executor.submit(
+                _scrape_page_range,
+                url,
+                create_driver,
+                release_driver,
+                table_index,
+                first_page,
+                last_page,
+                page_settle_seconds,
+            )
+            for table_index, first_page, last_page in page_ranges
+        ]
+
+        results = []
+        for table_index, table in enumerate(tables, start=1):
+            if table_index in PAGINATED_TABLE_IDS and page_counts[table_index] is None:
+                results.append(process_table(driver, table, table_index))
+                continue
+            results.append({
+                "table_index": table_index,
+                "header": extract_table_header(table),
+                "rows": _read_visible_rows(table),
+            })
+            if table_index in PAGINATED_TABLE_IDS:
+                pages_by_table[table_index][0] = results[-1]["rows"]
+
+        failed_tables = set()
+        for (table_index, first_page, last_page), range_future in zip(page_ranges, range_futures):
+            try:
+                pages_by_table[table_index].update(range_future.result())
+            except Exception as range_error:
+                logger.warning(
+                    "Pages %d-%d of table %d failed (%s). Falling back to sequential pagination.",
+                    first_page,
+                    last_page,
+                    table_index,
+                    range_error,
+                )
+                failed_tables.add(table_index)
+
+    for table_index in sorted(failed_tables):
+        results[table_index - 1] = process_table(driver, tables[table_index - 1], table_index)
+        page_counts[table_index] = None
+
+    for table_result in results:
+        scraped_pages = pages_by_table.get(table_result["table_index"])
+        if scraped_pages and page_counts.get(table_result["table_index"]) is not None:
+            table_result["rows"] = merge_page_rows(scraped_pages)
+        logger.info("Table %d: %d row(s).", table_result["table_index"], len(table_result["rows"]))
+    return results
+
+def merge_page_rows(scraped_pages: Dict[int, List[str]]) -> List[str]:
+    """Concatenate pages in page order; identical orders on different pages are all kept."""
+    merged_rows: List[str] = []
+    for page_index in sorted(scraped_pages):
+        merged_rows.extend(scraped_pages[page_index])
+    return merged_rows
+
+def _split_page_ranges(page_counts: Dict[int, Optional[int]], max_workers: int) -> List[Tuple[int, int, int]]:
+    """Split pages 1..n-1 of every paginated table into contiguous (table, first, last) ranges."""
+    remaining_pages = {
+        table_index: page_count - 1
+        for table_index, page_count in page_counts.items()
+        if page_count and page_count > 1
+    }
+    total_pages = sum(remaining_pages.values())
+    if not total_pages:
+        return []
+    pages_per_range = max(1, -(-total_pages // max(1, max_workers)))
+    page_ranges = []
+    for table_index, page_count in remaining_pages.items():
+        for first_page in range(1, page_count + 1, pages_per_range):
+            page_ranges.append((table_index, first_page, min(page_count, first_page + pages_per_range - 1)))
+    return page_ranges
+
+def _scrape_page_range(
+    url: str,
+    create_driver: Callable[[], object],
+    release_driver: Callable[[object], None],
+    table_index: int,
+    first_page: int,
+    last_page: int,
+    page_settle_seconds: float,
+) -> Dict[int, List[str]]:
+    table_id = PAGINATED_TABLE_IDS[table_index]
+    scraped_pages: Dict[int, List[str]] = {}
+    range_driver = create_driver()
+    try:
+        tables = _open_wallet_entries_page(range_driver, url)
+        if tables is None or _read_page_count(range_driver, table_id) is None:
+            raise RuntimeError(f"{table_id} did not load")
+        for page_index in range(first_page, last_page + 1):
+            range_driver.execute_script(DATATABLE_JUMP_SCRIPT, table_id, page_index)
+            WebDriverWait(range_driver, 30).until(
+                lambda current_driver: current_driver.execute_script(DATATABLE_CURRENT_PAGE_SCRIPT, table_id)
+                == page_index
+            )
+            time.sleep(page_settle_seconds)
+            scraped_pages[page_index] = _read_visible_rows(tables[table_index - 1])
+    finally:
+        release_driver(range_driver)
+    return scraped_pages
+
+def _read_page_count(driver, table_id: str, wait_seconds: float = 10.0) -> Optional[int]:
+    try:
+        return WebDriverWait(driver, wait_seconds).until(
+            lambda current_driver: current_driver.execute_script(DATATABLE_PAGE_COUNT_SCRIPT, table_id)
+        )
+    except Exception:
+        return None
+
+def _open_wallet_entries_page(driver, url):
+    driver.get(url)
+    try:
+        WebDriverWait(driver, 30).until(
+            lambda current_driver: len(current_driver.find_elements(By.CSS_SELECTOR, "table"))
+            >= WALLET_ENTRIES_TABLE_COUNT
+        )
+    except Exception:
+        return None
+    tables = driver.find_elements(By.CSS_SELECTOR, "table")[:WALLET_ENTRIES_TABLE_COUNT]
+    try:
+        # DataTables fills the bodies after the tables exist; empty tables still get a placeholder row.
+        WebDriverWait(driver, 15).until(
+            lambda _: all(table.find_elements(By.CSS_SELECTOR, "tbody tr") for table in tables)
+        )
+    except Exception as wait_error:
+        logger.warning("Table rows did not render in time on %s: %s", url, wait_error)
+    return tables
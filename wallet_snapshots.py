@@ -0,0 +1,135 @@
+from __future__ import annotations
+
+import json
+import os
+import sqlite3
+import threading
+import time
+import unicodedata
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+DEFAULT_WALLET_SNAPSHOT_DB_PATH = os.path.join("data", "wallet_snapshots.sqlite3")
+
+
+@dataclass
+class WalletSnapshot:
+    wallet_url: str
+    positions: Dict[str, str]
+    results: List[Dict[str, str]] = field(default_factory=list)
+    failures: List[Dict[str, str]] = field(default_factory=list)
+    captured_at: float = field(default_factory=time.time)
+
+
+@dataclass
+class WalletDiff:
+    added: List[str] = field(default_factory=list)
+    removed: List[str] = field(default_factory=list)
+    changed: List[str] = field(default_factory=list)
+    unchanged: List[str] = field(default_factory=list)
+
+    def to_payload(self) -> Dict[str, List[str]]:
+        return {
+            "added": self.added,
+            "removed": self.removed,
+            "changed": self.changed,
+            "unchanged": self.unchanged,
+        }
+
+
+class WalletSnapshotStore:
+    def __init__(self, database_path: str) -> None:
+        self._lock = threading.Lock()
+        database_directory = os.path.dirname(database_path)
+        if database_directory:
+            os.makedirs(database_directory, exist_ok=True)
+        self._connection = sqlite3.connect(database_path, check_same_thread=False)
+        with self._lock, self._connection:
+            self._connection.execute(
+                """
+                CREATE TABLE IF NOT EXISTS wallet_snapshots (
+                    wallet_url TEXT PRIMARY KEY,
+                    positions TEXT NOT NULL,
+                    results TEXT NOT NULL,
+                    failures TEXT NOT NULL,
+                    captured_at REAL NOT NULL
+                )
+                """
+            )
+
+    def get(self, wallet_url: str) -> Optional[WalletSnapshot]:
+        with self._lock:
+            snapshot_row = self._connection.execute(
+                "SELECT positions, results, failures, captured_at FROM wallet_snapshots WHERE wallet_url = ?",
+                (wallet_url,),
+            ).fetchone()
+        if not snapshot_row:
+            return None
+        return WalletSnapshot(
+            wallet_url=wallet_url,
+            positions=json.loads(snapshot_row[0]),
+            results=json.loads(snapshot_row[1]),
+            failures=json.loads(snapshot_row[2]),
+            captured_at=snapshot_row[3],
+        )
+
+    def save(self, snapshot: WalletSnapshot) -> None:
+        with self._lock, self._connection:
+            self._connection.execute(
+                """
+                INSERT OR REPLACE INTO wallet_snapshots (wallet_url, positions, results, failures, captured_at)
+                VALUES (?, ?, ?, ?, ?)
+                """,
+                (
+                    snapshot.wallet_url,
+                    json.dumps(snapshot.positions, ensure_ascii=False),
+                    json.dumps(snapshot.results, ensure_ascii=False),
+                    json.dumps(snapshot.failures, ensure_ascii=False),
+                    snapshot.captured_at,
+                ),
+            )
+
+
+def build_wallet_positions(tables: List[Dict[str, object]]) -> Dict[str, str]:
+    """Map each asset to a signature that only changes when the position itself changes."""
+    positions: Dict[str, str] = {}
+    for table_payload in tables:
+        table_name = str(table_payload.get("table_name", ""))
+        header = table_payload.get("header", "")
+        header_columns = header.split(" | ") if isinstance(header, str) else list(header or [])
+        quantity_index = next(
+            (
+                column_index
+                for column_index, column_name in enumerate(header_columns)
+                if _normalize_label(column_name).startswith("quant")
+            ),
+            None,
+        )
+        for raw_row in table_payload.get("rows", []):
+            row = raw_row.split(" | ") if isinstance(raw_row, str) else raw_row
+            if not row or not row[0]:
+                continue
+            if quantity_index is not None and quantity_index < len(row):
+                position_value = row[quantity_index]
+            else:
+                position_value = " | ".join(row[1:])
+            positions[row[0]] = f"{table_name.splitlines()[0] if table_name else ''}|{position_value}"
+    return positions
+
+
+def diff_wallet_positions(previous: Dict[str, str], current: Dict[str, str]) -> WalletDiff:
+    wallet_diff = WalletDiff()
+    for asset_code, signature in current.items():
+        if asset_code not in previous:
+            wallet_diff.added.append(asset_code)
+        elif previous[asset_code] != signature:
+            wallet_diff.changed.append(asset_code)
+        else:
+            wallet_diff.unchanged.append(asset_code)
+    wallet_diff.removed = [asset_code for asset_code in previous if asset_code not in current]
+    return wallet_diff
+
+
+def _normalize_label(label: str) -> str:
+    decomposed = unicodedata.normalize("NFKD", label or "")
+    return "".join(char for char in decomposed if not unicodedata.combining(char)).strip().lower()
@@ -0,0 +1,165 @@
+from __future__ import annotations
+
+import hashlib
+import hmac
+import ipaddress
+import json
+import os
+import queue
+import socket
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, Optional
+from urllib.parse import urlparse
+
+from structured_logging import get_logger
+
+logger = get_logger("webhook_dispatcher", stage="webhook")
+
+
+@dataclass
+class WebhookDelivery:
+    callback_url: str
+    payload: Dict[str, object]
+    attempt: int = 0
+
+
+class WebhookDispatcher:
+    def __init__(
+        self,
+        signing_secret: Optional[str] = None,
+        max_attempts: int = 5,
+        initial_backoff_seconds: float = 2.0,
+        request_timeout_seconds: float = 10.0,
+    ) -> None:
+        self._signing_secret = signing_secret
+        self._max_attempts = max_attempts
+        self._initial_backoff_seconds = initial_backoff_seconds
+        self._request_timeout_seconds = request_timeout_seconds
+        self._deliveries: "queue.Queue[WebhookDelivery]" = queue.Queue()
+        self._worker: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    @property
+    def signs_deliveries(self) -> bool:
+        return bool(self._signing_secret)
+
+    def enqueue(self, callback_url: str, payload: Dict[str, object]) -> None:
+        self._ensure_worker()
+        self._deliveries.put(WebhookDelivery(callback_url=callback_url, payload=payload))
+
+    def build_headers(self, body: bytes) -> Dict[str, str]:
+        timestamp = str(int(time.time()))
+        headers = {
+            "Content-Type": "application/json",
+            "X-Webhook-Timestamp": timestamp,
+        }
+        if self._signing_secret:
+            signature = hmac.new(
+                self._signing_secret.encode("utf-8"),
+                timestamp.encode("utf-8") + b"." + body,
+                hashlib.sha256,
+            ).hexdigest()
+            headers["X-Webhook-Signature"] = f"sha256={signature}"
+        return headers
+
+    def _ensure_worker(self) -> None:
+        with self._lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self._run, name="webhook-dispatcher", daemon=True)
+                self._worker.start()
+
+    def _run(self) -> None:
+        while True:
+            delivery = self._deliveries.get()
+            try:
+                self._deliver(delivery)
+            finally:
+                self._deliveries.task_done()
+
+    def _deliver(self, delivery: WebhookDelivery) -> None:
+        import requests
+
+        if not is_valid_callback_url(delivery.callback_url):
+            # Checked again here because the host may resolve differently since the job started.
+            logger.warning("Descartado: %s não é um destino público.", delivery.callback_url)
+            return
+        body = json.dumps(delivery.payload, ensure_ascii=False).encode("utf-8")
+        delivery.attempt += 1
+        try:
+            response = requests.post(
+                delivery.callback_url,
+                data=body,
+                headers=self.build_headers(body),
+                timeout=self._request_timeout_seconds,
+                allow_redirects=False,
+            )
+            if 200 <= response.status_code < 300:
+                logger.info("Entregue em %s (tentativa %d).", delivery.callback_url, delivery.attempt)
+                return
+            if 400 <= response.status_code < 500 and response.status_code not in (408, 429):
+                logger.warning(
+                    "Rejeitado por %s com status %d.", delivery.callback_url, response.status_code
+                )
+                return
+            failure_description = f"status {response.status_code}"
+        except requests.RequestException as delivery_error:
+            failure_description = str(delivery_error)
+
+        logger.warning(
+            "Falha ao entregar em %s (tentativa %d/%d): %s",
+            delivery.callback_url,
+            delivery.attempt,
+            self._max_attempts,
+            failure_description,
+        )
+        if delivery.attempt >= self._max_attempts:
+            return
+        retry_timer = threading.Timer(
+            self._initial_backoff_seconds * (2 ** (delivery.attempt - 1)),
+            self._deliveries.put,
+            args=(delivery,),
+        )
+        retry_timer.daemon = True
+        retry_timer.start()
+
+
+def is_valid_callback_url(callback_url: object) -> bool:
+    """Accept http(s) URLs whose host resolves only to public addresses, or is in WEBHOOK_ALLOWED_HOSTS."""
+    if not isinstance(callback_url, str) or not callback_url.startswith(("http://", "https://")):
+        return False
+    try:
+        parsed_url = urlparse(callback_url)
+        callback_host = parsed_url.hostname
+        callback_port = parsed_url.port
+    except ValueError:
+        return False
+    if not callback_host:
+        return False
+    if callback_host.lower() in _allowed_callback_hosts():
+        return True
+    try:
+        address_infos = socket.getaddrinfo(callback_host, callback_port or 443, proto=socket.IPPROTO_TCP)
+    except (socket.gaierror, UnicodeError):
+        return False
+    return bool(address_infos) and all(_is_public_address(address_info[4][0]) for address_info in address_infos)
+
+
+def _allowed_callback_hosts() -> set:
+    raw_hosts = os.environ.get("WEBHOOK_ALLOWED_HOSTS", "")
+    return {host.strip().lower() for host in raw_hosts.split(",") if host.strip()}
+
+
+def _is_public_address(raw_address: str) -> bool:
+    try:
+        address = ipaddress.ip_address(raw_address.split("%", 1)[0])
+    except ValueError:
+        return False
+    if getattr(address, "ipv4_mapped", None):
+        address = address.ipv4_mapped
+    return address.is_global and not address.is_multicast
+
+
+def create_webhook_dispatcher() -> WebhookDispatcher:
+    return WebhookDispatcher(signing_secret=os.environ.get("WEBHOOK_SECRET") or None)